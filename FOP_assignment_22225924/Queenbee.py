@@ -1,5 +1,5 @@
-import random
 from worker import Worker
+import rngservice
 
 class QueenBee:
     """
@@ -10,7 +10,7 @@ class QueenBee:
     # Constructor: set up identity, location, portal coords,
     #              and life-cycle parameters.
     def __init__(self, ID, pos,
-                 hive_exit, hive_entrance, world_entrance):
+                 hive_exit, hive_entrance, world_entrance, rng=None, hive=None):
         self.ID                = ID  # e.g. "queen"
         self.pos               = pos   # (row, col) inside the hive grid
 
@@ -19,12 +19,22 @@ class QueenBee:
         self.honeyholdentrance = hive_entrance   # world → hive
         self.humanityentrance  = world_entrance   # matching cell outside
 
+        # the simulation's RngService, handed on to every newborn worker
+        self.rng       = rng or rngservice.shared()
+        self.hive      = hive      # the hive's WorldGrid (None → Worker default)
+
         # Life-cycle counters
         self.age       = 0    # how many ticks lived
-        self.max_age   = random.randint(500, 700)  # random life span
+        self.max_age   = self.rng.stream("queen").randint(500, 700)  # random life span
         self.spawn_cd  = 30          # countdown to next spawn
         self.alive     = True      # becomes False when she die
 
+        # event mode (arm()): the scheduler, the tick her age was 0 and
+        # the tick of the next spawn
+        self.sched     = None
+        self.zero      = None
+        self.due       = None
+
     # step_change() is called **once per simulation tick**.
     # * increments age
     # * kills queen if age limit reached
@@ -44,18 +54,66 @@ class QueenBee:
         # spawning
         self.spawn_cd -= 1     # countdown one tick
         if self.spawn_cd <= 0:    # time to lay an egg?
-            new_id = "w" + str(len(beetlejuices) + 1)    # generate "wN"
-            beetlejuices.append(
-                Worker(
-                    new_id,
-                    self.pos,                  # newborn appears at queen’s cell
-                    self.honeyholdexit,
-                    self.honeyholdentrance,
-                    self.humanityentrance
-                )
-            )
+            self._lay_egg(beetlejuices)
             self.spawn_cd = 30                # reset 30-tick timer
 
+    # _lay_egg() appends one newborn Worker and returns it
+    def _lay_egg(self, beetlejuices):
+        # generate "wN" – an Arena counts every bee it ever held (its
+        # len() drops once dead bees are compacted away)
+        new_id = "w" + str(getattr(beetlejuices, "born", len(beetlejuices)) + 1)
+        newborn = Worker(
+            new_id,
+            self.pos,                  # newborn appears at queen’s cell
+            self.honeyholdexit,
+            self.honeyholdentrance,
+            self.humanityentrance,
+            rng=self.rng,              # same random streams as the colony
+            hive=self.hive
+        )
+        beetlejuices.append(newborn)
+        return newborn
+
+    # EVENT-DRIVEN LIFE CYCLE
+    # arm() replaces the per-tick step_change() with two Scheduler events:
+    # her death on the tick her age reaches max_age and the next spawn on
+    # the tick spawn_cd runs out (then every 30 ticks).  The ticks match
+    # step_change() being called at the start of every tick; death is
+    # scheduled first so it wins a tie, just like the age check does.
+    # on_spawn(worker) lets the loop register each newborn.
+    def arm(self, sched, beetlejuices, on_spawn=None):
+        if not self.alive:
+            return
+        zero = sched.tick - self.age          # tick at which age was 0
+        self.sched, self.zero = sched, zero
+        self.due = sched.tick + self.spawn_cd
+        sched.at(zero + self.max_age, self._die)
+        sched.at(self.due, self._spawn, sched, zero, beetlejuices, on_spawn)
+
+    def _die(self):
+        self.age   = self.max_age
+        self.alive = False
+
+    def _spawn(self, sched, zero, beetlejuices, on_spawn):
+        if not self.alive:
+            return
+        self.age = sched.tick - zero
+        newborn = self._lay_egg(beetlejuices)
+        if on_spawn is not None:
+            on_spawn(newborn)
+        self.spawn_cd = 30                    # reset 30-tick timer
+        self.due = sched.tick + self.spawn_cd
+        sched.at(self.due, self._spawn, sched, zero, beetlejuices, on_spawn)
+
+    # settle() – in event mode age and spawn_cd are only brought up to
+    # date when she lays an egg; this writes them as step_change() would
+    # have them at the end of the scheduler's current tick (for a
+    # checkpoint – arm() on a new scheduler goes on from there)
+    def settle(self):
+        if self.alive and self.sched is not None:
+            self.age      = self.sched.tick - self.zero
+            self.spawn_cd = self.due - self.sched.tick
+
 
 
 
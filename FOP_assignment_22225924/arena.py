@@ -0,0 +1,92 @@
+import heapq
+import numpy as np
+
+# ticks between two compactions in the simulation loops: dead bees cost
+# at most this many ticks of dead weight before their slots are reused
+COMPACT_EVERY = 50
+
+
+class Arena:
+    """
+      Slot storage for the agents of a colony, with recycling of the dead.
+
+      Every agent gets a slot; its generational ID (gid) packs the slot
+      and the slot's generation, so a gid stays valid for as long as its
+      agent is kept and never points at a newer agent that reuses the
+      slot.  Dead agents keep their slot until compact() releases them –
+      called every few ticks by the simulation loop – after which loops
+      over the arena only see the living and newborns fill the freed
+      slots, lowest first.
+
+      Iteration, len() and indexing cover the kept agents in colony
+      (birth) order, like the plain list the colony used to be.
+
+      Parameters:
+      ##########
+      agents : iterable    initial agents, in colony order
+      """
+
+    SLOT_BITS = 32
+
+    def __init__(self, agents=()):
+        self.slots  = []                          # slot -> agent (None = free)
+        self.gen    = np.zeros(16, dtype=np.uint32)   # generation of each slot
+        self.free   = []                          # heap of free slots
+        self.agents = []                          # kept agents, colony order
+        self.born   = 0                           # agents ever added
+        for agent in agents:
+            self.add(agent)
+
+    def __iter__(self):
+        return iter(self.agents)
+
+    def __len__(self):
+        return len(self.agents)
+
+    def __getitem__(self, i):
+        return self.agents[i]
+
+    # add() – store a new agent (last in colony order); returns its gid
+    def add(self, agent):
+        if self.free:
+            slot = heapq.heappop(self.free)
+            self.slots[slot] = agent
+        else:
+            slot = len(self.slots)
+            self.slots.append(agent)
+            if slot == len(self.gen):             # grow the array by doubling
+                self.gen = np.concatenate([self.gen, np.zeros_like(self.gen)])
+        agent.slot = slot
+        agent.gid  = (int(self.gen[slot]) << self.SLOT_BITS) | slot
+        self.agents.append(agent)
+        self.born += 1
+        return agent.gid
+
+    append = add        # drop-in for list.append (QueenBee._lay_egg)
+
+    # get() – the agent behind a gid, None once it has been released
+    def get(self, gid):
+        slot = gid & ((1 << self.SLOT_BITS) - 1)
+        if slot < len(self.slots) and int(self.gen[slot]) == gid >> self.SLOT_BITS:
+            return self.slots[slot]
+        return None
+
+    # compact() – release every dead agent: its slot goes back on the
+    # free list with a new generation.  Returns the released agents, so
+    # indexes holding them (Roster, BeeHash) can forget them too.
+    def compact(self):
+        dead = [a for a in self.agents if not a.alive]
+        if dead:
+            self.release(dead)
+        return dead
+
+    # release() – give up the given agents (dead, or handed to another
+    # process – see tiles.py): their slots are freed, gids go stale
+    def release(self, agents):
+        gone = set(agents)
+        self.agents = [a for a in self.agents if a not in gone]
+        for agent in agents:
+            slot = agent.slot
+            self.slots[slot] = None
+            self.gen[slot] += 1
+            heapq.heappush(self.free, slot)
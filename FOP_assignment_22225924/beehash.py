@@ -0,0 +1,166 @@
+from math import floor
+import profiler
+
+
+class BeeHash:
+    """
+      Spatial hash of the worker bees that are alive and outdoors – the
+      only bees a wasp can see or sting.
+
+      The world is cut into square buckets of `cellsize` cells.  The
+      simulation calls update(bee) after a bee moves or walks through a
+      portal, so lookups only ever touch the buckets around the wasp.
+
+      Parameters:
+      ##########
+      cellsize : int     edge length of one bucket
+      """
+
+    def __init__(self, cellsize=4):
+        self.cellsize = max(1, int(cellsize))
+        self.buckets  = {}     # (bucket_row, bucket_col) -> {bee: None}
+        self.where    = {}     # bee -> bucket key it is filed under
+        self.order    = {}     # bee -> colony order (tie-breaker)
+        self.counter  = 0      # next colony order number
+        self.lo       = None   # bounding box of every bucket ever used
+        self.hi       = None
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, bee):
+        return bee in self.where
+
+    def _key(self, pos):
+        return pos[0] // self.cellsize, pos[1] // self.cellsize
+
+    # register() – remember a (new) bee and file it if it is outdoors;
+    # every bee comes in through here (the starting colony, then each
+    # newborn from the queen's spawn callback), in colony order
+    def register(self, bee):
+        if bee not in self.order:
+            self.order[bee] = self.counter
+            self.counter += 1
+        self.update(bee)
+
+    # forget() – drop a released bee for good (see Arena.compact)
+    def forget(self, bee):
+        key = self.where.pop(bee, None)
+        if key is not None:
+            bucket = self.buckets[key]
+            del bucket[bee]
+            if not bucket:
+                del self.buckets[key]
+        self.order.pop(bee, None)
+
+    # update() – re-file one bee after it moved, crossed a portal or died
+    def update(self, bee):
+        old = self.where.get(bee)
+        new = self._key(bee.pos) if bee.alive and not bee.inhoneyhold else None
+        if old == new:
+            return
+        if old is not None:
+            bucket = self.buckets[old]
+            del bucket[bee]
+            if not bucket:
+                del self.buckets[old]
+            del self.where[bee]
+        if new is not None:
+            self.buckets.setdefault(new, {})[bee] = None
+            self.where[bee] = new
+            if self.lo is None:
+                self.lo = new
+                self.hi = new
+            else:
+                self.lo = (min(self.lo[0], new[0]), min(self.lo[1], new[1]))
+                self.hi = (max(self.hi[0], new[0]), max(self.hi[1], new[1]))
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+
+    # nearest() – the outdoor bee closest to pos (Manhattan distance),
+    # earliest in colony order on ties – like the wasp's linear scan.
+    # Searches rings of buckets outwards and stops once no further ring
+    # can hold anything as close.
+    def nearest(self, pos):
+        if not self.where:
+            return None
+        s = self.cellsize
+        r0, c0 = pos
+        kb, lb = self._key(pos)
+        # furthest ring that can still contain a used bucket
+        kmax = max(abs(kb - self.lo[0]), abs(kb - self.hi[0]),
+                   abs(lb - self.lo[1]), abs(lb - self.hi[1]))
+        best = None
+        bestkey = None
+        k = 0
+        while k <= kmax:
+            # anything in ring k is at least (k-1)*s + 1 cells away
+            if bestkey is not None and bestkey[0] < (k - 1) * s + 1:
+                break
+            for key in self._ring(kb, lb, k):
+                bucket = self.buckets.get(key)
+                if not bucket:
+                    continue
+                for bee in bucket:
+                    d = abs(bee.pos[0] - r0) + abs(bee.pos[1] - c0)
+                    cand = (d, self.order[bee])
+                    if bestkey is None or cand < bestkey:
+                        bestkey = cand
+                        best = bee
+            k += 1
+        return best
+
+    # bucket keys exactly k rings away from (kb, lb)
+    @staticmethod
+    def _ring(kb, lb, k):
+        if k == 0:
+            yield kb, lb
+            return
+        for j in range(lb - k, lb + k + 1):
+            yield kb - k, j
+            yield kb + k, j
+        for i in range(kb - k + 1, kb + k):
+            yield i, lb - k
+            yield i, lb + k
+
+    # within() – outdoor bees with |drow| <= radius and |dcol| <= radius
+    # (the square the wasp's sting covers)
+    def within(self, pos, radius):
+        rad = floor(radius)         # cells are integers, 0.5 → same cell
+        if rad < 0 or not self.where:
+            return []
+        r0, c0 = pos
+        s = self.cellsize
+        found = []
+        for br in range((r0 - rad) // s, (r0 + rad) // s + 1):
+            for bc in range((c0 - rad) // s, (c0 + rad) // s + 1):
+                bucket = self.buckets.get((br, bc))
+                if not bucket:
+                    continue
+                if profiler.enabled:
+                    profiler.counts["sting_checks"] += len(bucket)
+                for bee in bucket:
+                    if abs(bee.pos[0] - r0) <= rad and abs(bee.pos[1] - c0) <= rad:
+                        found.append(bee)
+        return found
+
+    # ------------------------------------------------------------------
+    # stinging
+    # ------------------------------------------------------------------
+
+    # kill() – batched kill: Worker.die() on every bee given and drop
+    # them from the hash; returns how many were alive
+    def kill(self, bees):
+        n = 0
+        for bee in bees:
+            if bee.alive:
+                bee.die()
+                n += 1
+            self.update(bee)
+        return n
+
+    # sting() – kill everything inside the sting square around pos
+    def sting(self, pos, radius):
+        return self.kill(self.within(pos, radius))
@@ -1,12 +1,30 @@
 # batch mode
-import argparse, csv, random, numpy as np
-from worker  import Worker
+import argparse, csv, functools, os, shutil, signal, tempfile, zlib, numpy as np
+from itertools import count
+from worker  import Worker, HIVEGRID
 from flowers import Flower
 from comb    import Comb
+from combstore import CombStore
+from colony  import Colony
+from flowerindex import FlowerIndex
+from freecells import FreeCells
+from swarm   import Swarm
+from waspswarm import WaspSwarm
+from worldgrid import WorldGrid
+import terrain
+from scheduler import Scheduler, Roster
+from arena import Arena, COMPACT_EVERY
+from rngservice import RngService
+import checkpoint
+import trajectory
+from profiler import Profiler, NullProfiler
+from statsink import COLUMNS, CsvSink, BinSink
+import sweep
+import simulation
 
 # argparse- let the script reader -f, -p, --csv from the command line.
 # csv - to read the parameter file.
-# supplies pseudorandom numbers (for spawning flowers).
+# RngService supplies seeded pseudorandom numbers (for spawning flowers, …).
 # numpy (np) – fast array handling; loads the terrain CSV and stores the log.
 
 
@@ -20,117 +38,573 @@ def load_params(path):
     return out  # return the populated dictionary containing parameters
 
 #Returns a random (row, col) tuple inside an r × c grid—used for placing flowers.
-def rand_cell(r, c):
-    return random.randrange(r), random.randrange(c)
-
-# -f / --field → file with the terrain matrix (house, pool, etc.)
-# -p / --params → file with simulation parameters (steps, bee count, …)
-# --csv → optional file where stats will be saved
-def main():
-    # create argument parser to handle command line arguments
-    ap = argparse.ArgumentParser(description="Bee-World batch mode")
-
-    # Define a required argument "-f" or "--field" for specifying terrain CSV file path
-    ap.add_argument("-f", "--field",  required=True, help="terrain CSV")
-
-    #  # Define a required argument "-p" or "--params" for specifying parameter CSV file path
-    ap.add_argument("-p", "--params", required=True, help="parameter CSV")
-
-    # Define an optional argument "--csv" for specifying an output CSV file for statistics
-    ap.add_argument("--csv", help="optional stats CSV")
-
-    # Parse the provided arguments from the command-line and store them in 'args'
-    args = ap.parse_args()
-
-# np.loadtxt() function from numpy to read data from csv file.
-#loaded data is stored as an array
-    humanity   = np.loadtxt(args.field, delimiter=",")
+# `rnd` is a random stream (RngStream) of the run.
+def rand_cell(r, c, rnd):
+    return rnd.randrange(r), rnd.randrange(c)
+
+# on-demand checkpoint: SIGUSR1 (see main()) only raises this flag, the
+# simulation loop writes the snapshot at the end of the current tick
+_snapshot_now = False
+
+def request_checkpoint(*_):
+    global _snapshot_now
+    _snapshot_now = True
+
+# terrain_crc() – fingerprint of the terrain, so a checkpoint is never
+# resumed on a different field
+# (taken over row blocks of the float64 grid, so a memory-mapped world
+# is never converted whole)
+def terrain_crc(humanity):
+    crc = 0
+    for r in range(0, humanity.shape[0], 256):
+        block = np.ascontiguousarray(humanity[r:r + 256], dtype=np.float64)
+        crc = zlib.crc32(block.tobytes(), crc)
+    return crc
+
+# _with_wasps() – the observers, with every trajectory trace among them
+# also recording `wasps` (Wasp objects or a WaspSwarm), and every frame
+# recorder (export.Recorder) the wasps and the queen `eve` as well
+def _with_wasps(observers, wasps, eve=None):
+    out = []
+    for obs in observers:
+        if isinstance(obs, trajectory.TraceWriter):
+            obs = functools.partial(obs.write, wasps=wasps)
+        elif getattr(obs, "sees_wasps", False):
+            obs = functools.partial(obs, wasps=wasps, eve=eve)
+        out.append(obs)
+    return out
+
+# _meta() – the checkpoint header of every engine: where the run stands
+# and how to set it up again
+def _meta(step, total_nectar, last, prm, engine, rngs, humanity):
+    return {"step": step, "total_nectar": total_nectar, "last": last,
+            "prm": prm, "engine": engine, "seed": rngs.seed,
+            "rng": rngs.state(),
+            "terrain": [list(humanity.shape), terrain_crc(humanity)]}
+
+# the phases simulate() reports to its profiler, in loop order
+PHASES = ("events", "spawn", "wasps", "workers", "stats", "observers", "checkpoint")
+
+# simulate() runs one scenario on a terrain matrix with a parameter
+# dictionary (as returned by load_params) and streams one stats row per
+# step (statsink.COLUMNS) into every sink in `sinks`; it returns the
+# last row as a dict (None if no step ran).  main() and the sweep
+# runner both call it, so every run goes through exactly the same code.
+# `ckpt` is a checkpoint file written every `every` ticks (and on
+# request_checkpoint()); `resume` is a loaded checkpoint (meta, arrays)
+# to continue from – the run then goes on bit-identically.
+# every `observers` entry is called as f(step, bees, combs, flowers, swarm)
+# after each tick (export.Recorder, trajectory.TraceWriter).
+# `prof` is a profiler.Profiler timing the PHASES of every tick.
+# `layout` is the world's hive size, portals and combs as terrain.load()
+# returns them (None → terrain.default_layout, the classic hive).
+# engine "full" hands the run to simulation.Simulation instead: the queen,
+# the wasps and the seasons as in the interactive script (its profiler
+# phases are simulation.PHASES; Simulation.snapshot() is the checkpoint).
+def simulate(humanity, prm, engine="object", seed=None,
+             ckpt=None, every=0, resume=None, sinks=(), observers=(),
+             prof=None, layout=None):
+    global _snapshot_now
+    prof = prof or NullProfiler()
+    layout = layout or terrain.default_layout(humanity.shape)
+    terrain.check_layout(humanity.shape, layout)
+    if resume is not None:      # the snapshot knows how the run was set up
+        meta, data = resume
+        prm, engine, seed = meta["prm"], meta["engine"], meta["seed"]
+        if meta["terrain"] != [list(humanity.shape), terrain_crc(humanity)]:
+            raise ValueError("checkpoint was written for a different terrain")
+    if engine == "full":
+        sim = simulation.Simulation(prm, seed, humanity, layout, prof)
+        last = None
+        if resume is not None:
+            sim.restore(meta["sim"], data, meta["rng"])
+            last = meta["last"]
+        observers = _with_wasps(observers, sim.goatis, sim.eve)
+        while sim.step(observers):
+            row = sim.row()
+            for sink in sinks:
+                sink.append(row)
+            last = dict(zip(COLUMNS, row))
+            if ckpt and ((every and sim.t % every == 0) or _snapshot_now):
+                _snapshot_now = False
+                for sink in sinks:
+                    sink.flush()
+                state, arrays = sim.snapshot()
+                meta = _meta(sim.t - 1, sim.colony.nectar, last, prm, engine,
+                             sim.rngs, humanity)
+                meta["sim"] = state
+                checkpoint.save(ckpt, meta, arrays)
+        for sink in sinks:
+            sink.flush()
+        return last
+
+    # every random draw of the run comes from this service's streams,
+    # so the same seed gives a bit-identical run (None → fresh seed)
+    rngs  = RngService(seed)
+    place = rngs.stream("spawn")  # flower placement and spawning
     rows, cols = humanity.shape # world boundary
-    prm        = load_params(args.params)
-
 
 #.get(key, default) means the simulation still runs if the CSV
 #omits a field (it falls back to the default in the second argument).
     steps   = int(prm.get("steps",            200))
     n_bees  = int(prm.get("num_bees",         10))
     n_flwr  = int(prm.get("num_flower",       30))
-    n_wasps = int(prm.get("num_wasp",          1))
+    n_wasps = int(prm.get("num_wasp",          0))   # autonomous wasps
     grow_p  = float(prm.get("spawn_flower_p",  0.02))
-
-    beeholdspawn  = (10, 7)    # start cell in the hive
-    beeholdexit   = (0, 7)     # hive> world portal
-    beeholdentrance    = (19, 7)   # world > hive portal
-    humanityentrance   = (rows - 1, cols // 2)   # matching cell on world grid
-
-    genes = {(r, c) for r in range(rows)
-                     for c in range(cols)
-                     if humanity[r, c] in (0, 3, 15)}  # <-- grass (10) is walkable
-    # collets the coordinates of blocked tiles
-    # grass cells = 10 they are walkable so excluded.
+    regrow  = int(prm.get("flower_regrow",     0))   # 1 → flowers regrow nectar
+    if regrow and engine == "vector":
+        raise ValueError("flower_regrow needs the object engine")
+
+    beeholdspawn  = layout["spawn"]       # start cell in the hive
+    beeholdexit   = layout["exit"]        # hive> world portal
+    beeholdentrance    = layout["entrance"]   # world > hive portal
+    humanityentrance   = layout["world_entrance"]   # matching cell on world grid
+    # the hive's walkability grid; the classic 20 x 15 hive shares the
+    # module-wide one (and its cached flow fields)
+    hivegrid = HIVEGRID
+    if layout["hive_shape"] != HIVEGRID.shape:
+        hivegrid = WorldGrid.open(layout["hive_shape"])
+
+    genes = WorldGrid.from_terrain(humanity)  # <-- grass (10) is walkable
+    # walkability bitmap: water (0), trees (3) and the house (15) are blocked,
+    # grass cells = 10 are walkable.  `pos in genes` still means "obstacle".
 
 #Creates IDs B1 … Bn, all starting at (10,7) inside the hive and given the four portal coordinates.
-    bees = [] #
-    for i in range(1, n_bees + 1):
-        bees.append(Worker("B" + str(i), beeholdspawn,
-                           beeholdexit, beeholdentrance, humanityentrance))
-
-# A while loop keeps picking random cells until it has the requested n_flwr flowers, rejecting any cell in genes.
+# the workers live in an Arena: dead ones are compacted away every
+# COMPACT_EVERY ticks, so the per-tick stats only walk the living
+    bees = Arena()
+    if engine == "object":
+        for i in range(1, n_bees + 1):
+            bees.append(Worker("B" + str(i), beeholdspawn,
+                               beeholdexit, beeholdentrance, humanityentrance,
+                               rng=rngs, hive=hivegrid))
+
+# the grass cells without a flower on them: the n_flwr starting flowers
+# are drawn from it in one go, one cell per flower (fewer flowers if the
+# field has fewer free cells)
+    vacant = FreeCells.from_grid(genes)
     flowers = []
-    while len(flowers) < n_flwr:
-        pos = rand_cell(rows, cols)
-        if pos not in genes:  # obstacle check
-            name = "F" + str(len(flowers) + 1)  # build the ID without f-string
-            flowers.append(Flower(name, pos))
-
-#Three comb objects are created at fixed hive positions and
-# immediately .build()-ed (they start empty but ready to receive honey).
-    combs = [Comb("C1", (7, 7)),
-             Comb("C2", (7, 9)),
-             Comb("C3", (9, 7))]
+    born = count()      # the flowers' creation numbers (regrowth order)
+    for pos in vacant.draw_many(n_flwr, place):
+        name = "F" + str(len(flowers) + 1)  # build the ID without f-string
+        flowers.append(Flower(name, pos, rng=rngs, born=next(born)))
+
+# spatial index over the flowers so bees only look at nearby buckets
+    floweridx = FlowerIndex(cellsize=5)
+    floweridx.rebuild(flowers)
+
+# the wasps start on random free cells (a wasp does not use up its cell)
+# and hunt as one swarm: every tick all of them sting, pick distinct
+# bees, move and sting again in one batched pass
+    wasps = None
+    if n_wasps > 0:
+        spots = [vacant.pick(place) for _ in range(n_wasps)]
+        wasps = WaspSwarm([pos for pos in spots if pos is not None], genes)
+
+#The comb objects are created at the layout's hive positions (three by
+# default) and immediately .build()-ed (they start empty but ready to receive honey).
+    combs = [Comb("C" + str(i + 1), pos) for i, pos in enumerate(layout["combs"])]
     for c in combs:
         c.build()
-
-    nectar_log, alive_log = [], []
+    # levels and the non-full comb index of the object engine
+    combstore = CombStore(combs)
+
+# running counts of the object engine's colony: bees and flowers report
+# their own changes, so a stats row reads counters instead of scanning;
+# with wasps it also keeps the bees' cells as arrays for them
+    tracked = n_wasps > 0 and engine == "object"
+    colony = Colony(combstore, track=tracked)
+    colony.rebuild(bees, flowers)
+
+# flow fields towards the fixed targets every bee shares, built once per
+# terrain so the next step home / to the exit / to a comb is one lookup
+    genes.flows.pin(humanityentrance)
+    hivegrid.flows.pin(beeholdexit)
+    for c in combs:
+        hivegrid.flows.pin(c.posrawhoney)
+
+# vector engine: the same colony as arrays, drawing from its own stream
+    swarm = None
+    if engine == "vector":
+        swarm = Swarm(n_bees, beeholdspawn, beeholdexit, beeholdentrance,
+                      humanityentrance, ~genes.walkable, combs,
+                      hive_shape=hivegrid.shape, rng=rngs.stream("swarm").gen)
+        for fl in flowers:
+            swarm.add_flower(fl.pos, fl.muj)
+
+    start = 0
     total_nectar = 0
-
-    for step in range(steps):
-        if random.random() < grow_p: # Random flower spawn – with probability grow_p (2 % by default)
-            pos = rand_cell(rows, cols) # a new flower is added in a random free cell.
-            if pos not in genes:
+    last = None     # latest stats row (the sinks hold the history)
+    if resume is not None:
+        # overwrite the freshly built colony with the saved one; the RNG
+        # state goes last, after every constructor above has drawn
+        start = meta["step"] + 1
+        total_nectar = meta["total_nectar"]
+        last = meta["last"]
+        if swarm is not None:
+            checkpoint.restore_swarm(data, swarm)
+        else:
+            bees = Arena(checkpoint.restore_workers(data, lambda ID, pos, ex, en, ho:
+                Worker(ID, pos, ex, en, ho, rng=rngs, hive=hivegrid)))
+        flowers = checkpoint.restore_flowers(data, lambda ID, pos, golden, n:
+            Flower(ID, pos, golden, rng=rngs, born=n))
+        born = count(checkpoint.next_born(flowers))
+        floweridx.rebuild(flowers)
+        checkpoint.restore_combs(data, combs)
+        vacant = FreeCells.from_grid(genes)
+        checkpoint.restore_free(data, vacant)
+        if wasps is not None:
+            checkpoint.restore_wasps(data, wasps)
+        combstore.rebuild()
+        colony.rebuild(bees, flowers)
+        colony.nectar = total_nectar
+        rngs.set_state(meta["rng"])
+
+# event scheduler: timers (bee rest, flower regrowth) become "wake me at
+# tick T" events, and the roster only holds bees with something to do,
+# so resting and dead bees cost nothing per tick
+    sched  = Scheduler(start - 1)   # tick -1 = set-up
+    roster = Roster()
+    for b in bees:
+        roster.add(b)
+    if resume is None:
+        if regrow:
+            for fl in flowers:
+                fl.arm(sched)
+    else:
+        # re-post the pending events: sleepers' wake-ups, flower regrowth
+        roster.keep(lambda b: b.alive and not b.resttime)
+        for b in bees:
+            if b.wake_at is not None:
+                sched.at(b.wake_at, b.wake, roster)
+        if regrow:
+            for fl in flowers:
+                fl.sched = sched
+                if fl.due is not None:
+                    sched.at_ranked(fl.due, fl.born, fl._regrow, fl.due)
+
+    # save() – snapshot at the end of tick `step`
+    # the sinks are flushed first, so their files hold exactly the rows up
+    # to `step` and a resume can append right after them
+    def save(step):
+        for sink in sinks:
+            sink.flush()
+        meta = _meta(step, total_nectar, last, prm, engine, rngs, humanity)
+        arrays = checkpoint.pack_workers(bees)
+        arrays.update(checkpoint.pack_flowers(flowers))
+        arrays.update(checkpoint.pack_combs(combs))
+        arrays.update(checkpoint.pack_free(vacant))
+        if swarm is not None:
+            arrays.update(checkpoint.pack_swarm(swarm))
+        if wasps is not None:
+            arrays.update(checkpoint.pack_wasps(wasps))
+        checkpoint.save(ckpt, meta, arrays)
+
+    if wasps is not None:
+        observers = _with_wasps(observers, wasps)
+
+    for step in range(start, steps):
+        prof.begin(step)
+        sched.advance(step)     # wake bees / regrow flowers due this tick
+        prof.lap("events")
+
+        if place.random() < grow_p: # Random flower spawn – with probability grow_p (2 % by default)
+            pos = vacant.draw(place) # a new flower is added in a random free cell.
+            if pos is not None:      # None → every grass cell has a flower
                 flower_id = "F" + str(len(flowers) + 1)  # build name without f-string
-                flowers.append(Flower(flower_id, pos))
+                flowers.append(Flower(flower_id, pos, rng=rngs, born=next(born)))
+                floweridx.add(flowers[-1])
+                colony.plant(flowers[-1])
+                if regrow:
+                    flowers[-1].arm(sched)
+                if swarm is not None:
+                    swarm.add_flower(pos, flowers[-1].muj)
+        prof.lap("spawn")
+
+        if wasps is not None:   # sting → chase → sting, the stung bees die
+            if swarm is not None:
+                hit = wasps.step(swarm.r, swarm.c, swarm.alive & ~swarm.inhoneyhold)
+                swarm.alive[hit] = False
+            else:               # the colony's per-slot arrays, no bee loop
+                hit = wasps.step(*colony.prey())
+                for slot in np.flatnonzero(hit):
+                    bees.slots[slot].die()
+        prof.lap("wasps")
+
+        if swarm is not None:
+            total_nectar += swarm.step()   # whole swarm in one batched tick
+        else:
+            for b in roster:
+                b.step_change(combs, flowers, genes, (rows, cols), floweridx,
+                              combstore) # each bee moves (deposits are counted by the colony)
+                if tracked:
+                    colony.moved(b)      # its cell for the wasps
+                b.sleep(sched, roster)   # resting → wake-up event instead of countdown
+            total_nectar = colony.nectar
+            roster.keep(lambda b: b.alive and not b.resttime)
+            if step % COMPACT_EVERY == COMPACT_EVERY - 1:
+                for b in bees.compact():     # release the dead bees' slots
+                    roster.forget(b)
+        prof.lap("workers")
+
+#Stats – one row per step (cumulative nectar, bees alive, outdoors, carrying,
+# full combs, flowers with nectar), streamed to the sinks in chunks
+        if swarm is not None:
+            row = (step, total_nectar) + swarm.census()
+        else:
+            row = (step, total_nectar) + colony.census()
+        for sink in sinks:
+            sink.append(row)
+        last = dict(zip(COLUMNS, row))
+        prof.lap("stats")
+        for observe in observers:
+            observe(step, bees, combs, flowers, swarm)
+        prof.lap("observers")
+
+        if ckpt and ((every and (step + 1) % every == 0) or _snapshot_now):
+            _snapshot_now = False
+            save(step)
+        prof.lap("checkpoint")
+        prof.end()
+
+    if swarm is not None:
+        swarm.sync_combs()   # mirror the array levels into the Comb objects
+
+    for sink in sinks:
+        sink.flush()
+    return last
 
+# -f / --field → file with the terrain matrix (house, pool, etc.)
+# -p / --params → file with simulation parameters (steps, bee count, …)
+# --csv → optional file where stats will be saved
+def main():
+    # create argument parser to handle command line arguments
+    ap = argparse.ArgumentParser(description="Bee-World batch mode")
 
-        for b in bees:
-            had_muj = b.hasmuj
-            b.step_change(combs, flowers, genes, (rows, cols)) # each bee moves
-            if had_muj and not b.hasmuj:
-                total_nectar += 1 #If a bee unloaded nectar this turn (had_muj→not b.hasmuj) we increment total_nectar.
+    # Define a required argument "-f" or "--field" for specifying the terrain file path
+    ap.add_argument("-f", "--field",  required=True,
+                    help="terrain: world file (see terrain.py), .npy or CSV")
+
+    #  # Define an argument "-p" or "--params" for specifying parameter CSV file path
+    # (required unless --resume, which takes the parameters from the snapshot)
+    ap.add_argument("-p", "--params", help="parameter CSV")
 
-#Logs – append the cumulative nectar count and the number of bees still alive to two lists (nectar_log, alive_log).
-        nectar_log.append(total_nectar)
-        alive_log.append(sum(b.alive for b in bees))
+    # Define an optional argument "--csv" for specifying an output CSV file for statistics
+    ap.add_argument("--csv", help="optional stats CSV")
+
+    # compact binary columnar stats with every column (statsink.COLUMNS);
+    # both files are written in chunks of --chunk rows while the run goes
+    ap.add_argument("--stats", help="optional binary stats file (all columns)")
+    ap.add_argument("--chunk", type=int, default=1000,
+                    help="stats rows buffered per write (default: 1000)")
+
+    # headless export: hive + world panels of every step rendered with Agg
+    # on a process pool (--jobs), as PNG frames and/or one video file
+    ap.add_argument("--frames", help="directory for PNG frames")
+    ap.add_argument("--video", help="video file (.gif, or .mp4 etc. via ffmpeg)")
+    ap.add_argument("--fps", type=int, default=10,
+                    help="video frames per second (default: 10)")
+
+    # trajectory trace: every tick's agent state in a memory-mapped file,
+    # replayed with  python trajectory.py FILE
+    ap.add_argument("--trace", help="trajectory trace file to record")
+
+    # profiler: time per tick phase + hot-path counters, summary on exit
+    ap.add_argument("--profile", action="store_true",
+                    help="print a per-phase profile of the run")
+    ap.add_argument("--profile-trace", help="per-tick profile CSV "
+                                            "(implies --profile)")
+
+    # "object" steps one Worker at a time, "vector" keeps the whole swarm
+    # in NumPy arrays and advances every bee in one batched update, "full"
+    # runs the interactive ruleset (queen, wasps, seasons) headless
+    ap.add_argument("--engine", choices=("object", "vector", "full"), default="object",
+                    help="worker engine (default: object)")
+
+    # seed of the run's RngService, so a run can be repeated exactly
+    ap.add_argument("--seed", type=int, help="random seed (default: fresh)")
+    ap.add_argument("--ensemble", type=int, help="run this many replicas of "
+                    "the scenario together in the vector engine (see ensemble.py)")
+    ap.add_argument("--bands", help="ensemble: per-step mean / percentile CSV "
+                                    "(--csv gets the per-replica series)")
+    ap.add_argument("--tiles", type=int, help="split the world into this many "
+                    "row bands, one process each (see tiles.py)")
+
+    # checkpoints: snapshot the whole run every N ticks (and whenever the
+    # process gets SIGUSR1), and continue a run from such a snapshot
+    ap.add_argument("--checkpoint", help="checkpoint file to write")
+    ap.add_argument("--every", type=int, default=0,
+                    help="ticks between checkpoints (default: only on SIGUSR1)")
+    ap.add_argument("--resume", help="checkpoint file to continue from")
+
+    # parameter sweep: many scenarios x replicate seeds on a process pool
+    ap.add_argument("--sweep", help="sweep grid CSV: key,value1;value2;...")
+    ap.add_argument("--sweep-list", help="sweep list CSV: header row of "
+                                         "keys, one parameter set per row")
+    ap.add_argument("--replicates", type=int, default=1,
+                    help="seeds per parameter set in a sweep (default: 1)")
+    ap.add_argument("--jobs", type=int, help="sweep worker processes "
+                                             "(default: all cores)")
+
+    # Parse the provided arguments from the command-line and store them in 'args'
+    args = ap.parse_args()
+    if not args.params and not args.resume:
+        ap.error("the following arguments are required: -p/--params")
+
+    if args.sweep or args.sweep_list:   # fan the scenarios out instead
+        bad = [flag for flag, on in (("--resume", args.resume),
+                                     ("--checkpoint", args.checkpoint),
+                                     ("--trace", args.trace),
+                                     ("--frames/--video", args.frames or args.video),
+                                     ("--profile", args.profile or args.profile_trace),
+                                     ("--stats", args.stats),
+                                     ("--tiles", args.tiles),
+                                     ("--ensemble", args.ensemble is not None))
+               if on]
+        if bad:
+            ap.error("a sweep does not support " + ", ".join(bad))
+        if not args.csv:
+            ap.error("a sweep needs --csv for the combined results table")
+        sweep.main(args)
+        return
+
+    if args.ensemble is not None:       # K replicas in one array state
+        if args.ensemble < 1:
+            ap.error("--ensemble needs at least one replica")
+        bad = [flag for flag, on in (("--checkpoint", args.checkpoint),
+                                     ("--resume", args.resume),
+                                     ("--trace", args.trace),
+                                     ("--frames/--video", args.frames or args.video),
+                                     ("--profile", args.profile or args.profile_trace),
+                                     ("--stats", args.stats),
+                                     ("--tiles", args.tiles))
+               if on]
+        if bad:
+            ap.error("--ensemble does not support " + ", ".join(bad))
+        if not args.csv and not args.bands:
+            ap.error("an ensemble needs --csv and/or --bands for its results")
+        import ensemble
+        try:
+            ensemble.main(args)
+        except ValueError as err:
+            ap.error(str(err))
+        return
+
+    if args.tiles:                      # domain-decomposed run instead
+        bad = [flag for flag, on in (("--engine " + args.engine, args.engine != "object"),
+                                     ("--checkpoint", args.checkpoint),
+                                     ("--resume", args.resume),
+                                     ("--trace", args.trace),
+                                     ("--frames/--video", args.frames or args.video),
+                                     ("--profile", args.profile or args.profile_trace))
+               if on]
+        if bad:
+            ap.error("--tiles does not support " + ", ".join(bad))
+        import tiles
+        tiles.main(["-f", args.field, "-p", args.params, "--tiles", str(args.tiles),
+                    "--chunk", str(args.chunk)]
+                   + (["--seed", str(args.seed)] if args.seed is not None else [])
+                   + (["--csv", args.csv] if args.csv else [])
+                   + (["--stats", args.stats] if args.stats else []))
+        return
+
+# terrain.load() maps a binary world file (or a .npy array) straight
+# from disk and reads its hive layout; a classic CSV goes through
+# np.loadtxt() and gets the default layout
+    humanity, layout = terrain.load(args.field)
+    prm        = load_params(args.params) if args.params else None
+    resume     = checkpoint.load(args.resume) if args.resume else None
+    # a resumed run keeps the engine it was started with
+    engine     = resume[0]["engine"] if resume is not None else args.engine
+    if args.checkpoint and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, request_checkpoint)
+
+    # stats sinks: the CSV keeps the classic step,nectar,bees_alive columns
+    # (header line, then "%d,%d,%d" rows); a resumed run cuts each file back
+    # to the checkpoint's step and appends from there
+    observers = []
+    recorder = None
+    if args.frames or args.video:
+        import export                     # pulls in matplotlib only when asked
+        if args.video:
+            try:
+                export.check_video(args.video)
+            except ValueError as err:
+                ap.error(str(err))
+        recorder = export.Recorder()
+        observers.append(recorder)
+    sinks = []
+    tracer = None
+    prof = None
+    if args.profile or args.profile_trace:
+        prof = Profiler(simulation.PHASES if engine == "full" else PHASES,
+                        args.profile_trace)
+    try:
+        if args.trace:
+            run = resume[0]["prm"] if resume is not None else prm
+            rows, cols = humanity.shape
+            steps = int(run.get("steps", 200))
+            n_bees = int(run.get("num_bees", 10))
+            n_flwr = int(run.get("num_flower", 30))
+            wasps = int(run.get("num_wasp", 0))
+            # one flower can spawn per tick, bees never do in batch mode …
+            if engine == "full":
+                # … except with the queen, who lays one every 30 ticks;
+                # the season may also start with more flowers
+                n_bees += steps // 30 + 1
+                n_flwr = max(n_flwr, simulation.SEASONS["summer"][0])
+                wasps = int(run.get("num_wasp", 1)) + int(run.get("manual_wasp", 0))
+            tracer = trajectory.TraceWriter(
+                args.trace, humanity, layout["world_entrance"], steps, n_bees,
+                n_flwr + steps, wasps, layout["hive_shape"])
+            observers.append(tracer)
+        for path, Sink in ((args.csv, CsvSink), (args.stats, BinSink)):
+            if path:
+                rows = None
+                if resume is not None and os.path.exists(path):
+                    rows = resume[0]["step"] + 1
+                sinks.append(Sink(path, args.chunk, rows))
+        last = simulate(humanity, prm, engine, args.seed,
+                        args.checkpoint, args.every, resume, sinks, observers,
+                        prof, layout)
+    except ValueError as err:
+        ap.error(str(err))
+    finally:
+        for sink in sinks:
+            sink.close()
+        if tracer is not None:
+            tracer.close()
+        if prof is not None:
+            prof.close()
+    last = last or {"step": -1, "nectar": 0, "bees_alive": 0}
 
     # print
-    print("Batch finished –", steps,
-          "steps; nectar collected:", total_nectar,
-          "; bees alive:", alive_log[-1])
-
-    if args.csv:    # ← Only run this block if the user gave a --csv filename
-    # Build a 2-D array with three columns:
-    #   column-0: step number   (0..steps-1)
-    #   column-1: nectar count  (how many bees carried nectar that step)
-    #   column-2: alive count   (how many bees are still alive)
-
-        out = np.column_stack((range(steps), nectar_log, alive_log)) # step counter, nectar history, alive bee history
-
-    # Write that array to disk in plain-text CSV format:
-    #   • fmt="%d,%d,%d"        → 3 integers separated by commas
-    #   • header="..."          → first line = column labels
-    #   • comments=""           → don’t prepend the header with a '#'
-        np.savetxt(args.csv, out, fmt="%d,%d,%d",
-                   header="step,nectar,bees_alive", comments="")
-        print("Stats saved to", args.csv)  # tell the user where the file went
+    print("Batch finished –", last["step"] + 1,
+          "steps; nectar collected:", last["nectar"],
+          "; bees alive:", last["bees_alive"])
+
+    for path in (args.csv, args.stats):
+        if path:
+            print("Stats saved to", path)  # tell the user where the file went
+    if prof is not None:
+        print(prof.report())
+        if args.profile_trace:
+            print("Per-tick profile saved to", args.profile_trace)
+
+    if recorder is not None and recorder.frames:
+        outdir = args.frames or tempfile.mkdtemp(prefix="beeworld_frames_")
+        paths = export.export_frames(recorder, humanity, layout["world_entrance"],
+                                     outdir, args.jobs,
+                                     hive_shape=layout["hive_shape"])
+        if args.frames:
+            print(len(paths), "frames saved to", args.frames)
+        if args.video:
+            try:
+                export.make_video(paths, args.video, args.fps)
+            finally:
+                if not args.frames:
+                    shutil.rmtree(outdir)
+            print("Video saved to", args.video)
 
 if __name__ == "__main__": # ← True only when executed, not imported
     main()                 # ← kick off the whole program
@@ -0,0 +1,268 @@
+# scaling benchmarks for the simulation core
+import argparse, itertools, json, os, platform, subprocess, time, tracemalloc
+import numpy as np
+from worker  import Worker
+from flowers import Flower
+from comb    import Comb
+from combstore import CombStore
+from wasp    import Wasp
+from waspswarm import WaspSwarm
+from Queenbee import QueenBee
+from flowerindex import FlowerIndex
+from worldgrid import WorldGrid
+from beehash import BeeHash
+from rngservice import RngService
+import beeworld_batchmode as batch
+
+# Every benchmark is a (component, bees, flowers, world scale, steps)
+# case.  A case is timed `repeat` times (best run counts) and then run
+# once more under tracemalloc for its peak memory – tracing slows Python
+# down, so it never touches the timings.  Results are appended as one
+# JSON line per suite run to a history file, tagged with the git commit,
+# and compared against the last run that measured the same case.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HISTORY = os.path.join(HERE, "bench_history.jsonl")
+COMPONENTS = ("worker", "flower", "wasp", "queen", "batch-object", "batch-vector",
+              "batch-full", "wasp-swarm")
+
+HIVE_SPAWN, HIVE_EXIT, HIVE_ENTRANCE = (10, 7), (0, 7), (19, 7)
+
+
+# world() – world.csv tiled `scale` times in each direction
+def world(scale, field=os.path.join(HERE, "world.csv")):
+    return np.tile(np.loadtxt(field, delimiter=","), (scale, scale))
+
+
+# _colony() – bees, flowers and combs on a world, as a batch run sets them up
+def _colony(humanity, n_bees, n_flwr, rngs):
+    rows, cols = humanity.shape
+    entrance = (rows - 1, cols // 2)
+    genes = WorldGrid.from_terrain(humanity)
+    place = rngs.stream("spawn")
+    bees = [Worker("B" + str(i), HIVE_SPAWN, HIVE_EXIT, HIVE_ENTRANCE, entrance,
+                   rng=rngs) for i in range(n_bees)]
+    flowers = []
+    while len(flowers) < n_flwr:
+        pos = batch.rand_cell(rows, cols, place)
+        if pos not in genes:
+            flowers.append(Flower("F" + str(len(flowers)), pos, rng=rngs))
+    combs = [Comb("C1", (7, 7)), Comb("C2", (7, 9)), Comb("C3", (9, 7))]
+    for c in combs:
+        c.build()
+    return genes, bees, flowers, combs, place
+
+
+# Each case function sets up, then returns (tick function, agents per
+# tick); only the tick calls are timed.
+
+def _case_worker(humanity, n_bees, n_flwr, steps, rngs):
+    genes, bees, flowers, combs, _ = _colony(humanity, n_bees, n_flwr, rngs)
+    idx = FlowerIndex(cellsize=5)
+    idx.rebuild(flowers)
+    store = CombStore(combs)
+    frame = humanity.shape
+    def tick(t):
+        for b in bees:
+            b.step_change(combs, flowers, genes, frame, idx, store)
+    return tick, n_bees
+
+
+def _case_flower(humanity, n_bees, n_flwr, steps, rngs):
+    _, _, flowers, _, _ = _colony(humanity, 0, n_flwr, rngs)
+    for fl in flowers:
+        fl.muj = 0                 # every flower regrows during the run
+    def tick(t):
+        for fl in flowers:
+            fl.step_changes()
+    return tick, n_flwr
+
+
+# one wasp hunting `n_bees` bees scattered over the world (the bees
+# stand still, so the wasp's search and sting dominate)
+def _case_wasp(humanity, n_bees, n_flwr, steps, rngs):
+    genes, bees, _, _, place = _colony(humanity, n_bees, 0, rngs)
+    rows, cols = humanity.shape
+    for b in bees:
+        b.inhoneyhold = False
+        b.pos = batch.rand_cell(rows, cols, place)
+        while b.pos in genes:
+            b.pos = batch.rand_cell(rows, cols, place)
+    beehash = BeeHash(cellsize=4)
+    for b in bees:
+        beehash.register(b)
+    wasp = Wasp("wasp", (rows // 2, cols // 2))
+    def tick(t):
+        wasp.step_change(bees, (rows, cols), genes, beehash)
+    return tick, 1
+
+
+# the same scattered bees hunted by a swarm of SWARM_WASPS wasps in one
+# batched pass per tick (stings, target assignment, pursuit); the stung
+# bees are not removed, so every tick costs the same
+SWARM_WASPS = 100
+
+def _case_wasp_swarm(humanity, n_bees, n_flwr, steps, rngs):
+    genes, bees, _, _, place = _colony(humanity, n_bees, 0, rngs)
+    rows, cols = humanity.shape
+    br, bc = [], []
+    for b in bees:
+        pos = batch.rand_cell(rows, cols, place)
+        while pos in genes:
+            pos = batch.rand_cell(rows, cols, place)
+        br.append(pos[0])
+        bc.append(pos[1])
+    br, bc = np.array(br), np.array(bc)
+    prey = np.ones(n_bees, dtype=bool)
+    spots = []
+    while len(spots) < SWARM_WASPS:
+        pos = batch.rand_cell(rows, cols, place)
+        if pos not in genes:
+            spots.append(pos)
+    wasps = WaspSwarm(spots, genes)
+    def tick(t):
+        wasps.step(br, bc, prey)
+    return tick, SWARM_WASPS
+
+
+def _case_queen(humanity, n_bees, n_flwr, steps, rngs):
+    genes, bees, _, combs, _ = _colony(humanity, n_bees, 0, rngs)
+    queen = QueenBee("queen", HIVE_SPAWN, HIVE_EXIT, HIVE_ENTRANCE,
+                     (humanity.shape[0] - 1, humanity.shape[1] // 2), rng=rngs)
+    queen.max_age = steps + 1      # keep her laying for the whole run
+    def tick(t):
+        queen.step_change(combs, bees, genes)
+    return tick, 1
+
+
+def _batch(engine):
+    def case(humanity, n_bees, n_flwr, steps, rngs):
+        prm = {"steps": steps, "num_bees": n_bees, "num_flower": n_flwr}
+        def tick(t):               # the whole run is one "tick"
+            batch.simulate(humanity, prm, engine, rngs.seed)
+        return tick, n_bees
+    return case
+
+
+CASES = {"worker": _case_worker, "flower": _case_flower, "wasp": _case_wasp,
+         "queen": _case_queen, "batch-object": _batch("object"),
+         "batch-vector": _batch("vector"), "batch-full": _batch("full"),
+         "wasp-swarm": _case_wasp_swarm}
+
+
+# run_case() – timings and peak memory of one case
+def run_case(component, n_bees, n_flwr, scale, steps, repeat=3, seed=0):
+    humanity = world(scale)
+    ticks = 1 if component.startswith("batch") else steps
+    best = None
+    for _ in range(repeat):
+        tick, agents = CASES[component](humanity, n_bees, n_flwr, steps,
+                                        RngService(seed))
+        t0 = time.perf_counter()
+        for t in range(ticks):
+            tick(t)
+        secs = time.perf_counter() - t0
+        best = secs if best is None else min(best, secs)
+
+    tracemalloc.start()
+    tick, agents = CASES[component](humanity, n_bees, n_flwr, steps, RngService(seed))
+    for t in range(ticks):
+        tick(t)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"component": component, "bees": n_bees, "flowers": n_flwr,
+            "scale": scale, "world": list(humanity.shape), "steps": steps,
+            "seconds": round(best, 6),
+            "ticks_per_s": round(steps / best, 2) if best else None,
+            "us_per_agent": round(1e6 * best / (steps * max(agents, 1)), 3),
+            "peak_kb": round(peak / 1024, 1)}
+
+
+def _key(r):
+    return (r["component"], r["bees"], r["flowers"], r["scale"], r["steps"])
+
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               cwd=HERE, capture_output=True, text=True).stdout
+        return out.stdout.strip() + ("+dirty" if dirty.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# load_history() – every recorded suite run, oldest first
+def load_history(path=HISTORY):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# previous() – case key → result of the latest earlier run that had it
+def previous(history):
+    out = {}
+    for run in history:
+        for r in run["results"]:
+            out[_key(r)] = dict(r, commit=run["commit"])
+    return out
+
+
+def _ints(text):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bee-World scaling benchmarks")
+    ap.add_argument("--components", default=",".join(COMPONENTS),
+                    help="comma list of " + ", ".join(COMPONENTS))
+    ap.add_argument("--bees", default="10,100,1000", help="bee counts")
+    ap.add_argument("--flowers", default="30,300", help="flower counts")
+    ap.add_argument("--scale", default="1,2", help="world.csv tiling factors")
+    ap.add_argument("--steps", default="100", help="step counts")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    ap.add_argument("--quick", action="store_true",
+                    help="small smoke sweep (10,100 bees; 30 flowers; scale 1; 50 steps)")
+    ap.add_argument("--history", default=HISTORY, help="history file (JSON lines)")
+    ap.add_argument("--no-save", action="store_true", help="don't append to history")
+    args = ap.parse_args()
+    if args.quick:
+        args.bees, args.flowers, args.scale, args.steps = "10,100", "30", "1", "50"
+
+    comps = [c.strip() for c in args.components.split(",") if c.strip()]
+    for c in comps:
+        if c not in CASES:
+            ap.error("unknown component " + c)
+
+    before = previous(load_history(args.history))
+    results = []
+    print("%-13s %6s %7s %5s %6s %12s %12s %10s %8s" % (
+        "component", "bees", "flowers", "scale", "steps", "ticks/s",
+        "us/agent", "peak KB", "vs last"))
+    for comp, nb, nf, sc, st in itertools.product(
+            comps, _ints(args.bees), _ints(args.flowers), _ints(args.scale),
+            _ints(args.steps)):
+        r = run_case(comp, nb, nf, sc, st, args.repeat)
+        results.append(r)
+        old = before.get(_key(r))
+        change = ""
+        if old and old["seconds"]:
+            change = "%+.1f%%" % (100.0 * (r["seconds"] - old["seconds"]) / old["seconds"])
+        print("%-13s %6d %7d %5d %6d %12.1f %12.3f %10.1f %8s" % (
+            comp, nb, nf, sc, st, r["ticks_per_s"] or 0, r["us_per_agent"],
+            r["peak_kb"], change), flush=True)
+
+    if not args.no_save:
+        run = {"commit": _commit(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "python": platform.python_version(), "numpy": np.__version__,
+               "machine": platform.machine(), "results": results}
+        with open(args.history, "a") as f:
+            f.write(json.dumps(run) + "\n")
+        print("History appended to", args.history)
+
+
+if __name__ == "__main__":
+    main()
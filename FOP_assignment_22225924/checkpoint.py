@@ -0,0 +1,181 @@
+import json, os
+from itertools import chain
+from operator import attrgetter
+import numpy as np
+
+# Checkpoint files are plain NumPy .npz archives: one array per field
+# ("worker.age", "flower.muj", ...) plus a JSON "meta" string for scalars
+# and the RNG state.  Nothing is pickled – np.load(allow_pickle=False)
+# reads them back – and an array-backed engine (Swarm) is dumped as is,
+# so even 10^5 agents take milliseconds to write.
+
+# attribute → column dtype of each agent table
+WORKER_FIELDS = {"age": np.int64, "max_age": np.int64, "inhoneyhold": bool,
+                 "hasmuj": bool, "depositing": bool, "resttime": np.int64,
+                 "alive": bool, "aimrange": np.int64}
+FLOWER_FIELDS = {"golden": bool, "muj": np.int64, "primemuj": np.int64,
+                 "mujcomeback": np.int64, "born": np.int64}
+COMB_FIELDS   = {"built": bool, "rawhoneylvl": np.int64,
+                 "maxrawhoneyy": np.int64, "fullrawhoneyy": bool}
+SWARM_FIELDS  = ("r", "c", "age", "max_age", "inhoneyhold", "hasmuj",
+                 "depositing", "alive", "resttime", "_nectar", "comb_lvl",
+                 "comb_full")
+WASP_FIELDS   = ("r", "c", "alive")
+QUEEN_FIELDS  = {"age": np.int64, "max_age": np.int64, "spawn_cd": np.int64,
+                 "alive": bool}
+
+
+# _col() – one attribute of every object as a typed column; fromiter
+# with a fixed dtype skips NumPy's type guessing over 10^5 items
+def _col(objs, name, dtype):
+    return np.fromiter(map(attrgetter(name), objs), dtype, len(objs))
+
+
+def _cells(objs, name):     # (row, col) attribute → (n, 2) int array
+    flat = chain.from_iterable(map(attrgetter(name), objs))
+    return np.fromiter(flat, np.int64, 2 * len(objs)).reshape(-1, 2)
+
+
+# ----------------------------------------------------------------------
+# packing: objects → dict of arrays
+# ----------------------------------------------------------------------
+
+def pack_workers(bees):
+    out = {"worker." + f: _col(bees, f, t) for f, t in WORKER_FIELDS.items()}
+    out["worker.ID"]   = np.array([b.ID for b in bees], dtype=str)
+    out["worker.pos"]  = _cells(bees, "pos")
+    out["worker.exit"] = _cells(bees, "honeyholdexit")
+    out["worker.entr"] = _cells(bees, "honeyholdentrance")
+    out["worker.home"] = _cells(bees, "humanityentrance")
+    # pending wake-up tick of sleeping bees (-1 → awake)
+    out["worker.wake_at"] = np.array([-1 if b.wake_at is None else b.wake_at
+                                      for b in bees], dtype=np.int64)
+    return out
+
+
+def pack_flowers(stacies):
+    out = {"flower." + f: _col(stacies, f, t) for f, t in FLOWER_FIELDS.items()}
+    out["flower.ID"]  = np.array([fl.ID for fl in stacies], dtype=str)
+    out["flower.pos"] = _cells(stacies, "pos")
+    out["flower.due"] = np.array([-1 if fl.due is None else fl.due
+                                  for fl in stacies], dtype=np.int64)
+    return out
+
+
+def pack_combs(hexslot):
+    out = {"comb." + f: _col(hexslot, f, t) for f, t in COMB_FIELDS.items()}
+    out["comb.ID"]  = np.array([c.ID for c in hexslot], dtype=str)
+    out["comb.pos"] = _cells(hexslot, "posrawhoney")
+    return out
+
+
+def pack_swarm(swarm):
+    return {"swarm." + f: getattr(swarm, f) for f in SWARM_FIELDS}
+
+
+def pack_wasps(wasps):
+    return {"wasp." + f: getattr(wasps, f) for f in WASP_FIELDS}
+
+
+# the queen as step_change() would have her (call QueenBee.settle()
+# first when she runs on a scheduler)
+def pack_queen(eve):
+    return {"queen." + f: _col([eve], f, t) for f, t in QUEEN_FIELDS.items()}
+
+
+# the free-cell list in its exact order: a resumed run draws its flower
+# spots from the same list, so it picks the same cells
+def pack_free(free):
+    return {"free.cells": free.state()}
+
+
+# ----------------------------------------------------------------------
+# unpacking: write the saved state over freshly built objects
+# ----------------------------------------------------------------------
+
+def _cells_of(arr):      # (n, 2) array → list of (row, col) tuples
+    return list(map(tuple, arr.tolist()))
+
+
+# restore_workers() – `make(ID, pos, exit, entrance, home)` builds a bare
+# Worker; every saved field is then written over it
+def restore_workers(data, make):
+    bees = []
+    cols = {f: data["worker." + f].tolist() for f in WORKER_FIELDS}
+    wake = data["worker.wake_at"].tolist()
+    pos, ex, en, ho = (_cells_of(data["worker." + k])
+                       for k in ("pos", "exit", "entr", "home"))
+    for i, ID in enumerate(data["worker.ID"].tolist()):
+        b = make(ID, pos[i], ex[i], en[i], ho[i])
+        for f in WORKER_FIELDS:
+            setattr(b, f, cols[f][i])
+        b.wake_at = wake[i] if wake[i] >= 0 else None
+        bees.append(b)
+    return bees
+
+
+# restore_flowers() – `make(ID, pos, golden, born)` builds a bare Flower
+def restore_flowers(data, make):
+    stacies = []
+    cols = {f: data["flower." + f].tolist() for f in FLOWER_FIELDS}
+    due = data["flower.due"].tolist()
+    pos = _cells_of(data["flower.pos"])
+    for i, ID in enumerate(data["flower.ID"].tolist()):
+        fl = make(ID, pos[i], cols["golden"][i], cols["born"][i])
+        for f in FLOWER_FIELDS:
+            setattr(fl, f, cols[f][i])
+        fl.due = due[i] if due[i] >= 0 else None
+        stacies.append(fl)
+    return stacies
+
+
+# next_born() – first creation number free for the flowers a resumed run
+# spawns (they must rank after the restored ones)
+def next_born(stacies):
+    return max((fl.born for fl in stacies), default=-1) + 1
+
+
+def restore_combs(data, hexslot):
+    cols = {f: data["comb." + f].tolist() for f in COMB_FIELDS}
+    for i, c in enumerate(hexslot):
+        for f in COMB_FIELDS:
+            setattr(c, f, cols[f][i])
+
+
+def restore_swarm(data, swarm):
+    for f in SWARM_FIELDS:
+        getattr(swarm, f)[...] = data["swarm." + f]
+
+
+def restore_queen(data, eve):
+    for f in QUEEN_FIELDS:
+        setattr(eve, f, data["queen." + f].tolist()[0])
+
+
+def restore_wasps(data, wasps):
+    for f in WASP_FIELDS:
+        getattr(wasps, f)[...] = data["wasp." + f]
+
+
+def restore_free(data, free):
+    free.set_state(data["free.cells"])
+
+
+# ----------------------------------------------------------------------
+# files
+# ----------------------------------------------------------------------
+
+# save() – write arrays + meta (a JSON-able dict) atomically to `path`
+def save(path, meta, arrays):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+    os.replace(tmp, path)      # a crash mid-write never leaves half a file
+
+
+# load() – (meta dict, dict of arrays) from a checkpoint file
+def load(path):
+    with np.load(path, allow_pickle=False) as z:
+        data = {k: z[k] for k in z.files}
+    meta = json.loads(str(data.pop("meta")))
+    return meta, data
@@ -0,0 +1,167 @@
+import numpy as np
+
+
+class Colony:
+    """
+      Running head-count of a colony, kept current as things happen.
+
+      Workers and Flowers that were enlisted / planted here carry a
+      `colony` reference and report each change of state the moment it
+      happens – a bee dying (old age or a sting), crossing a portal,
+      picking up or depositing nectar, a flower running dry or regrowing.
+      The per-tick stats are then read straight off the counters instead
+      of looping over every bee and flower.  Full combs come from the
+      CombStore, which already counts them the same way.
+
+      rebuild() recounts everything from scratch (after a checkpoint
+      restore wrote the objects directly).
+
+      With `track` the colony also keeps every worker's cell, whether a
+      wasp can see it (alive and outdoors) and its colony order in
+      arrays indexed by Arena slot.  The loop reports each moved bee
+      (moved()), so the wasps read the whole colony as arrays without
+      walking the bee list (see prey()).
+
+      Parameters:
+      ##########
+      combstore : CombStore   the hive's comb store (None → no combs)
+      track     : bool        keep the per-slot position arrays
+      """
+
+    def __init__(self, combstore=None, track=False):
+        self.combstore = combstore
+        self.alive     = 0    # living workers
+        self.dead      = 0    # workers that died (old age or stung)
+        self.outdoors  = 0    # living workers out in the world
+        self.carrying  = 0    # living workers with a load of nectar
+        self.nectar    = 0    # loads deposited into the combs so far
+        self.blooming  = 0    # flowers with nectar left
+        self.wilted    = 0    # flowers drained since the last forget_wilted()
+
+        # per-slot arrays (only with track): cell, outdoors-and-alive,
+        # colony order; `size` slots are in use
+        self.track    = track
+        self.size     = 0
+        self.enlisted = 0     # colony order number of the next worker
+        self.r    = np.zeros(16 if track else 0, dtype=np.int64)
+        self.c    = np.zeros_like(self.r)
+        self.out  = np.zeros(len(self.r), dtype=bool)
+        self.rank = np.zeros_like(self.r)
+
+    # ------------------------------------------------------------------
+    # joining and leaving
+    # ------------------------------------------------------------------
+
+    # enlist() – count a (new or handed-over) worker from now on
+    def enlist(self, bee):
+        bee.colony = self
+        if self.track:
+            slot = bee.slot
+            while slot >= len(self.r):          # grow the arrays by doubling
+                self.r, self.c, self.out, self.rank = (
+                    np.concatenate([a, np.zeros_like(a)])
+                    for a in (self.r, self.c, self.out, self.rank))
+            self.size = max(self.size, slot + 1)
+            self.rank[slot] = self.enlisted
+            self.enlisted += 1
+            self.moved(bee)
+        if bee.alive:
+            self.alive    += 1
+            self.outdoors += not bee.inhoneyhold
+            self.carrying += bee.hasmuj
+        else:
+            self.dead += 1
+
+    # discharge() – stop counting a worker that leaves the colony alive
+    # (handed to another tile, see tiles.py)
+    def discharge(self, bee):
+        if self.track:
+            self.out[bee.slot] = False
+        if bee.alive:
+            self.alive    -= 1
+            self.outdoors -= not bee.inhoneyhold
+            self.carrying -= bee.hasmuj
+        else:
+            self.dead -= 1
+        bee.colony = None
+
+    # plant() – count a new flower from now on
+    def plant(self, fl):
+        fl.colony = self
+        self.blooming += fl.muj > 0
+
+    # ------------------------------------------------------------------
+    # transitions (called by Worker / Flower)
+    # ------------------------------------------------------------------
+
+    def died(self, bee):
+        if self.track:
+            self.out[bee.slot] = False
+        self.alive    -= 1
+        self.dead     += 1
+        self.outdoors -= not bee.inhoneyhold
+        self.carrying -= bee.hasmuj
+
+    def went_out(self, bee):
+        self.outdoors += 1
+
+    def came_in(self, bee):
+        self.outdoors -= 1
+
+    def loaded(self, bee):
+        self.carrying += 1
+
+    def unloaded(self, bee):
+        self.carrying -= 1
+        self.nectar   += 1
+
+    def drained(self, fl):
+        self.blooming -= 1
+        self.wilted   += 1
+
+    def bloomed(self, fl):
+        self.blooming += 1
+
+    # moved() – a worker's step is done: file its cell (track only)
+    def moved(self, bee):
+        slot = bee.slot
+        self.r[slot], self.c[slot] = bee.pos
+        self.out[slot] = bee.alive and not bee.inhoneyhold
+
+    # forget_wilted() – True (once) if a flower ran dry since the last
+    # call, i.e. a list of blooming flowers needs filtering again
+    def forget_wilted(self):
+        wilted = self.wilted
+        self.wilted = 0
+        return wilted > 0
+
+    # ------------------------------------------------------------------
+    # reading
+    # ------------------------------------------------------------------
+
+    def full_combs(self):
+        return self.combstore.full_count() if self.combstore is not None else 0
+
+    # census() – (alive, outdoors, carrying, combs full, flowers with
+    # nectar): the stats columns after step and nectar
+    def census(self):
+        return (self.alive, self.outdoors, self.carrying,
+                self.full_combs(), self.blooming)
+
+    # prey() – (rows, cols, visible, order) of every slot in use, the
+    # arrays waspswarm.WaspSwarm.step() takes (track only)
+    def prey(self):
+        n = self.size
+        return self.r[:n], self.c[:n], self.out[:n], self.rank[:n]
+
+    # rebuild() – recount from the objects themselves (deposits are a
+    # running total and stay as they are)
+    def rebuild(self, bees, flowers):
+        self.alive = self.dead = self.outdoors = self.carrying = 0
+        self.blooming = self.wilted = 0
+        self.size = self.enlisted = 0
+        self.out[:] = False
+        for bee in bees:
+            self.enlist(bee)
+        for fl in flowers:
+            self.plant(fl)
@@ -8,6 +8,7 @@ class Comb:
         self.rawhoneylvl   = 0 # how many loads of nectar stored
         self.maxrawhoneyy  = 5   #capacity: 5 loads fills the comb
         self.fullrawhoneyy = False # flag becomes True when level==capacity
+        self.store         = None  # CombStore indexing this comb, if any
 
     # called once by the simulation to mark the wax cell built
     def build(self):
@@ -20,6 +21,8 @@ class Comb:
             self.rawhoneylvl += 1  # increment level
             if self.rawhoneylvl >= self.maxrawhoneyy:
                 self.fullrawhoneyy = True   # comb now is full
+            if self.store is not None:
+                self.store.deposited(self)  # keep the store's index current
 
     # Return an RGB colour for plotting:
     # • Starts pale (#FFF8E6) when empty/unbuilt.
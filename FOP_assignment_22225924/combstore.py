@@ -0,0 +1,119 @@
+import numpy as np
+
+
+class CombStore:
+    """
+      Array-backed store over the Comb objects of the hive.
+
+      Levels, capacities and full flags are mirrored in NumPy arrays, and
+      the combs that can still take honey sit in square buckets of
+      `cellsize` hive cells.  Each Comb reports its deposits back to the
+      store (Comb.addrawhoney → deposited()), so a comb leaves the index
+      the moment it fills: "all full?" is one counter test and "nearest
+      non-full comb" only looks at the buckets around the bee.
+
+      The store iterates, indexes and len()s like the comb list it was
+      built from, so it can stand in for that list.
+
+      Parameters:
+      ##########
+      combs    : list[Comb]   the hive's combs, in hive order (tie-breaker)
+      cellsize : int          edge length of one bucket
+      """
+
+    def __init__(self, combs, cellsize=4):
+        self.cellsize = max(1, int(cellsize))
+        self.combs    = list(combs)
+        self.slot     = {c: i for i, c in enumerate(self.combs)}  # Comb -> index
+        self.r   = np.array([c.posrawhoney[0] for c in self.combs], dtype=np.int64)
+        self.c   = np.array([c.posrawhoney[1] for c in self.combs], dtype=np.int64)
+        self.cells = [c.posrawhoney for c in self.combs]   # plain tuples for the search
+        self.lvl = np.zeros(len(self.combs), dtype=np.int64)
+        self.cap = np.zeros(len(self.combs), dtype=np.int64)
+        self.full = np.zeros(len(self.combs), dtype=bool)
+        for comb in self.combs:
+            comb.store = self
+        self.rebuild()
+
+    def __iter__(self):
+        return iter(self.combs)
+
+    def __len__(self):
+        return len(self.combs)
+
+    def __getitem__(self, i):
+        return self.combs[i]
+
+    def _key(self, pos):
+        return pos[0] // self.cellsize, pos[1] // self.cellsize
+
+    # rebuild() – re-read every comb (after a checkpoint restore or a
+    # Swarm.sync_combs() wrote the objects directly)
+    def rebuild(self):
+        self.buckets = {}     # (bucket_row, bucket_col) -> [index, ...] ascending
+        self.open    = 0      # combs not full yet
+        for i, comb in enumerate(self.combs):
+            self.lvl[i]  = comb.rawhoneylvl
+            self.cap[i]  = comb.maxrawhoneyy
+            self.full[i] = comb.fullrawhoneyy
+            if not comb.fullrawhoneyy:
+                self.buckets.setdefault(self._key(comb.posrawhoney), []).append(i)
+                self.open += 1
+        # bucket span of the hive: the ring search never looks past it
+        keys = [self._key(c.posrawhoney) for c in self.combs] or [(0, 0)]
+        self.span = (min(k[0] for k in keys), max(k[0] for k in keys),
+                     min(k[1] for k in keys), max(k[1] for k in keys))
+
+    # deposited() – called by Comb.addrawhoney after a load went in
+    def deposited(self, comb):
+        i = self.slot[comb]
+        self.lvl[i] = comb.rawhoneylvl
+        if comb.fullrawhoneyy and not self.full[i]:
+            self.full[i] = True
+            self.open -= 1
+            key = self._key(comb.posrawhoney)
+            bucket = self.buckets[key]
+            bucket.remove(i)
+            if not bucket:
+                del self.buckets[key]
+
+    # all_full() – True once every comb is full (also with no combs)
+    def all_full(self):
+        return self.open == 0
+
+    def full_count(self):
+        return len(self.combs) - self.open
+
+    # nearest_open()
+    # The non-full comb with the smallest Manhattan distance to `pos`,
+    # first in hive order on ties – the comb Worker.step_change picks
+    # with min() over the whole list – or None when all are full.
+    # Buckets are searched in square rings around the bee's bucket; a
+    # comb in ring k+1 is at least k*cellsize+1 cells away, so the search
+    # stops as soon as the best comb so far is closer than that.
+    def nearest_open(self, pos):
+        if not self.open:
+            return None
+        r0, c0 = pos
+        s = self.cellsize
+        br0, bc0 = self._key(pos)
+        lo_r, hi_r, lo_c, hi_c = self.span
+        rings = max(br0 - lo_r, hi_r - br0, bc0 - lo_c, hi_c - bc0)
+        buckets, cells = self.buckets, self.cells
+        bestkey = None
+        for k in range(rings + 1):
+            for br in range(br0 - k, br0 + k + 1):
+                edge = br == br0 - k or br == br0 + k
+                for bc in (range(bc0 - k, bc0 + k + 1) if edge else
+                           (bc0 - k, bc0 + k) if k else (bc0,)):
+                    bucket = buckets.get((br, bc))
+                    if not bucket:
+                        continue
+                    for i in bucket:
+                        r, c = cells[i]
+                        key = (abs(r - r0) + abs(c - c0), i)
+                        if bestkey is None or key < bestkey:
+                            bestkey = key
+            if bestkey is not None and bestkey[0] <= k * s:
+                break
+        return self.combs[bestkey[1]]
@@ -0,0 +1,19 @@
+import pytest
+
+
+class Rows:                      # stats sink that keeps the rows
+    def __init__(self):
+        self.rows = []
+
+    def append(self, row):
+        self.rows.append(row)
+
+    def flush(self):
+        pass
+
+
+# rows_sink – makes stats sinks that keep their rows in memory, for
+# simulate(..., sinks=(rows_sink(),))
+@pytest.fixture
+def rows_sink():
+    return Rows
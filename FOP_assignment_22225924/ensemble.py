@@ -0,0 +1,321 @@
+# ensemble mode: K replicas of one scenario advanced together
+import csv
+import numpy as np
+from swarm   import Swarm
+from flowers import Flower
+from comb    import Comb
+from worldgrid import WorldGrid
+from freecells import FreeCells
+from rngservice import RngService
+import beeworld_batchmode as batch
+import sweep
+import terrain
+
+# The K worlds of an ensemble share the terrain but nothing else: every
+# replica has its own bees, flowers, combs and random streams, seeded
+# like replicate k of a sweep (sweep.run_seed(seed, 0, k)).  Replica k
+# is therefore the very run
+#     beeworld_batchmode.py --engine vector --seed <its seed>
+# makes, only computed in the same array operations as all the others.
+
+# percentiles of the cross-replica bands (besides the mean)
+BANDS = (5, 25, 50, 75, 95)
+
+
+class Ensemble(Swarm):
+    """
+      K independent colonies of the vector engine in one set of arrays.
+
+      The bees of all replicas are stacked replica after replica (bee i
+      of replica k sits at k * n + i, `rep` holds k), the nectar grid and
+      the comb levels get a leading replica axis.  Swarm.step() then
+      advances every bee of every replica at once; only the parts that
+      touch a world (flowers, combs) and the random draws are replica
+      aware.  Each replica draws from its own Generator, exactly what a
+      single Swarm with that Generator would draw, so a replica does not
+      depend on K or on the other replicas.
+
+      Parameters:
+      ##########
+      gens           : list[numpy Generator]   one per replica
+      n              : int            worker bees per replica
+      spawn          : (row, col)     start cell inside the hive
+      hive_exit      : (row, col)     hive → world portal
+      hive_entrance  : (row, col)     world → hive portal
+      world_entrance : (row, col)     matching cell on the world grid
+      blocked        : 2-D bool array True where the world cell is an obstacle
+      combs          : list[Comb]     the hive's combs (every replica starts
+                                      with a copy of their levels)
+      hive_shape     : (rows, cols)   hive grid size
+      detection_range: int            Manhattan flower "vision" distance
+      """
+
+    def __init__(self, gens, n, spawn, hive_exit, hive_entrance, world_entrance,
+                 blocked, combs, hive_shape=(20, 15), detection_range=5):
+        self.gens = list(gens)
+        self.k    = K = len(self.gens)
+        self.n    = n
+        self.rep  = np.repeat(np.arange(K), n)       # replica of every bee
+
+        self.honeyholdexit     = hive_exit
+        self.honeyholdentrance = hive_entrance
+        self.humanityentrance  = world_entrance
+        self.aimrange          = detection_range
+
+        self.blocked    = np.asarray(blocked, dtype=bool)
+        self.frame      = self.blocked.shape
+        self.hive_shape = hive_shape
+        self.world = WorldGrid(self.frame, self.blocked)
+        self.hive  = WorldGrid.open(hive_shape)
+        self.world.flows.pin(world_entrance)
+        self.hive.flows.pin(hive_exit)
+        for comb in combs:
+            self.hive.flows.pin(comb.posrawhoney)
+
+        # one padded nectar grid per replica
+        R = detection_range
+        self._nectar = np.zeros((K, self.frame[0] + 2 * R, self.frame[1] + 2 * R),
+                                dtype=np.int32)
+        self.nectar  = self._nectar[:, R:R + self.frame[0], R:R + self.frame[1]]
+
+        total = K * n
+        self.r           = np.full(total, spawn[0], dtype=np.int64)
+        self.c           = np.full(total, spawn[1], dtype=np.int64)
+        self.age         = np.zeros(total, dtype=np.int64)
+        # each replica's first draw, as in Swarm.__init__
+        self.max_age     = np.concatenate([g.integers(120, 201, n) for g in self.gens]
+                                          or [np.zeros(0, dtype=np.int64)])
+        self.inhoneyhold = np.ones(total, dtype=bool)
+        self.hasmuj      = np.zeros(total, dtype=bool)
+        self.depositing  = np.zeros(total, dtype=bool)
+        self.alive       = np.ones(total, dtype=bool)
+        self.resttime    = np.zeros(total, dtype=np.int64)
+        self.deposits    = np.zeros(K, dtype=np.int64)  # loads unloaded, per replica
+
+        # comb positions / capacities are the same everywhere, levels are not
+        self.combs     = list(combs)
+        self.comb_r    = np.array([c.posrawhoney[0] for c in self.combs], dtype=np.int64)
+        self.comb_c    = np.array([c.posrawhoney[1] for c in self.combs], dtype=np.int64)
+        self.comb_max  = np.array([c.maxrawhoneyy for c in self.combs], dtype=np.int64)
+        self.comb_built = np.array([c.built for c in self.combs], dtype=bool)
+        self.comb_lvl  = np.tile(np.array([c.rawhoneylvl for c in self.combs],
+                                          dtype=np.int64), (K, 1))
+        self.comb_full = np.tile(np.array([c.fullrawhoneyy for c in self.combs],
+                                          dtype=bool), (K, 1))
+
+        offs = [(dr, dc) for dr in range(-R, R + 1) for dc in range(-R, R + 1)
+                if abs(dr) + abs(dc) <= R]
+        offs.sort(key=lambda o: o[0] * o[0] + o[1] * o[1])
+        self.offsets = np.array(offs, dtype=np.int64)
+
+    # add_flower() – a flower with `muj` nectar units appears at `pos`
+    # in replica `k`
+    def add_flower(self, k, pos, muj):
+        self.nectar[k][pos] += muj
+
+    def alive_count(self):
+        return np.bincount(self.rep[self.alive], minlength=self.k)
+
+    # census() – the columns of Swarm.census(), one array (K,) each
+    def census(self):
+        alive = self.alive
+        K = self.k
+        return (np.bincount(self.rep[alive], minlength=K),
+                np.bincount(self.rep[alive & ~self.inhoneyhold], minlength=K),
+                np.bincount(self.rep[alive & self.hasmuj], minlength=K),
+                np.count_nonzero(self.comb_full, axis=1),
+                np.count_nonzero(self.nectar, axis=(1, 2)))
+
+    # sync_combs() – levels of replica `k` into the Comb objects
+    def sync_combs(self, k=0):
+        for i, comb in enumerate(self.combs):
+            comb.rawhoneylvl   = int(self.comb_lvl[k, i])
+            comb.fullrawhoneyy = bool(self.comb_full[k, i])
+
+    # random step: the keys for the bees of replica k come from replica
+    # k's Generator, in one (m, 8) draw – the draw Swarm._random_move
+    # makes – and only for replicas that have such bees this tick
+    def _random_move(self, idx, shape, blocked):
+        if len(idx) == 0:
+            return
+        nr, nc, legal = self._neighbours(idx, shape, blocked)
+        counts = np.bincount(self.rep[idx], minlength=self.k)   # idx is sorted
+        keys = np.concatenate([self.gens[k].random((m, legal.shape[1]))
+                               for k, m in enumerate(counts.tolist()) if m])
+        keys = np.where(legal, keys, 2.0)
+        pick = np.argmin(keys, axis=1)
+        ok = legal.any(axis=1)
+        rows = np.arange(len(idx))
+        self.r[idx[ok]] = nr[rows, pick][ok]
+        self.c[idx[ok]] = nc[rows, pick][ok]
+
+    # 2️⃣  as Swarm._hunt, with the replica as one more coordinate
+    def _hunt(self, idx):
+        if len(idx) == 0:
+            return
+        R = self.aimrange
+        H, W = self.frame
+        cells, inv = np.unique((self.rep[idx] * H + self.r[idx]) * W + self.c[idx],
+                               return_inverse=True)
+        uk, rest = np.divmod(cells, H * W)
+        ur, uc = np.divmod(rest, W)
+        rr = ur[:, None] + R + self.offsets[None, :, 0]
+        cc = uc[:, None] + R + self.offsets[None, :, 1]
+        hit = self._nectar[uk[:, None], rr, cc] > 0
+        found = hit.any(axis=1)[inv]
+        first = np.argmax(hit, axis=1)[inv]
+
+        self._random_move(idx[~found], self.frame, self.blocked)
+
+        idx, first = idx[found], first[found]
+        tr = self.r[idx] + self.offsets[first, 0]
+        tc = self.c[idx] + self.offsets[first, 1]
+        arrived = first == 0
+        self._move_towards(idx[~arrived], tr[~arrived], tc[~arrived],
+                           self.frame, self.blocked)
+
+        bees = idx[arrived]
+        if len(bees) == 0:
+            return
+        flat = self._nectar.reshape(-1)
+        PH, PW = self._nectar.shape[1:]
+        cell = (self.rep[bees] * PH + self.r[bees] + R) * PW + self.c[bees] + R
+        rank = self._rank_in_group(cell)
+        got = rank < flat[cell]
+        self.hasmuj[bees[got]] = True
+        self.resttime[bees[got]] = 2
+        np.subtract.at(flat, cell[got], 1)
+
+    # 4️⃣  as Swarm._deposit, each bee looking at its own replica's combs
+    def _deposit(self, idx):
+        if len(idx) == 0:
+            return 0
+        open_ = ~self.comb_full[self.rep[idx]]           # (bees, combs)
+        waiting = ~open_.any(axis=1)
+        self.resttime[idx[waiting]] = 3                  # all combs full → wait
+        idx, open_ = idx[~waiting], open_[~waiting]
+        if len(idx) == 0:
+            return 0
+        dist = (np.abs(self.comb_r[None, :] - self.r[idx, None]) +
+                np.abs(self.comb_c[None, :] - self.c[idx, None]))
+        dist = np.where(open_, dist, np.iinfo(np.int64).max)
+        tgt = np.argmin(dist, axis=1)
+        tr, tc = self.comb_r[tgt], self.comb_c[tgt]
+        arrived = (self.r[idx] == tr) & (self.c[idx] == tc)
+        for j in np.unique(tgt[~arrived]):
+            self._follow(idx[~arrived & (tgt == j)], self.hive,
+                         (int(self.comb_r[j]), int(self.comb_c[j])), None)
+
+        bees, comb = idx[arrived], tgt[arrived]
+        if len(bees) == 0:
+            return 0
+        nc = len(self.combs)
+        slot = self.rep[bees] * nc + comb                # comb of that replica
+        lvl = self.comb_lvl.reshape(-1)
+        rank = self._rank_in_group(slot)
+        room = np.where(self.comb_built[comb], self.comb_max[comb] - lvl[slot], 0)
+        fills = rank < room
+        ok = fills | ~self.comb_built[comb]
+        np.add.at(lvl, slot[fills], 1)
+        self.comb_full |= self.comb_built & (self.comb_lvl >= self.comb_max)
+        self.hasmuj[bees[ok]]     = False
+        self.depositing[bees[ok]] = False
+        self.deposits += np.bincount(self.rep[bees[ok]], minlength=self.k)
+        return int(np.count_nonzero(ok))
+
+
+# simulate() – `k` replicas of prm on one terrain; returns the replica
+# seeds and (steps, k) arrays of cumulative nectar and bees alive
+def simulate(humanity, prm, k, seed=0, layout=None):
+    layout = layout or terrain.default_layout(humanity.shape)
+    terrain.check_layout(humanity.shape, layout)
+    steps   = int(prm.get("steps",            200))
+    n_bees  = int(prm.get("num_bees",         10))
+    n_flwr  = int(prm.get("num_flower",       30))
+    grow_p  = float(prm.get("spawn_flower_p",  0.02))
+    if int(prm.get("flower_regrow", 0)):
+        raise ValueError("flower_regrow needs the object engine")
+    if int(prm.get("num_wasp", 0)):
+        raise ValueError("wasps need the object, vector or full engine")
+
+    genes = WorldGrid.from_terrain(humanity)
+    seeds = [sweep.run_seed(seed, 0, rep) for rep in range(k)]
+    # per replica: its RngService, flower spawning stream, free cells
+    services = [RngService(s) for s in seeds]
+    places   = [rngs.stream("spawn") for rngs in services]
+    vacant   = [FreeCells.from_grid(genes) for _ in range(k)]
+
+    combs = [Comb("C" + str(i + 1), pos) for i, pos in enumerate(layout["combs"])]
+    for c in combs:
+        c.build()
+    ens = Ensemble([rngs.stream("swarm").gen for rngs in services], n_bees,
+                   layout["spawn"], layout["exit"], layout["entrance"],
+                   layout["world_entrance"], ~genes.walkable, combs,
+                   hive_shape=layout["hive_shape"])
+
+    # starting flowers: the draws batch mode makes for each seed
+    for rep in range(k):
+        for pos in vacant[rep].draw_many(n_flwr, places[rep]):
+            ens.add_flower(rep, pos, Flower("F", pos, rng=services[rep]).muj)
+
+    nectar = np.zeros((steps, k), dtype=np.int64)
+    alive  = np.zeros((steps, k), dtype=np.int64)
+    for step in range(steps):
+        for rep in range(k):                       # one spawn test per world
+            if places[rep].random() < grow_p:
+                pos = vacant[rep].draw(places[rep])
+                if pos is not None:
+                    ens.add_flower(rep, pos, Flower("F", pos, rng=services[rep]).muj)
+        ens.step()                                 # every replica in one tick
+        nectar[step] = ens.deposits
+        alive[step]  = ens.alive_count()
+    return seeds, nectar, alive
+
+
+# bands() – per step: mean and BANDS percentiles of a (steps, k) series
+def bands(series):
+    return np.column_stack([series.mean(axis=1)] +
+                           [np.percentile(series, q, axis=1) for q in BANDS])
+
+
+def write_replicas(path, seeds, nectar, alive):
+    steps, k = nectar.shape
+    table = np.column_stack([np.repeat(np.arange(k), steps),
+                             np.repeat(np.array(seeds, dtype=np.uint64), steps),
+                             np.tile(np.arange(steps), k),
+                             nectar.T.reshape(-1), alive.T.reshape(-1)])
+    with open(path, "w", newline="") as f:
+        f.write("replica,seed,step,nectar,bees_alive\n")
+        np.savetxt(f, table, fmt="%d", delimiter=",")
+
+
+def write_bands(path, nectar, alive):
+    names = ["mean"] + ["p" + str(q) for q in BANDS]
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["step"] + ["nectar_" + n for n in names] +
+                   ["bees_alive_" + n for n in names])
+        table = np.column_stack([np.arange(len(nectar)), bands(nectar), bands(alive)])
+        for row in table.tolist():
+            w.writerow([int(row[0])] + [round(v, 3) for v in row[1:]])
+
+
+# main() is called by beeworld_batchmode.main() for --ensemble
+def main(args):
+    humanity, layout = terrain.load(args.field)
+    prm = batch.load_params(args.params)
+    seeds, nectar, alive = simulate(humanity, prm, args.ensemble,
+                                    args.seed or 0, layout)
+    if args.csv:
+        write_replicas(args.csv, seeds, nectar, alive)
+    if args.bands:
+        write_bands(args.bands, nectar, alive)
+    last = nectar.shape[0] - 1
+    if last >= 0:
+        print("Ensemble finished –", args.ensemble, "replicas,", last + 1,
+              "steps; nectar collected: mean", round(float(nectar[last].mean()), 2),
+              "; bees alive: mean", round(float(alive[last].mean()), 2))
+    for path in (args.csv, args.bands):
+        if path:
+            print("Results saved to", path)
+
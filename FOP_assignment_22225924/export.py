@@ -0,0 +1,132 @@
+# headless frame / video export for batch mode
+import os, shutil, subprocess
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")          # no display needed: render straight to files
+import matplotlib.pyplot as plt
+from plot import plot_hive, plot_world, Dot
+
+# The simulation runs once in the main process; a Recorder keeps a small
+# picture of every tick (who is where, which colour).  The frames are
+# then cut into one contiguous range per worker process and each worker
+# draws its range with plot_hive()/plot_world() on its own Agg figure.
+
+HIVE_SHAPE = (20, 15)
+
+
+class Recorder:
+    """
+      simulate(observe=...) hook that records one frame per tick.
+
+      A frame is (step, bees, flowers, combs, wasps, queen): bees are
+      (row, col, inhoneyhold) of the living workers, flowers are (row,
+      col, colour), combs are the comb colours in hive order, wasps the
+      (row, col) of the living wasps and queen her cell (None when there
+      is no living queen).  simulate() hands over the wasps and the queen
+      through beeworld_batchmode._with_wasps.
+      """
+
+    sees_wasps = True          # _with_wasps passes wasps= and eve=
+
+    def __init__(self):
+        self.frames = []
+        self.combpos = None    # comb positions (fixed for a run)
+
+    def __call__(self, step, bees, combs, flowers, swarm=None, wasps=(), eve=None):
+        if self.combpos is None:
+            self.combpos = [c.posrawhoney for c in combs]
+        if swarm is not None:
+            swarm.sync_combs()
+            alive = np.flatnonzero(swarm.alive)
+            beeshot = list(zip(swarm.r[alive].tolist(), swarm.c[alive].tolist(),
+                               swarm.inhoneyhold[alive].tolist()))
+            # the vector engine keeps nectar per cell, not per Flower
+            flowershot = [(fl.pos[0], fl.pos[1],
+                           fl.colour() if swarm.nectar[fl.pos] else (0.6, 0.6, 0.6))
+                          for fl in flowers]
+        else:
+            beeshot = [(b.pos[0], b.pos[1], b.inhoneyhold)
+                       for b in bees if b.alive]
+            flowershot = [(fl.pos[0], fl.pos[1], fl.colour()) for fl in flowers]
+        if hasattr(wasps, "r"):      # a WaspSwarm: its arrays as they are
+            alive = np.flatnonzero(wasps.alive)
+            waspshot = list(zip(wasps.r[alive].tolist(), wasps.c[alive].tolist()))
+        else:
+            waspshot = [w.pos for w in wasps if w.alive]
+        queen = eve.pos if eve is not None and eve.alive else None
+        self.frames.append((step, beeshot, flowershot,
+                            [c.hexslotcolour() for c in combs], waspshot, queen))
+
+
+# draw_frame() – one recorded frame on the (hive, world) axes pair
+def draw_frame(axes, frame, humanity, entrance, combpos, honeyhold):
+    step, beeshot, flowershot, combcolours, waspshot, queen = frame
+    bees    = [Dot((r, c), inhoneyhold=inside) for r, c, inside in beeshot]
+    flowers = [Dot((r, c), rgb) for r, c, rgb in flowershot]
+    combs   = [Dot(pos, rgb) for pos, rgb in zip(combpos, combcolours)]
+    wasps   = [Dot(pos) for pos in waspshot]
+    for ax in axes:
+        ax.clear()
+    plot_hive(honeyhold, bees, combs, axes[0],
+              eve=Dot(queen) if queen is not None else None)
+    axes[0].set_title("Hive")
+    plot_world(humanity, bees, flowers, wasps, axes[1], entrance)
+    axes[1].set_title("World")
+
+
+# _render_range() – worker process: draw frames[...] as PNG files
+def _render_range(frames, humanity, entrance, combpos, outdir, dpi, hive_shape):
+    honeyhold = np.full(hive_shape, 5)
+    fig, axes = plt.subplots(1, 2, figsize=(14, 7),
+                             gridspec_kw=dict(width_ratios=(1, 2)))
+    paths = []
+    for frame in frames:
+        step = frame[0]
+        draw_frame(axes, frame, humanity, entrance, combpos, honeyhold)
+        fig.suptitle("Time Step: " + str(step + 1))
+        path = os.path.join(outdir, "frame_%05d.png" % step)
+        fig.savefig(path, dpi=dpi)
+        paths.append(path)
+    plt.close(fig)
+    return paths
+
+
+# export_frames() – render every recorded frame to outdir/frame_NNNNN.png
+# on `jobs` processes, one contiguous frame range each; returns the paths
+def export_frames(recorder, humanity, entrance, outdir, jobs=None, dpi=80,
+                  hive_shape=HIVE_SHAPE):
+    os.makedirs(outdir, exist_ok=True)
+    frames = recorder.frames
+    jobs   = max(1, min(jobs or os.cpu_count() or 1, len(frames)))
+    cuts   = np.linspace(0, len(frames), jobs + 1).astype(int)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        parts = [pool.submit(_render_range, frames[a:b], humanity, entrance,
+                             recorder.combpos, outdir, dpi, hive_shape)
+                 for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+        return [p for part in parts for p in part.result()]
+
+
+# check_video() – fail before the run, not after rendering, when the
+# requested video format cannot be written here
+def check_video(out):
+    if not out.lower().endswith(".gif") and shutil.which("ffmpeg") is None:
+        raise ValueError("ffmpeg not found – export a .gif or PNG frames instead")
+
+
+# make_video() – join PNG frames into a video: .gif through Pillow,
+# anything else (.mp4, .webm, ...) through ffmpeg
+def make_video(paths, out, fps=10):
+    check_video(out)
+    if out.lower().endswith(".gif"):
+        from PIL import Image
+        images = [Image.open(p) for p in paths]
+        images[0].save(out, save_all=True, append_images=images[1:],
+                       duration=int(1000 / fps), loop=0)
+        return
+    ffmpeg = shutil.which("ffmpeg")
+    pattern = os.path.join(os.path.dirname(paths[0]), "frame_%05d.png")
+    start = os.path.basename(paths[0])[6:11]
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps),
+                    "-start_number", start, "-i", pattern,
+                    "-pix_fmt", "yuv420p", out], check=True)
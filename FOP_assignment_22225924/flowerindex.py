@@ -0,0 +1,105 @@
+class FlowerIndex:
+    """
+      Uniform-grid spatial index over the Flower objects of the world.
+
+      The world is cut into square buckets of `cellsize` cells; each bucket
+      keeps the flowers standing inside it.  A bee only has to look at the
+      few buckets that overlap its detection diamond instead of scanning
+      every flower in the world.
+
+      Parameters:
+      ##########
+      cellsize : int     edge length of one bucket (5 = default bee aimrange)
+      """
+
+    def __init__(self, cellsize=5):
+        self.cellsize = max(1, int(cellsize))
+        self.buckets  = {}   # (bucket_row, bucket_col) -> list[Flower]
+        self.order    = {}   # Flower -> insertion number (tie-breaker)
+        self.counter  = 0    # next insertion number
+
+    # bucket key for a (row, col) cell
+    def _key(self, pos):
+        return pos[0] // self.cellsize, pos[1] // self.cellsize
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, fl):
+        return fl in self.order
+
+    # add() – register a newly spawned flower.
+    # The insertion number keeps ties in the same order as the
+    # simulation's flower list, so results match the linear scan.
+    def add(self, fl):
+        if fl in self.order:
+            return
+        self.order[fl] = self.counter
+        self.counter += 1
+        self.buckets.setdefault(self._key(fl.pos), []).append(fl)
+
+    # remove() – forget a pruned flower (no-op if it was never added)
+    def remove(self, fl):
+        if self.order.pop(fl, None) is None:
+            return
+        key = self._key(fl.pos)
+        bucket = self.buckets[key]
+        bucket.remove(fl)
+        if not bucket:
+            del self.buckets[key]   # keep the dict as small as the field
+
+    # rebuild() – drop everything and index `stacies` in list order
+    def rebuild(self, stacies):
+        self.buckets.clear()
+        self.order.clear()
+        self.counter = 0
+        for fl in stacies:
+            self.add(fl)
+
+    # prune() – remove drained flowers, mirrors the interactive loop
+    # which keeps only flowers with nectar left.
+    def prune(self):
+        for fl in [fl for fl in self.order if fl.muj <= 0]:
+            self.remove(fl)
+
+    # in_range()
+    # All non-empty flowers whose Manhattan distance to `pos` is at most
+    # `rng`, nearest first (squared Euclidean distance, then insertion
+    # order) – exactly the ordering Worker.step_change uses with min().
+    def in_range(self, pos, rng):
+        r0, c0 = pos
+        s = self.cellsize
+        found = []
+        for br in range((r0 - rng) // s, (r0 + rng) // s + 1):
+            for bc in range((c0 - rng) // s, (c0 + rng) // s + 1):
+                bucket = self.buckets.get((br, bc))
+                if not bucket:
+                    continue
+                for fl in bucket:
+                    dr = fl.pos[0] - r0
+                    dc = fl.pos[1] - c0
+                    if fl.muj > 0 and abs(dr) + abs(dc) <= rng:
+                        found.append((dr * dr + dc * dc, self.order[fl], fl))
+        found.sort(key=lambda t: (t[0], t[1]))
+        return [t[2] for t in found]
+
+    # nearest() – closest non-empty flower within `rng`, or None
+    def nearest(self, pos, rng):
+        r0, c0 = pos
+        s = self.cellsize
+        best = None
+        bestkey = None
+        for br in range((r0 - rng) // s, (r0 + rng) // s + 1):
+            for bc in range((c0 - rng) // s, (c0 + rng) // s + 1):
+                bucket = self.buckets.get((br, bc))
+                if not bucket:
+                    continue
+                for fl in bucket:
+                    dr = fl.pos[0] - r0
+                    dc = fl.pos[1] - c0
+                    if fl.muj > 0 and abs(dr) + abs(dc) <= rng:
+                        key = (dr * dr + dc * dc, self.order[fl])
+                        if bestkey is None or key < bestkey:
+                            bestkey = key
+                            best = fl
+        return best
@@ -1,24 +1,40 @@
-import random
+from itertools import count
+import rngservice
+
+# creation order of flowers made without a `born` number (a simulation
+# numbers its own flowers, so a resumed run can go on counting)
+_born = count()
+
 class Flower:
     # A nectar source in the world grid.
     # • golden == True  → holds more nectar and gives double load.
-    def __init__(self, ID, pos, golden=False):
+    def __init__(self, ID, pos, golden=False, rng=None, born=None):
         self.ID         = ID    # unique label, e.g. "flower7"
         self.pos        = pos    # (row, col) tuple on the world map
         self.golden     = golden  # True → special high-value flower
 
+        # "flower" stream of the simulation's RngService
+        self.rng        = (rng or rngservice.shared()).stream("flower")
+
         # Current nectar units (“muj”).  Randomised so flowers start at
         # different fill levels:
         #   golden  → 2–6 units
         #   regular → 1–3 units
-        self.muj        = random.randint(2, 6) if golden else random.randint(1, 3)
+        self.muj        = self.rng.randint(2, 6) if golden else self.rng.randint(1, 3)
 
         # Maximum capacity once fully regrown:
         self.primemuj   = 6 if golden else 3     # maximum capacity
 
         # Countdown timer (in timesteps) until the next single unit of
         # nectar regrows.  Re-randomised every time a unit is collected.
-        self.mujcomeback = random.randint(5, 10)
+        self.mujcomeback = self.rng.randint(5, 10)
+
+        # Event-driven regrowth (see arm()): the scheduler and the tick the
+        # next unit is due.  None → the per-tick step_changes() countdown.
+        self.sched = None
+        self.due   = None
+        self.born  = next(_born) if born is None else born   # same-tick regrowth order
+        self.colony = None   # Colony counting the flowers with nectar, if any
 
     # Bee calls collect_nectar() when it lands on this flower.
     # Returns the *amount* delivered to the comb:
@@ -27,7 +43,11 @@ class Flower:
     def collect_nectar(self):
         if self.muj > 0: # flower still has nectar?
             self.muj         -= 1   # remove one unit
-            self.mujcomeback  = random.randint(5, 10)   # reset regrow timer
+            self.mujcomeback  = self.rng.randint(5, 10)   # reset regrow timer
+            if self.muj == 0 and self.colony is not None:
+                self.colony.drained(self)   # last unit gone
+            if self.sched is not None:   # event mode → move the wake-up
+                self._wake_in(self.mujcomeback)
             return 2 if self.golden else 1   # payload to the bee
         return 0    # empty → nothing collected
 
@@ -40,7 +60,39 @@ class Flower:
             self.mujcomeback -= 1
             if self.mujcomeback <= 0:
                 self.muj        += 1      # regrow one nectar unit
-                self.mujcomeback = random.randint(5, 10)    # reset timer
+                self.mujcomeback = self.rng.randint(5, 10)    # reset timer
+                if self.muj == 1 and self.colony is not None:
+                    self.colony.bloomed(self)   # back from empty
+
+    # EVENT-DRIVEN REGROWTH
+    # arm() hands the regrow timer to a Scheduler: instead of
+    # step_changes() counting mujcomeback down every tick, the flower asks
+    # to be woken on the tick the countdown would reach zero, so a full
+    # or waiting flower costs nothing.  Ticks match step_changes() being
+    # called at the start of every tick; mujcomeback then holds the value
+    # the timer was last reset to rather than the ticks left.
+    def arm(self, sched):
+        self.sched = sched
+        if self.muj < self.primemuj:
+            self._wake_in(self.mujcomeback)
+
+    def _wake_in(self, ticks):
+        self.due = self.sched.tick + ticks
+        # flowers due on the same tick regrow in creation order, the order
+        # a loop over the flower list would visit them
+        self.sched.at_ranked(self.due, self.born, self._regrow, self.due)
+
+    def _regrow(self, due):
+        if due != self.due:
+            return      # timer was reset since → stale event
+        self.due = None
+        if self.muj < self.primemuj:
+            self.muj        += 1      # regrow one nectar unit
+            self.mujcomeback = self.rng.randint(5, 10)    # reset timer
+            if self.muj == 1 and self.colony is not None:
+                self.colony.bloomed(self)   # back from empty
+            if self.muj < self.primemuj:
+                self._wake_in(self.mujcomeback)
 
     # RGB colour for plotting:
     #   • empty      → grey
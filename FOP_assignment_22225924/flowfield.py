@@ -0,0 +1,232 @@
+from collections import OrderedDict
+import numpy as np
+
+# cells of the window handled per block while building the next-step
+# table, so its temporaries stay a few MB whatever the grid size
+BLOCK = 1 << 20
+
+# a pinned field covers the whole grid up to PIN_CELLS cells (2048 x
+# 2048); on bigger worlds it covers the box of PIN_RADIUS steps around
+# its target, so its tables stay ~32 MB however big the world is.  Bees
+# outside the box take the greedy step until they are inside it.
+PIN_CELLS  = 1 << 22
+PIN_RADIUS = 1024
+
+
+class FlowField:
+    """
+      Breadth-first distance field towards one target cell of a WorldGrid,
+      plus the "next step" for every cell, so a bee heading for the target
+      only needs one array lookup per move.
+
+      Steps are 8-connected like every other bee move.  Among the
+      neighbours that are one step closer the one nearest (distance²) to
+      the target is chosen, which is what the greedy move would pick
+      whenever the greedy move is not a dead end.
+
+      Parameters:
+      ##########
+      grid    : WorldGrid      walkability bitmap the field is laid over
+      target  : (row, col)     cell every path leads to
+      radius  : int or None    only cover the box of cells at most this
+                               far from the target (None → whole grid)
+      """
+
+    def __init__(self, grid, target, radius=None):
+        self.target  = target
+        self.radius  = radius
+        self.version = grid.version   # terrain revision it was built for
+
+        # window of the padded grid the field covers: everything, or a
+        # box of `radius` cells around the target with a blocked rim
+        R, C = grid._padded.shape
+        tr, tc = target[0] + 1, target[1] + 1
+        if radius is None:
+            self.lo = (0, 0)
+            hi = (R, C)
+        else:
+            self.lo = (max(0, tr - radius - 1), max(0, tc - radius - 1))
+            hi = (min(R, tr + radius + 2), min(C, tc + radius + 2))
+        win = grid._padded[self.lo[0]:hi[0], self.lo[1]:hi[1]].copy()
+        win[0, :] = win[-1, :] = False
+        win[:, 0] = win[:, -1] = False
+        self.shape  = win.shape
+        self.stride = win.shape[1]
+        self.offs   = tuple(dr * self.stride + dc for dr, dc, off in grid.dirs)
+
+        dist = np.full(win.size, -1, dtype=np.int32)
+        if grid.free(target):
+            self._bfs(win.reshape(-1), dist, (tr - self.lo[0]) * self.stride +
+                                             tc - self.lo[1])
+        self.dist = dist.reshape(win.shape)
+
+        # next-step table: flat window index of the next cell (-1 → none)
+        self.next = self._next_steps(grid.dirs, tr - self.lo[0], tc - self.lo[1])
+        self._dist = memoryview(self.dist.reshape(-1))   # fast scalar lookups
+        self._next = memoryview(self.next.reshape(-1))
+
+    # shared() – a whole-grid field over arrays computed elsewhere (e.g.
+    # by another process, in shared memory): no BFS, nothing copied
+    @classmethod
+    def shared(cls, grid, target, dist, nxt):
+        self = cls.__new__(cls)
+        self.target  = target
+        self.radius  = None
+        self.version = grid.version
+        self.lo      = (0, 0)
+        self.shape   = dist.shape
+        self.stride  = dist.shape[1]
+        self.offs    = tuple(dr * self.stride + dc for dr, dc, off in grid.dirs)
+        self.dist    = dist
+        self.next    = nxt
+        self._dist   = memoryview(dist.reshape(-1))
+        self._next   = memoryview(nxt.reshape(-1))
+        return self
+
+    # BFS over the flat window mask (its rim is never walkable), one
+    # whole frontier per step: every cell of the next ring is found with
+    # array operations, so the cost grows with the cells, not with
+    # Python work per cell
+    def _bfs(self, cells, dist, start):
+        offs = np.array(self.offs, dtype=np.int64)
+        dist[start] = 0
+        front = np.array([start], dtype=np.int64)
+        d = 0
+        while len(front):
+            d += 1
+            near = (front[:, None] + offs[None, :]).reshape(-1)
+            near = near[cells[near] & (dist[near] < 0)]
+            front = np.unique(near)
+            dist[front] = d
+
+    # vectorised choice of the next cell for every reached cell, built a
+    # block of rows at a time with int32 temporaries (int64 only for
+    # grids too big for them)
+    def _next_steps(self, dirs, tr, tc):
+        R, C = self.shape
+        dist = self.dist
+        idx = np.int32 if R * C < 2 ** 31 else np.int64
+        key_t = np.int32 if R * R + C * C < 2 ** 31 else np.int64
+        big = np.iinfo(key_t).max
+        nxt = np.full((R, C), -1, dtype=idx)
+        cc = np.arange(1, C - 1, dtype=key_t)
+        rows = max(1, BLOCK // C)
+        for a in range(1, R - 1, rows):
+            b = min(R - 1, a + rows)
+            rr = np.arange(a, b, dtype=key_t)[:, None]
+            here = dist[a:b, 1:C - 1]
+            best = np.full(here.shape, big, dtype=key_t)
+            pick = nxt[a:b, 1:C - 1]                  # view into nxt
+            for dr, dc, off in dirs:
+                nd = dist[a + dr:b + dr, 1 + dc:C - 1 + dc]   # neighbour distance
+                ok = (here > 0) & (nd == here - 1)
+                key = (rr + dr - tr) ** 2 + (cc + dc - tc) ** 2
+                key = np.where(ok, key, big)
+                better = key < best                   # strict → first in DIRS order wins
+                best[better] = key[better]
+                pick[better] = ((rr + dr) * C + cc + dc).astype(idx)[better]
+        return nxt
+
+    # flat window index of pos, or -1 when pos lies outside the window
+    def _index(self, pos):
+        r = pos[0] + 1 - self.lo[0]
+        c = pos[1] + 1 - self.lo[1]
+        if 0 < r < self.shape[0] - 1 and 0 < c < self.shape[1] - 1:
+            return r * self.stride + c
+        return -1
+
+    # distance in steps from pos to the target (-1 → unreachable)
+    def distance(self, pos):
+        i = self._index(pos)
+        return self._dist[i] if i >= 0 else -1
+
+    # steps() – step() for arrays of rows / cols at once: (rows, cols,
+    # ok), the next cells of the bees where ok is True (False: outside
+    # the window, unreachable or already at the target)
+    def steps(self, r, c):
+        R, C = self.shape
+        wr = np.asarray(r) + 1 - self.lo[0]
+        wc = np.asarray(c) + 1 - self.lo[1]
+        inside = (wr > 0) & (wr < R - 1) & (wc > 0) & (wc < C - 1)
+        flat = np.full(len(wr), -1, dtype=np.int64)
+        flat[inside] = self.next.reshape(-1)[wr[inside] * self.stride + wc[inside]]
+        ok = flat >= 0
+        nr, nc = np.divmod(flat[ok], self.stride)
+        return nr - 1 + self.lo[0], nc - 1 + self.lo[1], ok
+
+    # step() – next (row, col) on a shortest path, None if pos is the
+    # target itself or cannot reach it
+    def step(self, pos):
+        i = self._index(pos)
+        if i < 0:
+            return None
+        j = self._next[i]
+        if j < 0:
+            return None
+        r, c = divmod(j, self.stride)
+        return r - 1 + self.lo[0], c - 1 + self.lo[1]
+
+
+class FlowCache:
+    """
+      Flow fields of one WorldGrid, keyed by target cell.
+
+      * pinned targets (hive portals, combs) keep a whole-grid field for
+        as long as the terrain does not change (a PIN_RADIUS box on
+        grids over PIN_CELLS cells);
+      * any other target (flowers) gets a field limited to `radius` steps,
+        kept in a least-recently-used cache of at most `size` fields.
+
+      Every field remembers the grid.version it was built for, so blocking
+      or freeing a cell quietly triggers a rebuild on the next lookup.
+      """
+
+    def __init__(self, grid, size=64, radius=12):
+        self.grid   = grid
+        self.size   = size
+        self.radius = radius
+        self.pinned = {}               # target -> FlowField
+        self.recent = OrderedDict()    # target -> FlowField (LRU order)
+
+    def pin(self, target):
+        self.pinned[target] = FlowField(self.grid, target, self._pin_radius())
+
+    def _pin_radius(self):
+        rows, cols = self.grid.shape
+        return None if rows * cols <= PIN_CELLS else PIN_RADIUS
+
+    # adopt() – pin a field built elsewhere (FlowField.shared)
+    def adopt(self, fld):
+        self.pinned[fld.target] = fld
+
+    def unpin(self, target):
+        self.pinned.pop(target, None)
+
+    def clear(self):
+        self.recent.clear()
+        for target in self.pinned:
+            self.pinned[target] = FlowField(self.grid, target, self._pin_radius())
+
+    # field() – the (up-to-date) field leading to `target`
+    def field(self, target):
+        fld = self.pinned.get(target)
+        if fld is not None:
+            if fld.version != self.grid.version:
+                fld = self.pinned[target] = FlowField(self.grid, target,
+                                                      self._pin_radius())
+            return fld
+        fld = self.recent.get(target)
+        if fld is not None and fld.version == self.grid.version:
+            self.recent.move_to_end(target)
+            return fld
+        fld = FlowField(self.grid, target, self.radius)
+        self.recent[target] = fld
+        self.recent.move_to_end(target)
+        if len(self.recent) > self.size:
+            self.recent.popitem(last=False)   # evict least recently used
+        return fld
+
+    # step() – next cell from pos towards target, None when the field
+    # has no path (target blocked or outside the search radius)
+    def step(self, pos, target):
+        return self.field(target).step(pos)
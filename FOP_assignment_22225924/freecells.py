@@ -0,0 +1,131 @@
+import numpy as np
+
+
+class FreeCells:
+    """
+      The cells of a grid that are still free to put something on, for
+      placing trees and flowers without rejection sampling.
+
+      The free cells are kept as flat indices at the front of one array
+      and a second array maps every cell to its position in the first
+      (-1 = not free).  Taking a cell swaps the last free one into its
+      place, giving one back appends it, so take() / give() / draw() are
+      O(1) however full the grid gets.
+
+      Parameters:
+      ##########
+      shape : (rows, cols)    grid size
+      free  : bool array      cells that start free (None → all of them)
+      """
+
+    def __init__(self, shape, free=None):
+        self.shape = tuple(shape)
+        self.cols  = self.shape[1]
+        size = self.shape[0] * self.shape[1]
+        # 4 bytes per cell and array for any world below 2^31 cells
+        self.dtype = np.int32 if size < 2 ** 31 else np.int64
+        self.cells = np.zeros(size, dtype=self.dtype)      # free cells: the first n
+        self.slot  = np.full(size, -1, dtype=self.dtype)   # cell -> index in cells
+        self.n     = 0
+        if free is None:
+            free = np.ones(self.shape, dtype=bool)
+        free = np.asarray(free, dtype=bool).reshape(self.shape)
+        # filled a block of rows at a time, so a huge grid needs no
+        # full-size temporaries besides the two arrays themselves
+        rows = max(1, (1 << 22) // max(1, self.cols))
+        for a in range(0, self.shape[0], rows):
+            flat = np.flatnonzero(free[a:a + rows]).astype(self.dtype)
+            flat += a * self.cols
+            k = len(flat)
+            self.cells[self.n:self.n + k] = flat
+            self.slot[flat] = np.arange(self.n, self.n + k, dtype=self.dtype)
+            self.n += k
+
+    # from_grid() – every walkable cell of a WorldGrid, minus `taken`
+    @classmethod
+    def from_grid(cls, genes, taken=()):
+        free = cls(genes.shape, genes.walkable)
+        for pos in taken:
+            free.take(pos)
+        return free
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, pos):
+        r, c = pos
+        return (0 <= r < self.shape[0] and 0 <= c < self.cols and
+                self.slot[r * self.cols + c] >= 0)
+
+    # take() – the cell is occupied from now on (no-op if it was not free)
+    def take(self, pos):
+        if pos not in self:
+            return False
+        i = int(self.slot[pos[0] * self.cols + pos[1]])
+        last = int(self.cells[self.n - 1])
+        self.cells[i] = last            # last free cell fills the gap
+        self.slot[last] = i
+        self.cells[self.n - 1] = pos[0] * self.cols + pos[1]
+        self.slot[pos[0] * self.cols + pos[1]] = -1
+        self.n -= 1
+        return True
+
+    # give() – the cell is free again (a flower wilted, a tree was cut)
+    def give(self, pos):
+        r, c = pos
+        cell = r * self.cols + c
+        if self.slot[cell] >= 0:
+            return
+        self.cells[self.n] = cell
+        self.slot[cell] = self.n
+        self.n += 1
+
+    # pick() – a uniformly random free cell, left free (None if full);
+    # `rnd` is an RngStream, one buffered float per pick
+    def pick(self, rnd):
+        if not self.n:
+            return None
+        cell = int(self.cells[min(int(rnd.random() * self.n), self.n - 1)])
+        return divmod(cell, self.cols)
+
+    # draw() – pick() and take() in one
+    def draw(self, rnd):
+        pos = self.pick(rnd)
+        if pos is not None:
+            self.take(pos)
+        return pos
+
+    # draw_many() – k distinct random free cells at once (fewer if the
+    # grid runs out), all taken; vectorised for big initial placements
+    def draw_many(self, k, rnd):
+        k = min(int(k), self.n)
+        chosen = rnd.gen.choice(self.n, size=k, replace=False)
+        cells = self.cells[chosen]
+        self.slot[cells] = -1
+        # the rest moves up, order kept, a block at a time (the write
+        # position never passes the read position)
+        n = 0
+        step = 1 << 22
+        for a in range(0, self.n, step):
+            keep = self.cells[a:min(a + step, self.n)]
+            keep = keep[self.slot[keep] >= 0]
+            self.cells[n:n + len(keep)] = keep
+            self.slot[keep] = np.arange(n, n + len(keep), dtype=self.dtype)
+            n += len(keep)
+        self.n = n
+        self.cells[n:n + k] = cells
+        rows, cols = np.divmod(cells, self.cols)
+        return list(zip(rows.tolist(), cols.tolist()))
+
+    # state() / set_state() – the free list in its exact order, so a
+    # resumed run draws the same cells (see checkpoint.pack_free)
+    def state(self):
+        return self.cells[:self.n].copy()
+
+    def set_state(self, cells):
+        cells = np.asarray(cells)
+        self.slot[:] = -1
+        self.n = len(cells)
+        self.cells[:] = 0
+        self.cells[:self.n] = cells
+        self.slot[cells] = np.arange(self.n, dtype=self.dtype)
@@ -1,11 +1,78 @@
+from collections import namedtuple
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.transforms import Bbox
 from math import sqrt   # only used for the √3 constant
+from time import perf_counter
 
 sqrt3 = np.sqrt(3.0) # pre-compute √3 for hex-grid maths
                         # (hex height  = sqrt(3)/2 × cell-row)
 
+# Dot – stand-in with just what plot_hive()/plot_world() read from a
+# Worker, Flower, Comb or Wasp, for drawing recorded frames (export.py,
+# trajectory.py) without the live objects
+class Dot:
+    def __init__(self, pos, rgb=None, inhoneyhold=False, alive=True):
+        self.pos         = pos
+        self.posrawhoney = pos
+        self.rgb         = rgb
+        self.inhoneyhold = inhoneyhold
+        self.alive       = alive
+
+    def colour(self):
+        return self.rgb
+
+    def hexslotcolour(self):
+        return self.rgb
+
+
+# Snapshot – one tick of the live view, detached from the simulation:
+# read-only arrays of (x, y) points and plain colour tuples, so the
+# simulation thread can hand it to the drawing thread and go on.
+#   hivebees / worldbees / queen / flowers / wasps : (n, 2) x, y arrays
+#   fcolours : (n, 3) flower RGB      combs : tuple of comb colours
+#   stats    : length of the (append-only) nectar / bee logs at this tick
+Snapshot = namedtuple("Snapshot", "t hivebees worldbees queen combs "
+                                  "flowers fcolours wasps stats")
+
+
+def _frozen(rows, width):
+    a = np.array(rows, dtype=float).reshape(-1, width)
+    a.flags.writeable = False
+    return a
+
+
+def _bee_xy(beetlejuices):
+    inside, outside = [], []
+    for b in beetlejuices:
+        if b.alive:
+            (inside if b.inhoneyhold else outside).append((b.pos[1], b.pos[0]))
+    return _frozen(inside, 2), _frozen(outside, 2)
+
+
+def _queen_xy(eve):
+    return _frozen([[eve.pos[1], eve.pos[0]]] if eve is not None and eve.alive
+                   else [], 2)
+
+
+def _flower_xy(stacies):
+    return (_frozen([(fl.pos[1], fl.pos[0]) for fl in stacies], 2),
+            _frozen([fl.colour() for fl in stacies], 3))
+
+
+def _wasp_xy(goatis):
+    return _frozen([(w.pos[1], w.pos[0]) for w in goatis if w.alive], 2)
+
+
+# snapshot() – freeze tick t of the live objects into a Snapshot
+def snapshot(t, beetlejuices, hexslot, stacies, goatis, eve, stats):
+    inside, outside = _bee_xy(beetlejuices)
+    xy, rgb = _flower_xy(stacies)
+    return Snapshot(t, inside, outside, _queen_xy(eve),
+                    tuple(c.hexslotcolour() for c in hexslot), xy, rgb,
+                    _wasp_xy(goatis), stats)
+
 #
 # HIVE-VIEW RENDERER
 #
@@ -112,13 +179,250 @@ def plot_world(humanity, beetlejuices, stacies, goatis, ax, entrance):
     ax.set_yticks([])
 
 
+#
+# PERSISTENT-ARTIST RENDERER
+#
+# plot_hive()/plot_world() rebuild every artist on freshly cleared axes,
+# so a frame costs the same matplotlib churn however little moved.  The
+# Renderer creates the artists once: terrain, hive, entrance, titles and
+# legend are drawn a single time and cached as blitting backgrounds, and
+# each frame only pushes new offsets/colours/data into the moving
+# artists and re-blits the panels whose artists actually changed.
+class Renderer:
+    """
+      Live hive | world | stats view with blitted updates.
+
+      Parameters:
+      ##########
+      fig       : matplotlib Figure holding the three axes
+      axes      : (hive, world, stats) Axes
+      honeyhold : 2-D array drawn as the hive background
+      humanity  : 2-D array of world tile codes (terrain background)
+      hexslot   : list of Comb objects (one hexagon each)
+      entrance  : (row, col) of the hive-world doorway
+      interval  : seconds per frame (pacing; 0 → as fast as possible)
+      """
+
+    def __init__(self, fig, axes, honeyhold, humanity, hexslot, entrance,
+                 interval=0.1):
+        self.fig      = fig
+        self.canvas   = fig.canvas
+        self.interval = interval
+        self.shown    = None      # perf_counter() of the last frame
+        ah, aw, ast   = axes
+        self.axes     = axes
+
+        # ── hive: static image, animated combs / bees / queen ──
+        hr, hc = honeyhold.shape
+        ah.imshow(honeyhold, origin='lower', cmap='YlOrBr', vmin=0, vmax=10,
+                  extent=[-0.5, hc - 0.5, -0.5, hr - 0.5])
+        self.hexes = []
+        for c in hexslot:
+            r, c_ = c.posrawhoney
+            poly = patches.RegularPolygon(
+                xy=(c_ + 0.5 * (r % 2), r * sqrt3 / 2.0), radius=0.45,
+                numVertices=6, orientation=np.radians(30),
+                facecolor=c.hexslotcolour(), edgecolor='darkgoldenrod',
+                animated=True)
+            ah.add_patch(poly)
+            self.hexes.append(poly)
+        self.hexcolours = [None] * len(self.hexes)
+        self.hivebees = ah.scatter([], [], s=30, marker='o', c='black',
+                                   animated=True)
+        self.queen    = ah.scatter([], [], marker='*', s=100, c='purple',
+                                   animated=True)
+        ah.set_xlim(-0.5, hc - 0.5)
+        ah.set_ylim(-0.5, hr - 0.5)
+        ah.set_xticks([])
+        ah.set_yticks([])
+        ah.set_title("Hive")
+
+        # ── world: static terrain + entrance, animated agents ──
+        rows, cols = humanity.shape
+        aw.imshow(humanity, origin='lower', cmap='Greens', vmin=0, vmax=15,
+                  extent=[-0.5, cols - 0.5, -0.5, rows - 0.5])
+        aw.scatter([entrance[1]], [entrance[0]], marker='s', s=60, c='yellow')
+        self.flowers   = aw.scatter([], [], marker='v', s=40, animated=True)
+        self.worldbees = aw.scatter([], [], marker='o', s=30, c='black',
+                                    animated=True)
+        self.wasps     = aw.scatter([], [], marker='x', s=50, c='red',
+                                    animated=True)
+        aw.set_xlim(-0.5, cols - 0.5)
+        aw.set_ylim(-0.5, rows - 0.5)
+        aw.set_xticks([])
+        aw.set_yticks([])
+        aw.set_title("World")
+
+        # ── stats: the axes limits grow by doubling, so the (static)
+        #    ticks are only redrawn a logarithmic number of times ──
+        self.nectarline, = ast.plot([], [], label='Nectar', animated=True)
+        self.beeline,    = ast.plot([], [], label='Bees', animated=True)
+        self.xmax, self.ymax = 50, 10
+        ast.set_xlim(0, self.xmax)
+        ast.set_ylim(0, self.ymax)
+        ast.legend()
+        ast.set_title("Stats")
+        self.statlen = -1
+
+        self.title = fig.suptitle("", animated=True)
+
+        # panel → its animated artists; "title" is the band above the axes
+        self.artists = {"hive":  self.hexes + [self.hivebees, self.queen],
+                        "world": [self.flowers, self.worldbees, self.wasps],
+                        "stats": [self.nectarline, self.beeline],
+                        "title": [self.title]}
+        self.last  = {}           # panel data of the last frame
+        self.dirty = set()        # panels to re-blit
+        self.full  = True         # next show() redraws the whole figure
+        self.bg    = {}           # panel → cached background
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    # screen rectangle of a panel
+    def _bbox(self, key):
+        if key == "title":
+            top = max(ax.bbox.y1 for ax in self.axes)
+            return Bbox.from_extents(self.fig.bbox.x0, top,
+                                     self.fig.bbox.x1, self.fig.bbox.y1)
+        return self.axes[("hive", "world", "stats").index(key)].bbox
+
+    # every full draw (first frame, resize, limit change, plt.draw())
+    # re-captures the backgrounds and puts the animated artists back
+    def _on_draw(self, event):
+        for key in self.artists:
+            self.bg[key] = self.canvas.copy_from_bbox(self._bbox(key))
+        for arts in self.artists.values():
+            for a in arts:
+                self.fig.draw_artist(a)
+        self.dirty.clear()
+
+    # _changed() – remember `value` under `name`, True if it differs
+    def _changed(self, name, value):
+        old = self.last.get(name)
+        if old is not None and np.array_equal(old, value):
+            return False
+        self.last[name] = value
+        return True
+
+    # ------------------------------------------------------------------
+    # per-frame data
+    # ------------------------------------------------------------------
+
+    # set_*() take the live objects, _put_*() the arrays of a Snapshot
+
+    def set_bees(self, beetlejuices):
+        self._put_bees(*_bee_xy(beetlejuices))
+
+    def _put_bees(self, inside, outside):
+        if self._changed("hivebees", inside):
+            self.hivebees.set_offsets(inside)
+            self.dirty.add("hive")
+        if self._changed("worldbees", outside):
+            self.worldbees.set_offsets(outside)
+            self.dirty.add("world")
+
+    def set_queen(self, eve):
+        self._put_queen(_queen_xy(eve))
+
+    def _put_queen(self, xy):
+        if self._changed("queen", xy):
+            self.queen.set_offsets(xy)
+            self.dirty.add("hive")
+
+    def set_combs(self, hexslot):
+        self._put_combs([c.hexslotcolour() for c in hexslot])
+
+    def _put_combs(self, colours):
+        for i, colour in enumerate(colours):
+            if colour != self.hexcolours[i]:
+                self.hexcolours[i] = colour
+                self.hexes[i].set_facecolor(colour)
+                self.dirty.add("hive")
 
+    def set_flowers(self, stacies):
+        self._put_flowers(*_flower_xy(stacies))
 
+    def _put_flowers(self, xy, rgb):
+        moved, recoloured = self._changed("flowers", xy), self._changed("fcol", rgb)
+        if moved or recoloured:
+            self.flowers.set_offsets(xy)
+            self.flowers.set_facecolors(rgb)
+            self.dirty.add("world")
 
+    def set_wasps(self, goatis):
+        self._put_wasps(_wasp_xy(goatis))
 
+    def _put_wasps(self, xy):
+        if self._changed("wasps", xy):
+            self.wasps.set_offsets(xy)
+            self.dirty.add("world")
 
+    def set_stats(self, nectar_log, history):
+        n = len(nectar_log)
+        if n == self.statlen:
+            return
+        self.statlen = n
+        x = np.arange(n)
+        self.nectarline.set_data(x, nectar_log)
+        self.beeline.set_data(x, history)
+        top = max(max(nectar_log, default=0), max(history, default=0))
+        if n > self.xmax or top > self.ymax:
+            while n > self.xmax:
+                self.xmax *= 2
+            while top > self.ymax:
+                self.ymax *= 2
+            self.axes[2].set_xlim(0, self.xmax)
+            self.axes[2].set_ylim(0, self.ymax)
+            self.full = True          # new ticks → whole-figure redraw
+        self.dirty.add("stats")
 
+    def set_title(self, text):
+        if text != self.title.get_text():
+            self.title.set_text(text)
+            self.dirty.add("title")
 
+    # ------------------------------------------------------------------
+    # drawing
+    # ------------------------------------------------------------------
 
+    # update() – one frame of the whole view
+    def update(self, t, beetlejuices, hexslot, stacies, goatis, eve,
+               nectar_log, history):
+        self.set_bees(beetlejuices)
+        self.set_queen(eve)
+        self.set_combs(hexslot)
+        self.set_flowers(stacies)
+        self.set_wasps(goatis)
+        self.set_stats(nectar_log, history)
+        self.set_title("Time Step: " + str(t + 1))
+        self.show()
 
+    # render() – one frame from a Snapshot; the logs are only read up
+    # to the snapshot's length, so the simulation may already be ahead
+    def render(self, snap, nectar_log, history):
+        self._put_bees(snap.hivebees, snap.worldbees)
+        self._put_queen(snap.queen)
+        self._put_combs(snap.combs)
+        self._put_flowers(snap.flowers, snap.fcolours)
+        self._put_wasps(snap.wasps)
+        self.set_stats(nectar_log[:snap.stats], history[:snap.stats])
+        self.set_title("Time Step: " + str(snap.t + 1))
+        self.show()
 
+    # show() – re-blit the panels that changed, then pace the frame
+    def show(self):
+        if self.full or not self.bg:
+            self.full = False
+            self.canvas.draw()            # _on_draw() blits everything
+        else:
+            for key in self.dirty:
+                self.canvas.restore_region(self.bg[key])
+                for a in self.artists[key]:
+                    self.fig.draw_artist(a)
+                self.canvas.blit(self._bbox(key))
+            self.dirty.clear()
+        self.canvas.flush_events()
+        if self.interval:
+            now = perf_counter()
+            if self.shown is not None and now - self.shown < self.interval:
+                self.canvas.start_event_loop(self.interval - (now - self.shown))
+            self.shown = perf_counter()
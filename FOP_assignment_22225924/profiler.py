@@ -0,0 +1,122 @@
+import csv, time
+from collections import defaultdict
+
+# Tick profiler.  The main loops mark phase boundaries on a Profiler
+# (lap("workers"), lap("stats"), ...) and hot paths bump counters and
+# timers in this module – always behind `if profiler.enabled:`, so with
+# profiling off a hot path pays one global lookup and a branch, and the
+# loops talk to a NullProfiler whose methods do nothing.
+
+enabled = False
+clock   = time.perf_counter
+
+# hot-path event counters and timers, filled while `enabled`
+counts = defaultdict(int)
+timers = defaultdict(float)
+
+COUNTERS = ("neighbour_evals",   # free-neighbour tests while stepping
+            "random_moves",      # Worker.random_move calls
+            "random_fallbacks",  # move_towards found no step, wandered
+            "flower_scans",      # nearest-flower lookups
+            "comb_selections",   # nearest non-full comb choices
+            "sting_checks")      # bees tested against a sting square
+TIMERS = ("move", "forage", "combs")   # inside Worker.step_change
+
+
+class NullProfiler:
+    # stand-in when profiling is off: every call is a no-op
+    def begin(self, step):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def end(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Profiler:
+    """
+      Times the phases of every tick and collects the hot-path counters.
+
+      Creating one switches module-level profiling on (close() switches
+      it off again).  Per tick:  begin(step), lap(phase) after each
+      phase (time since the previous mark), end().
+
+      Parameters:
+      ##########
+      phases : sequence of str   phase names, in loop order (report / trace columns)
+      trace  : str or None       per-tick CSV: step, ms per phase and
+                                 worker sub-phase, counter deltas
+      """
+
+    def __init__(self, phases, trace=None):
+        global enabled
+        enabled = True
+        counts.clear()
+        timers.clear()
+        self.phases = list(phases)
+        self.totals = defaultdict(float)
+        self.ticks  = 0
+        self.row    = {}
+        self.mark   = None
+        self.writer = self.f = None
+        if trace:
+            self.f = open(trace, "w", newline="")
+            self.writer = csv.writer(self.f)
+            self.writer.writerow(["step"] + [p + "_ms" for p in self.phases] +
+                                 [t + "_ms" for t in TIMERS] + list(COUNTERS))
+
+    def begin(self, step):
+        self.step  = step
+        self.row   = defaultdict(float)
+        self.count0 = [counts[c] for c in COUNTERS]
+        self.timer0 = [timers[t] for t in TIMERS]
+        self.mark  = clock()
+
+    def lap(self, phase):
+        now = clock()
+        self.row[phase] += now - self.mark
+        self.mark = now
+
+    def end(self):
+        self.ticks += 1
+        for p, secs in self.row.items():
+            self.totals[p] += secs
+        if self.writer is not None:
+            self.writer.writerow(
+                [self.step] +
+                ["%.4f" % (1e3 * self.row.get(p, 0.0)) for p in self.phases] +
+                ["%.4f" % (1e3 * (timers[t] - t0)) for t, t0 in zip(TIMERS, self.timer0)] +
+                [counts[c] - c0 for c, c0 in zip(COUNTERS, self.count0)])
+
+    def close(self):
+        global enabled
+        enabled = False
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    # report() – summary table: time per phase (and the worker
+    # sub-phases measured inside it), then the counters
+    def report(self):
+        ticks = max(self.ticks, 1)
+        total = sum(self.totals.values()) or 1e-12
+        lines = ["Profile over %d ticks (%.3f s in the loop)" % (self.ticks, total),
+                 "%-18s %10s %10s %7s" % ("phase", "total s", "ms/tick", "share")]
+        for p in self.phases + sorted(set(self.totals) - set(self.phases)):
+            secs = self.totals.get(p, 0.0)
+            lines.append("%-18s %10.4f %10.4f %6.1f%%" % (
+                p, secs, 1e3 * secs / ticks, 100.0 * secs / total))
+            if p == "workers":
+                for t in TIMERS:
+                    lines.append("  %-16s %10.4f %10.4f %6.1f%%" % (
+                        t, timers[t], 1e3 * timers[t] / ticks,
+                        100.0 * timers[t] / total))
+        lines.append("%-18s %10s %10s" % ("counter", "total", "per tick"))
+        for c in COUNTERS:
+            lines.append("%-18s %10d %10.1f" % (c, counts[c], counts[c] / ticks))
+        return "\n".join(lines)
@@ -0,0 +1,104 @@
+import zlib
+import numpy as np
+
+
+class RngStream:
+    """
+      One independent random stream (numpy.random.Generator) with the
+      few draws the simulation needs, generated in blocks so the hot
+      paths only pop a ready-made Python number off a buffer.
+
+      Parameters:
+      ##########
+      gen   : numpy.random.Generator
+      block : int     how many values one refill draws
+      """
+
+    def __init__(self, gen, block=1024):
+        self.gen    = gen
+        self.block  = block
+        self._ints  = {}     # (lo, hi) -> buffered integers in [lo, hi]
+        self._reals = []     # buffered floats in [0, 1)
+
+    # randint() – integer in [lo, hi], both ends included (random.randint)
+    def randint(self, lo, hi):
+        buf = self._ints.get((lo, hi))
+        if not buf:
+            buf = self._ints[(lo, hi)] = self.gen.integers(
+                lo, hi + 1, self.block).tolist()
+        return buf.pop()
+
+    # randrange() – integer in [0, n) (random.randrange with one argument)
+    def randrange(self, n):
+        return self.randint(0, n - 1)
+
+    # random() – float in [0, 1) (random.random)
+    def random(self):
+        if not self._reals:
+            self._reals = self.gen.random(self.block).tolist()
+        return self._reals.pop()
+
+    # state() / set_state() – everything needed to continue the stream
+    # exactly: the generator state plus whatever is still buffered
+    def state(self):
+        return {"gen": self.gen.bit_generator.state,
+                "ints": [[lo, hi, buf] for (lo, hi), buf in self._ints.items()],
+                "reals": self._reals}
+
+    def set_state(self, st):
+        self.gen.bit_generator.state = st["gen"]
+        self._ints  = {(lo, hi): list(buf) for lo, hi, buf in st["ints"]}
+        self._reals = list(st["reals"])
+
+
+class RngService:
+    """
+      Simulation-owned source of randomness: one seed, and an independent
+      RngStream per subsystem name ("lifespan", "flower", "move", ...).
+
+      Each stream is seeded from the run seed plus a hash of its name, so
+      adding draws in one subsystem never shifts the numbers another one
+      sees, and the same seed always gives the same run.
+
+      Parameters:
+      ##########
+      seed  : int or None   run seed (None → fresh entropy, see .seed)
+      block : int           buffer size of every stream
+      """
+
+    def __init__(self, seed=None, block=1024):
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % (2 ** 63))
+        self.seed    = int(seed)
+        self.block   = block
+        self.streams = {}
+
+    # stream() – the (lazily created) stream for one subsystem
+    def stream(self, name):
+        st = self.streams.get(name)
+        if st is None:
+            seq = np.random.SeedSequence(self.seed,
+                                         spawn_key=(zlib.crc32(name.encode()),))
+            st = self.streams[name] = RngStream(
+                np.random.Generator(np.random.PCG64(seq)), self.block)
+        return st
+
+    def state(self):
+        return {"seed": self.seed,
+                "streams": {name: st.state() for name, st in self.streams.items()}}
+
+    def set_state(self, st):
+        self.seed = int(st["seed"])
+        for name, sst in st["streams"].items():
+            self.stream(name).set_state(sst)
+
+
+# fallback service for objects created without one (e.g. from a Python
+# shell); simulations create and pass their own seeded RngService
+_shared = None
+
+def shared():
+    global _shared
+    if _shared is None:
+        _shared = RngService()
+    return _shared
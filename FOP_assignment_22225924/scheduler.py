@@ -0,0 +1,110 @@
+import heapq
+from bisect import bisect_left
+
+
+class Scheduler:
+    """
+      Heap-based discrete-event scheduler driven by the simulation loop.
+
+      Entities register "wake me at tick T" callbacks instead of counting
+      a timer down every tick; the loop calls advance(t) once at the start
+      of tick t and only the entities that have something to do run.
+      Events due on the same tick fire by rank, then in the order they
+      were scheduled.
+
+      Parameters:
+      ##########
+      tick : int     current tick (-1 = set-up, before the first tick)
+      """
+
+    def __init__(self, tick=-1):
+        self.tick    = tick
+        self.heap    = []    # (tick, rank, seq, fn, args)
+        self.counter = 0     # insertion number, keeps same-tick order stable
+
+    def __len__(self):
+        return len(self.heap)
+
+    # at() – call fn(*args) at the start of `tick`
+    def at(self, tick, fn, *args):
+        self.at_ranked(tick, 0, fn, *args)
+
+    # at_ranked() – like at(), but same-tick events fire by `rank` first
+    # (e.g. flowers in list order, as a per-tick polling loop visits them)
+    def at_ranked(self, tick, rank, fn, *args):
+        heapq.heappush(self.heap, (tick, rank, self.counter, fn, args))
+        self.counter += 1
+
+    # after() – call fn(*args) `delay` ticks from now
+    def after(self, delay, fn, *args):
+        self.at(self.tick + delay, fn, *args)
+
+    # advance() – move the clock to `tick` and fire every event due by then
+    def advance(self, tick):
+        self.tick = tick
+        heap = self.heap
+        while heap and heap[0][0] <= tick:
+            _, _, _, fn, args = heapq.heappop(heap)
+            fn(*args)
+
+    # next_tick() – tick of the earliest pending event (None if idle)
+    def next_tick(self):
+        return self.heap[0][0] if self.heap else None
+
+
+class Roster:
+    """
+      The agents that act this tick, kept in colony order.
+
+      Agents drop out while they sleep (or once they die) and are put
+      back in their original place when their wake-up event fires, so the
+      per-tick loop only touches agents with something to do and still
+      steps them in the same order as a loop over the whole colony.
+      """
+
+    def __init__(self):
+        self.keys   = []     # colony order numbers, sorted
+        self.agents = []     # agent for each key
+        self.order  = {}     # agent -> colony order number
+        self.counter = 0     # next colony order number
+
+    def __len__(self):
+        return len(self.agents)
+
+    def __iter__(self):
+        return iter(list(self.agents))   # copy: agents may leave meanwhile
+
+    def __contains__(self, agent):
+        i = bisect_left(self.keys, self.order.get(agent, -1))
+        return i < len(self.keys) and self.agents[i] is agent
+
+    # add() – a new agent (goes last) or a sleeper waking up
+    def add(self, agent):
+        key = self.order.get(agent)
+        if key is None:
+            key = self.order[agent] = self.counter
+            self.counter += 1
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.agents[i] is agent:
+            return                       # already active
+        self.keys.insert(i, key)
+        self.agents.insert(i, agent)
+
+    # keep() – drop every agent for which `active(agent)` is False
+    def keep(self, active):
+        keys, agents = [], []
+        for key, agent in zip(self.keys, self.agents):
+            if active(agent):
+                keys.append(key)
+                agents.append(agent)
+        self.keys, self.agents = keys, agents
+
+    # forget() – drop a released agent for good (see Arena.compact)
+    def forget(self, agent):
+        key = self.order.pop(agent, None)
+        if key is None:
+            return
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.agents[i] is agent:
+            del self.keys[i]
+            del self.agents[i]
@@ -0,0 +1,435 @@
+# the full Bee-World ruleset as one headless, importable engine
+import queue
+from itertools import count
+import numpy as np
+from worker import Worker, HIVEGRID
+from flowers import Flower
+from comb import Comb
+from combstore import CombStore
+from colony import Colony
+from wasp import Wasp
+from waspswarm import WaspSwarm
+from Queenbee import QueenBee
+from flowerindex import FlowerIndex
+from freecells import FreeCells
+from worldgrid import WorldGrid
+from beehash import BeeHash
+from scheduler import Scheduler, Roster
+from arena import Arena, COMPACT_EVERY
+from rngservice import RngService
+from profiler import NullProfiler
+from statsink import COLUMNS
+import checkpoint
+import terrain
+
+# the phases Simulation.step() reports to its profiler, in tick order
+PHASES = ("events", "wasp", "workers", "flowers", "stats", "observers")
+
+# season → (initial flowers, chance of a new flower per tick)
+SEASONS = {"summer": (40, 0.07),
+           "winter": (20, 0.02)}
+
+TREE, HOUSE, WATER, GRASS = 3, 15, 0, 10     # terrain codes (colours)
+
+
+class Simulation:
+    """
+      One run of the whole Bee-World: the queen laying workers, workers
+      foraging and filling the combs, flowers wilting and spawning by
+      season, and the wasps – everything beeworld_interactive.py shows,
+      without a window, so it runs at batch speed.
+
+      Configured from a parameter dictionary (batch.load_params() of a
+      params.csv).  Keys and defaults:
+        steps          200       ticks to run
+        num_bees       10        workers at the start
+        season         summer    summer / winter (see SEASONS)
+        num_flower     season's  initial flowers
+        spawn_flower_p season's  chance of a new flower per tick
+        num_trees      20        random trees (0 on a given terrain)
+        num_wasp       1         autonomous wasps
+        manual_wasp    0         1 → one more wasp, moved by move_wasp()
+
+      Without a terrain the interactive world is generated: 40 x 30 grass
+      with the house, the pool and random trees.  A terrain matrix and its
+      layout (see terrain.py) replace it.
+
+      step() advances one tick and returns False once the run is over
+      (all steps done or every comb full); run() steps to the end and
+      feeds sinks / observers like beeworld_batchmode.simulate().
+
+      Parameters:
+      ##########
+      prm      : dict             parameters (see above)
+      seed     : int or None      run seed (None → fresh, see .rngs.seed)
+      humanity : 2-D array        terrain matrix (None → generated world)
+      layout   : dict             hive layout of `humanity` (terrain.py)
+      prof     : Profiler         optional tick profiler over PHASES
+      """
+
+    def __init__(self, prm, seed=None, humanity=None, layout=None, prof=None):
+        prm = prm or {}
+        self.steps  = int(prm.get("steps", 200))
+        era         = str(prm.get("season", "summer")).strip().lower()
+        if era not in SEASONS:
+            raise ValueError("season must be 'summer' or 'winter', not " + repr(era))
+        self.era    = era
+        firststacy, stacyborn = SEASONS[era]
+        firststacy = int(prm.get("num_flower", firststacy))      # initial flower count
+        self.stacyborn = float(prm.get("spawn_flower_p", stacyborn))   # spawn probability
+        numbeetlejuice = int(prm.get("num_bees", 10))
+        self.prof   = prof or NullProfiler()
+
+        self.rngs  = RngService(seed)
+        self.place = self.rngs.stream("spawn")   # tree / flower placement and spawning
+        rngs, place = self.rngs, self.place
+
+        #
+        # world / hive grids and static obstacles
+        #
+        if humanity is None:
+            firstadams = int(prm.get("num_trees", 20))     # starting tree count
+            world_rows, world_cols = 40, 30                # world grid
+            humanity = np.full((world_rows, world_cols), GRASS)   # world matrix
+            humanity[3:9, 25:32] = HOUSE        # filled out shapes of house
+            humanity[15:20, 3:8] = WATER        # filled out shapes of water
+            layout = dict(terrain.default_layout(humanity.shape),
+                          world_entrance=(15, 20))   # portal link, hive in graph 2 to 1
+            # walkability bitmap: house and pool cells are blocked
+            genes = WorldGrid.from_terrain(humanity, blocked_codes=(HOUSE, WATER))
+            # the red hive patch of the world panel stays free of trees
+            scarletpatch = {(r, c) for r in range(19, 22) for c in range(14, 17)}
+        else:
+            firstadams = int(prm.get("num_trees", 0))
+            humanity = np.array(humanity)   # trees are drawn into it
+            layout = layout or terrain.default_layout(humanity.shape)
+            genes = WorldGrid.from_terrain(humanity)
+            scarletpatch = set()
+        terrain.check_layout(humanity.shape, layout)
+        self.humanity = humanity
+        self.layout   = layout
+        self.genes    = genes
+        self.frame    = humanity.shape
+        self.honeyhold = np.full(layout["hive_shape"], 5)      # hive matrix
+        self.hive = HIVEGRID
+        if layout["hive_shape"] != HIVEGRID.shape:
+            self.hive = WorldGrid.open(layout["hive_shape"])
+
+        self.humanityentrance  = layout["world_entrance"]   # matching cell on world grid
+        self.honeyholdexit     = layout["exit"]             # hive > world portal
+        self.honeyholdentrance = layout["entrance"]         # world > hive portal
+        self.scarletcell       = self.humanityentrance
+
+        # `vacant` holds every cell nothing stands on yet (no obstacle, tree
+        # or flower), so a random free spot is one draw however full the
+        # world is.  The red hive patch is kept out while the trees go in.
+        vacant = FreeCells.from_grid(genes, taken=scarletpatch)
+        self.adams = []
+        while len(self.adams) < firstadams:
+            pos = vacant.draw(place)  # a random free spot, taken from now on
+            if pos is None:
+                break                 # no room left for trees
+            self.adams.append(pos)
+            humanity[pos] = TREE
+            genes.add(pos)
+        # flowers may grow on the red patch, but never on the hive cell itself
+        for pos in scarletpatch:
+            vacant.give(pos)
+        vacant.take(self.scarletcell)
+        self.vacant = vacant
+
+        #
+        # combs (fixed positions inside the hive)
+        #
+        self.honeyhold[self.honeyholdexit]     = 2          # mark portals
+        self.honeyhold[self.honeyholdentrance] = 2
+        self.hexslot = []
+        for i, pos in enumerate(layout["combs"]):
+            self.hexslot.append(Comb("comb" + str(i + 1), pos))
+        for comb in self.hexslot:
+            comb.build()              # at the start the combs are built already
+        # "nearest non-full comb" and "all full?" without scanning every comb
+        self.hexstore = CombStore(self.hexslot)
+
+        # flow fields to the fixed targets (world-side entrance, hive exit,
+        # combs): computed once for the final terrain
+        genes.flows.pin(self.humanityentrance)
+        self.hive.flows.pin(self.honeyholdexit)
+        for comb in self.hexslot:
+            self.hive.flows.pin(comb.posrawhoney)
+
+        #
+        # flowers (ordinary / golden) – spawn in free cells only
+        #
+        self.stacies = []
+        self.born    = count()     # the flowers' creation numbers
+        while len(self.stacies) < firststacy:
+            if self._new_flower() is None:
+                break
+        self.floweridx = FlowerIndex(cellsize=5)   # spatial buckets so bees skip far flowers
+        self.floweridx.rebuild(self.stacies)
+
+        #
+        # all creatures (queen, bees, wasps)
+        #
+        # the queen keeps time and makes workers: every 30 ticks she adds a
+        # new worker at her spot, after about 500-700 ticks she dies
+        spawn = layout["spawn"]
+        self.eve = QueenBee("queen", spawn, self.honeyholdexit,
+                            self.honeyholdentrance, self.humanityentrance,
+                            rng=rngs, hive=self.hive)
+        # arena that holds the workers (dead ones are compacted away every
+        # COMPACT_EVERY ticks)
+        self.beetlejuices = Arena()
+        for i in range(numbeetlejuice):
+            self.beetlejuices.append(Worker("w" + str(i + 1), spawn,
+                                            self.honeyholdexit, self.honeyholdentrance,
+                                            self.humanityentrance, rng=rngs,
+                                            hive=self.hive))
+
+        # spatial hash of the outdoor bees, shared by the wasps
+        self.beehash = BeeHash(cellsize=4)
+        for bee in self.beetlejuices:
+            self.beehash.register(bee)
+
+        # running counts (alive, carrying, flowers with nectar …), and
+        # the bees' cells as arrays when there are wasps to hunt them
+        self.colony = Colony(self.hexstore, track=int(prm.get("num_wasp", 1)) > 0)
+        self.colony.rebuild(self.beetlejuices, self.stacies)
+
+        # wasps: the manual one (arrow keys in the window) starts at
+        # (10, 10), the autonomous ones there too and then on random
+        # free cells
+        self.goatis = []
+        self.goati  = None
+        if int(prm.get("manual_wasp", 0)):
+            self.goati = Wasp("wasp", (10, 10), manualsigma=True)
+            self.goatis.append(self.goati)
+        for k in range(int(prm.get("num_wasp", 1))):
+            pos = (10, 10)
+            if self.goatis or not genes.free(pos):
+                pos = vacant.pick(place)
+                if pos is None:
+                    break
+            self.goatis.append(Wasp("wasp" + str(len(self.goatis) + 1), pos))
+        # the autonomous ones hunt as one swarm (one batched pass per
+        # tick); their Wasp objects only mirror it for drawing
+        self.hunters   = [w for w in self.goatis if not w.manualsigma]
+        self.waspswarm = None
+        if self.hunters:
+            self.waspswarm = WaspSwarm([w.pos for w in self.hunters], genes)
+        self.commands = queue.SimpleQueue()   # manual wasp moves (move_wasp)
+
+        # event scheduler: the queen's spawn/death timers and the bees'
+        # rest delays are "wake me at tick T" events; the roster holds only
+        # the bees that have something to do this tick (in colony order)
+        self.sched  = Scheduler()            # tick -1 = set-up
+        self.roster = Roster()
+        for bee in self.beetlejuices:
+            self.roster.add(bee)
+        self.eve.arm(self.sched, self.beetlejuices, self._on_spawn)
+
+        self.t          = 0          # next tick
+        self.ascended   = False      # True once every comb is full
+        self.nectar_log = []         # living bees carrying nectar, per tick
+        self.history    = []         # living bees, per tick
+
+    def _on_spawn(self, newborn):    # queen laid an egg
+        self.roster.add(newborn)
+        self.beehash.register(newborn)
+        self.colony.enlist(newborn)
+
+    # _new_flower() – a flower on a random free cell (15 % golden), or
+    # None when no cell is free
+    def _new_flower(self):
+        pos = self.vacant.draw(self.place)   # not an obstacle, a flower or the hive
+        if pos is None:
+            return None
+        name = "flower" + str(len(self.stacies) + 1)
+        is_golden = self.place.random() < 0.15    # 15 % chance of golden
+        fl = Flower(name, pos, golden=is_golden, rng=self.rngs, born=next(self.born))
+        self.stacies.append(fl)
+        return fl
+
+    # move_wasp() – queue one step of the manual wasp (thread-safe; the
+    # move happens at the start of the next tick)
+    def move_wasp(self, dr, dc):
+        self.commands.put((dr, dc))
+
+    def _apply_wasp_commands(self):
+        goati, genes = self.goati, self.genes
+        while True:
+            try:
+                dr, dc = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            if goati is None:
+                continue
+            new = (goati.pos[0] + dr, goati.pos[1] + dc)
+            # keep the wasp inside the world grid and off the obstacles
+            if genes.free(new):
+                goati.pos = new
+            # sting any worker within radius 0.5 cells: the spatial hash
+            # only holds potential victims (alive and outside the hive)
+            self.beehash.sting(goati.pos, 0.5)
+
+    # _hunt() – one tick of the wasp swarm against the outdoor bees
+    # (reads the colony's per-slot arrays, no loop over the bees)
+    def _hunt(self):
+        hit = self.waspswarm.step(*self.colony.prey())
+        slots = self.beetlejuices.slots
+        self.beehash.kill([slots[s] for s in np.flatnonzero(hit)])
+        self.waspswarm.sync(self.hunters)
+
+    # row() – the statsink.COLUMNS of the last tick
+    def row(self):
+        return (self.t - 1, self.colony.nectar) + self.colony.census()
+
+    def done(self):
+        return self.ascended or self.t >= self.steps
+
+    # step() – one tick; False once the run is over
+    def step(self, observers=()):
+        if self.done():
+            return False
+        t, prof = self.t, self.prof
+        prof.begin(t)
+        self.sched.advance(t)      # queen lays an egg / dies, rested bees wake up
+        prof.lap("events")
+        self._apply_wasp_commands()
+        if self.waspswarm is not None:   # autonomous wasps: sting → chase → sting
+            self._hunt()
+        prof.lap("wasp")
+
+        # each worker acts (move, collect nectar, deposit, etc.)
+        roster, sched, beehash = self.roster, self.sched, self.beehash
+        colony = self.colony
+        for bee in roster:
+            bee.step_change(self.hexslot, self.stacies, self.genes, self.frame,
+                            self.floweridx, self.hexstore)
+            beehash.update(bee)       # moved, crossed a portal or died of old age
+            if colony.track:
+                colony.moved(bee)     # its cell for the wasp swarm
+            bee.sleep(sched, roster)  # resting → wake-up event, no countdown
+        roster.keep(lambda b: b.alive and not b.resttime)   # sleepers and dead leave
+        if t % COMPACT_EVERY == COMPACT_EVERY - 1:
+            for bee in self.beetlejuices.compact():   # dead bees give back their slots
+                roster.forget(bee)
+                beehash.forget(bee)
+        prof.lap("workers")
+
+        # keep only flowers that still have nectar – only needed on the
+        # ticks where the colony saw one run dry
+        if self.colony.forget_wilted():
+            remaining = []
+            for fl in self.stacies:
+                if fl.muj > 0:
+                    remaining.append(fl)
+                else:
+                    self.vacant.give(fl.pos)   # its cell can grow a new one
+            self.stacies = remaining
+            self.floweridx.prune()             # the same flowers leave the index
+        if self.place.random() < self.stacyborn:
+            fl = self._new_flower()
+            if fl is not None:
+                self.floweridx.add(fl)
+                self.colony.plant(fl)
+        prof.lap("flowers")
+
+        self.nectar_log.append(self.colony.carrying)
+        self.history.append(self.colony.alive)
+        prof.lap("stats")
+        for observe in observers:
+            observe(t, self.beetlejuices, self.hexslot, self.stacies)
+        prof.lap("observers")
+        prof.end()
+        self.t = t + 1
+        # every comb full: this was the last tick
+        self.ascended = self.hexstore.all_full()
+        return True
+
+    # run() – step to the end; one stats row per tick into every sink
+    # (statsink.COLUMNS), observers as in beeworld_batchmode.simulate().
+    # Returns the last row as a dict (None if no tick was recorded).
+    def run(self, sinks=(), observers=()):
+        last = None
+        while self.step(observers):
+            row = self.row()
+            for sink in sinks:
+                sink.append(row)
+            last = dict(zip(COLUMNS, row))
+        for sink in sinks:
+            sink.flush()
+        return last
+
+    # ------------------------------------------------------------------
+    # checkpoints (see checkpoint.py and beeworld_batchmode.simulate)
+    # ------------------------------------------------------------------
+
+    # snapshot() – (meta, arrays) of what a Simulation built again from the
+    # same parameters, seed and terrain does not have: workers, flowers,
+    # combs, free cells, the queen, the wasps and the logs.  The trees
+    # come back by themselves (the set-up draws them the same way).
+    def snapshot(self):
+        self.eve.settle()
+        meta = {"t": self.t, "ascended": self.ascended,
+                "nectar": self.colony.nectar, "born": self.beetlejuices.born}
+        arrays = checkpoint.pack_workers(self.beetlejuices)
+        arrays.update(checkpoint.pack_flowers(self.stacies))
+        arrays.update(checkpoint.pack_combs(self.hexslot))
+        arrays.update(checkpoint.pack_free(self.vacant))
+        arrays.update(checkpoint.pack_queen(self.eve))
+        if self.waspswarm is not None:
+            arrays.update(checkpoint.pack_wasps(self.waspswarm))
+        if self.goati is not None:
+            arrays["manual.pos"] = np.array(self.goati.pos, dtype=np.int64)
+        arrays["log.nectar"] = np.array(self.nectar_log, dtype=np.int64)
+        arrays["log.alive"]  = np.array(self.history, dtype=np.int64)
+        return meta, arrays
+
+    # restore() – write a snapshot() over this freshly built Simulation;
+    # `rng` is the RngService state saved with it.  The RNG goes last,
+    # after every constructor here has drawn.
+    def restore(self, meta, data, rng):
+        self.t        = meta["t"]
+        self.ascended = meta["ascended"]
+        hive, rngs = self.hive, self.rngs
+        self.beetlejuices = Arena(checkpoint.restore_workers(
+            data, lambda ID, pos, ex, en, ho:
+                Worker(ID, pos, ex, en, ho, rng=rngs, hive=hive)))
+        self.beetlejuices.born = meta["born"]    # the queen names by it
+        self.stacies = checkpoint.restore_flowers(data, lambda ID, pos, golden, n:
+            Flower(ID, pos, golden, rng=rngs, born=n))
+        self.born = count(checkpoint.next_born(self.stacies))
+        self.floweridx.rebuild(self.stacies)
+        checkpoint.restore_combs(data, self.hexslot)
+        self.hexstore.rebuild()
+        checkpoint.restore_free(data, self.vacant)
+        checkpoint.restore_queen(data, self.eve)
+        if self.waspswarm is not None:
+            checkpoint.restore_wasps(data, self.waspswarm)
+            self.waspswarm.sync(self.hunters)
+        if self.goati is not None:
+            self.goati.pos = tuple(data["manual.pos"].tolist())
+        self.nectar_log = data["log.nectar"].tolist()
+        self.history    = data["log.alive"].tolist()
+
+        # the indexes over the bees, rebuilt in colony order
+        self.beehash = BeeHash(cellsize=4)
+        for bee in self.beetlejuices:
+            self.beehash.register(bee)
+        self.colony.rebuild(self.beetlejuices, self.stacies)
+        self.colony.nectar = meta["nectar"]
+
+        # pending events on a new scheduler: the queen's death and next
+        # egg, the sleepers' wake-ups
+        self.sched  = Scheduler(self.t - 1)
+        self.roster = Roster()
+        for bee in self.beetlejuices:
+            self.roster.add(bee)
+        self.roster.keep(lambda b: b.alive and not b.resttime)
+        self.eve.arm(self.sched, self.beetlejuices, self._on_spawn)
+        for bee in self.beetlejuices:
+            if bee.wake_at is not None:
+                self.sched.at(bee.wake_at, bee.wake, self.roster)
+        rngs.set_state(rng)
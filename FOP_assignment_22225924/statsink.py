@@ -0,0 +1,198 @@
+import json, os, struct
+import numpy as np
+
+# Per-tick colony statistics, streamed to disk while the run goes on.
+# A sink buffers `chunk` rows in a fixed NumPy block and appends the
+# block to its file when it is full, so memory stays the same however
+# many steps are run and a crash loses at most one chunk.
+
+# every column a row carries, in order
+COLUMNS = ("step", "nectar", "bees_alive", "bees_out", "carrying",
+           "combs_full", "flowers_alive")
+
+# the classic batch-mode CSV
+CSV_COLUMNS = ("step", "nectar", "bees_alive")
+
+MAGIC = b"BEESTATS"
+
+
+class StatsSink:
+    """
+      Chunked row buffer.  The base class writes nowhere – it only keeps
+      the last row, which is all a sweep needs; subclasses add a file.
+
+      Parameters:
+      ##########
+      chunk : int     rows buffered before they are written out
+      rows  : int     rows already in the file (resuming a run), None → new file
+      """
+
+    columns = COLUMNS
+
+    def __init__(self, chunk=1000, rows=None):
+        self.chunk = max(1, int(chunk))
+        self.pick  = [COLUMNS.index(c) for c in self.columns]
+        self.buf   = np.empty((self.chunk, len(self.columns)), dtype=np.int64)
+        self.n     = 0                 # rows in the buffer
+        self.rows  = rows or 0         # rows written to the file
+        self.last  = None              # latest row, as a dict of COLUMNS
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # append() – one row, a tuple in COLUMNS order
+    def append(self, row):
+        self.last = dict(zip(COLUMNS, row))
+        self.buf[self.n] = [row[i] for i in self.pick]
+        self.n += 1
+        if self.n == self.chunk:
+            self.flush()
+
+    # flush() – hand the buffered rows to the file
+    def flush(self):
+        if self.n:
+            self._write(self.buf[:self.n])
+            self.rows += self.n
+            self.n = 0
+
+    def close(self):
+        self.flush()
+
+    def _write(self, block):
+        pass
+
+
+class CsvSink(StatsSink):
+    """
+      The step,nectar,bees_alive CSV of batch mode, written in chunks.
+
+      Parameters:
+      ##########
+      path  : str     CSV file
+      chunk : int     rows per write
+      rows  : int     resume: keep the header and this many rows, append after
+      """
+
+    columns = CSV_COLUMNS
+
+    def __init__(self, path, chunk=1000, rows=None):
+        StatsSink.__init__(self, chunk, rows)
+        self.path = path
+        self.fmt  = ",".join(["%d"] * len(self.columns))
+        if rows is None:
+            self.f = open(path, "w")
+            self.f.write(",".join(self.columns) + "\n")
+        else:
+            self.f = open(path, "r+")
+            # skip the header and `rows` lines, cut off the rest
+            for _ in range(rows + 1):
+                if not self.f.readline():
+                    raise ValueError(path + " has fewer rows than the checkpoint")
+            self.f.truncate(self.f.tell())
+            self.f.seek(0, os.SEEK_END)
+        self.f.flush()
+
+    def _write(self, block):
+        np.savetxt(self.f, block, fmt=self.fmt)
+        self.f.flush()
+
+    def close(self):
+        StatsSink.close(self)
+        self.f.close()
+
+
+class BinSink(StatsSink):
+    """
+      Compact binary columnar stats with every column of COLUMNS.
+
+      File layout: MAGIC, a uint32 header length and a JSON header
+      (column names, dtype), then one block per flush: a uint32 row
+      count followed by each column's values back to back.  Read it
+      with read_stats().
+
+      Parameters:
+      ##########
+      path  : str     output file
+      chunk : int     rows per block
+      rows  : int     resume: keep the blocks holding this many rows, append after
+      """
+
+    dtype = np.dtype("<i4")       # counts of a colony fit in 32 bits
+
+    def __init__(self, path, chunk=1000, rows=None):
+        StatsSink.__init__(self, chunk, rows)
+        self.path = path
+        if rows is None:
+            self.f = open(path, "wb")
+            head = json.dumps({"columns": list(self.columns),
+                               "dtype": self.dtype.str}).encode()
+            self.f.write(MAGIC + struct.pack("<I", len(head)) + head)
+        else:
+            self.f = open(path, "r+b")
+            columns, dtype = _header(self.f)
+            end, cut = 0, self.f.tell()
+            for n, at in _blocks(self.f, len(columns) * dtype.itemsize):
+                if end == rows:
+                    break
+                end, cut = end + n, at
+            if end != rows:
+                raise ValueError(path + " does not end a block at row " + str(rows))
+            self.f.truncate(cut)
+            self.f.seek(0, os.SEEK_END)
+        self.f.flush()
+
+    def _write(self, block):
+        cols = np.ascontiguousarray(block.T, dtype=self.dtype)
+        self.f.write(struct.pack("<I", len(block)) + cols.tobytes())
+        self.f.flush()
+
+    def close(self):
+        StatsSink.close(self)
+        self.f.close()
+
+
+# _header() – (columns, dtype) of a BinSink file positioned at its start
+def _header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a stats file")
+    size, = struct.unpack("<I", f.read(4))
+    head = json.loads(f.read(size))
+    return head["columns"], np.dtype(head["dtype"])
+
+
+# _blocks() – walk the blocks of a BinSink file positioned after its
+# header (`width` bytes per row): yields (rows, offset just past the
+# block), stopping at the end or at a torn last block
+def _blocks(f, width):
+    size = os.fstat(f.fileno()).st_size
+    while True:
+        raw = f.read(4)
+        if len(raw) < 4:
+            return
+        n, = struct.unpack("<I", raw)
+        f.seek(n * width, os.SEEK_CUR)
+        if f.tell() > size:
+            return
+        yield n, f.tell()
+
+
+# read_stats() – a BinSink file as a dict of column arrays
+def read_stats(path):
+    with open(path, "rb") as f:
+        columns, dtype = _header(f)
+        parts = []
+        while True:
+            raw = f.read(4)
+            if len(raw) < 4:
+                break
+            n, = struct.unpack("<I", raw)
+            block = np.frombuffer(f.read(n * len(columns) * dtype.itemsize), dtype)
+            if len(block) < n * len(columns):
+                break                                   # torn last block
+            parts.append(block.reshape(len(columns), n))
+    data = np.concatenate(parts, axis=1) if parts else \
+        np.empty((len(columns), 0), dtype)
+    return dict(zip(columns, data))
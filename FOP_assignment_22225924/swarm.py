@@ -0,0 +1,304 @@
+import numpy as np
+from worldgrid import WorldGrid
+
+# The eight neighbour steps in the same order Worker._sorted_neighbours
+# visits them, so argmin() breaks ties exactly like its stable sort.
+DIRS = np.array([(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                 if dr or dc], dtype=np.int64)
+
+
+class Swarm:
+    """
+      Structure-of-arrays worker engine: the whole colony of worker bees
+      lives in NumPy arrays and one call to step() advances every bee's
+      state machine (exit hive → forage → return → deposit → age) with
+      batched array operations instead of one Worker.step_change per bee.
+
+      Parameters:
+      ##########
+      n              : int            number of worker bees
+      spawn          : (row, col)     start cell inside the hive
+      hive_exit      : (row, col)     hive → world portal
+      hive_entrance  : (row, col)     world → hive portal
+      world_entrance : (row, col)     matching cell on the world grid
+      blocked        : 2-D bool array True where the world cell is an obstacle
+      combs          : list[Comb]     honeycomb cells (levels are mirrored
+                                      back into these objects by sync_combs)
+      hive_shape     : (rows, cols)   hive grid size
+      detection_range: int            Manhattan flower "vision" distance
+      rng            : numpy Generator, e.g. RngService.stream("swarm").gen
+                                      (fresh default_rng() if None)
+      """
+
+    def __init__(self, n, spawn, hive_exit, hive_entrance, world_entrance,
+                 blocked, combs, hive_shape=(20, 15), detection_range=5,
+                 rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # portal coordinates
+        self.honeyholdexit     = hive_exit
+        self.honeyholdentrance = hive_entrance
+        self.humanityentrance  = world_entrance
+        self.aimrange          = detection_range
+
+        # grids
+        self.blocked    = np.asarray(blocked, dtype=bool)
+        self.frame      = self.blocked.shape
+        self.hive_shape = hive_shape
+
+        # walkability grids, used for their cached flow fields towards the
+        # fixed targets (hive exit, world entrance, combs)
+        self.world = WorldGrid(self.frame, self.blocked)
+        self.hive  = WorldGrid.open(hive_shape)
+        self.world.flows.pin(world_entrance)
+        self.hive.flows.pin(hive_exit)
+        for comb in combs:
+            self.hive.flows.pin(comb.posrawhoney)
+        # nectar units per world cell, kept inside a zero border as wide as
+        # the detection range so flower searches need no bounds checks
+        # (int32: the one array of the engine that grows with the world)
+        R = detection_range
+        self._nectar = np.zeros((self.frame[0] + 2 * R, self.frame[1] + 2 * R),
+                                dtype=np.int32)
+        self.nectar  = self._nectar[R:R + self.frame[0], R:R + self.frame[1]]
+
+        # per-bee state, one slot per bee
+        self.r           = np.full(n, spawn[0], dtype=np.int64)
+        self.c           = np.full(n, spawn[1], dtype=np.int64)
+        self.age         = np.zeros(n, dtype=np.int64)
+        self.max_age     = self.rng.integers(120, 201, n)   # like randint(120, 200)
+        self.inhoneyhold = np.ones(n, dtype=bool)
+        self.hasmuj      = np.zeros(n, dtype=bool)
+        self.depositing  = np.zeros(n, dtype=bool)
+        self.alive       = np.ones(n, dtype=bool)
+        self.resttime    = np.zeros(n, dtype=np.int64)
+
+        # combs as arrays
+        self.combs     = list(combs)
+        self.comb_r    = np.array([c.posrawhoney[0] for c in self.combs], dtype=np.int64)
+        self.comb_c    = np.array([c.posrawhoney[1] for c in self.combs], dtype=np.int64)
+        self.comb_lvl  = np.array([c.rawhoneylvl for c in self.combs], dtype=np.int64)
+        self.comb_max  = np.array([c.maxrawhoneyy for c in self.combs], dtype=np.int64)
+        self.comb_built = np.array([c.built for c in self.combs], dtype=bool)
+        self.comb_full = np.array([c.fullrawhoneyy for c in self.combs], dtype=bool)
+
+        # flower search offsets inside the detection diamond, nearest first
+        offs = [(dr, dc) for dr in range(-R, R + 1) for dc in range(-R, R + 1)
+                if abs(dr) + abs(dc) <= R]
+        offs.sort(key=lambda o: o[0] * o[0] + o[1] * o[1])
+        self.offsets = np.array(offs, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.r)
+
+    # add_flower() – a flower with `muj` nectar units appears at `pos`
+    def add_flower(self, pos, muj):
+        self.nectar[pos] += muj
+
+    def alive_count(self):
+        return int(np.count_nonzero(self.alive))
+
+    # census() – (alive, outdoors, carrying, combs full, flower cells
+    # holding nectar) for the stats sinks
+    def census(self):
+        alive = self.alive
+        return (int(np.count_nonzero(alive)),
+                int(np.count_nonzero(alive & ~self.inhoneyhold)),
+                int(np.count_nonzero(alive & self.hasmuj)),
+                int(np.count_nonzero(self.comb_full)),
+                int(np.count_nonzero(self.nectar)))
+
+    # sync_combs() – copy the array levels back into the Comb objects
+    # (for plotting or for handing the hive back to the object engine)
+    def sync_combs(self):
+        for i, comb in enumerate(self.combs):
+            comb.rawhoneylvl   = int(self.comb_lvl[i])
+            comb.fullrawhoneyy = bool(self.comb_full[i])
+
+    # ------------------------------------------------------------------
+    # movement kernels (all work on index arrays of bees)
+    # ------------------------------------------------------------------
+
+    # legal-move matrix (k, 8) for bees `idx` on a grid of `shape`,
+    # `blocked` is None for the obstacle-free hive.
+    def _neighbours(self, idx, shape, blocked):
+        nr = self.r[idx, None] + DIRS[None, :, 0]
+        nc = self.c[idx, None] + DIRS[None, :, 1]
+        legal = (nr >= 0) & (nr < shape[0]) & (nc >= 0) & (nc < shape[1])
+        if blocked is not None:
+            legal[legal] = ~blocked[nr[legal], nc[legal]]
+        return nr, nc, legal
+
+    # greedy step: each bee takes its free neighbour closest (distance²)
+    # to its target; bees with no free neighbour stay put (the random
+    # fallback of Worker.move_towards tests the very same cells).
+    def _move_towards(self, idx, tr, tc, shape, blocked):
+        if len(idx) == 0:
+            return
+        nr, nc, legal = self._neighbours(idx, shape, blocked)
+        d2 = (nr - tr[:, None]) ** 2 + (nc - tc[:, None]) ** 2
+        d2 = np.where(legal, d2, np.iinfo(np.int64).max)
+        pick = np.argmin(d2, axis=1)            # first minimum = stable sort
+        ok = legal.any(axis=1)
+        rows = np.arange(len(idx))
+        self.r[idx[ok]] = nr[rows, pick][ok]
+        self.c[idx[ok]] = nc[rows, pick][ok]
+
+    # flow-field step: every bee in `idx` heads for the same pinned target,
+    # whose field gives the next cell with one lookup; bees the field
+    # cannot route (or, on a huge world, outside its box) fall back to
+    # the greedy step.
+    def _follow(self, idx, grid, target, blocked):
+        if len(idx) == 0:
+            return
+        nr, nc, ok = grid.flows.field(target).steps(self.r[idx], self.c[idx])
+        self.r[idx[ok]] = nr
+        self.c[idx[ok]] = nc
+        rest = idx[~ok]
+        self._move_towards(rest, np.full(len(rest), target[0]),
+                           np.full(len(rest), target[1]), grid.shape, blocked)
+
+    # random step: a uniformly random free neighbour, which is what
+    # shuffling the directions and taking the first free one gives.
+    def _random_move(self, idx, shape, blocked):
+        if len(idx) == 0:
+            return
+        nr, nc, legal = self._neighbours(idx, shape, blocked)
+        keys = np.where(legal, self.rng.random(legal.shape), 2.0)
+        pick = np.argmin(keys, axis=1)
+        ok = legal.any(axis=1)
+        rows = np.arange(len(idx))
+        self.r[idx[ok]] = nr[rows, pick][ok]
+        self.c[idx[ok]] = nc[rows, pick][ok]
+
+    # rank of every element among equal keys, in index order
+    # (0 for the first bee on a cell, 1 for the second, ...)
+    @staticmethod
+    def _rank_in_group(keys):
+        order = np.argsort(keys, kind="stable")
+        sk = keys[order]
+        start = np.r_[True, sk[1:] != sk[:-1]]
+        first = np.maximum.accumulate(np.where(start, np.arange(len(sk)), 0))
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[order] = np.arange(len(sk)) - first
+        return rank
+
+    # ------------------------------------------------------------------
+    # per-tick update
+    # ------------------------------------------------------------------
+
+    # step() – advance every bee by one tick.
+    # Returns how many loads of nectar were unloaded in the hive.
+    def step(self):
+        alive = self.alive
+
+        # 0️⃣  resting bees only count down (and do not age)
+        resting = alive & (self.resttime > 0)
+        self.resttime[resting] -= 1
+        act = alive & ~resting
+
+        # partition the active bees into the phases of Worker.step_change
+        leaving   = act & self.inhoneyhold & ~self.hasmuj & ~self.depositing
+        hunting   = act & ~self.inhoneyhold & ~self.hasmuj
+        returning = act & ~self.inhoneyhold & self.hasmuj
+        storing   = act & ~leaving & ~hunting & ~returning & self.depositing
+
+        self._leave(np.flatnonzero(leaving))
+        self._hunt(np.flatnonzero(hunting))
+        self._return(np.flatnonzero(returning))
+        unloaded = self._deposit(np.flatnonzero(storing))
+
+        # every active bee ages one tick (resting ones were skipped above)
+        self.age[act] += 1
+        self.alive[act & (self.age >= self.max_age)] = False
+        return unloaded
+
+    # 1️⃣  walk to the hive exit, then step through to the world
+    def _leave(self, idx):
+        ex_r, ex_c = self.honeyholdexit
+        there = (self.r[idx] == ex_r) & (self.c[idx] == ex_c)
+        out = idx[there]
+        self.inhoneyhold[out] = False
+        self.r[out], self.c[out] = self.humanityentrance
+        self._follow(idx[~there], self.hive, self.honeyholdexit, None)
+
+    # 2️⃣  find the nearest flower with nectar, walk to it and collect
+    def _hunt(self, idx):
+        if len(idx) == 0:
+            return
+        R = self.aimrange
+        # bees crowd onto few cells, so search once per occupied cell
+        cells, inv = np.unique(self.r[idx] * self.frame[1] + self.c[idx],
+                               return_inverse=True)
+        ur, uc = np.divmod(cells, self.frame[1])
+        rr = ur[:, None] + R + self.offsets[None, :, 0]
+        cc = uc[:, None] + R + self.offsets[None, :, 1]
+        hit = self._nectar[rr, cc] > 0           # (cells, offsets) flowers in range
+        found = hit.any(axis=1)[inv]
+        first = np.argmax(hit, axis=1)[inv]      # nearest offset with nectar
+
+        # no flower in sight → wander
+        self._random_move(idx[~found], self.frame, self.blocked)
+
+        idx, first = idx[found], first[found]
+        tr = self.r[idx] + self.offsets[first, 0]
+        tc = self.c[idx] + self.offsets[first, 1]
+        arrived = first == 0                     # offset (0, 0) sorts first
+        self._move_towards(idx[~arrived], tr[~arrived], tc[~arrived],
+                           self.frame, self.blocked)
+
+        # collecting: when several bees sit on the same flower only as
+        # many as it has nectar units succeed, lowest bee index first
+        bees = idx[arrived]
+        if len(bees) == 0:
+            return
+        flat = self._nectar.reshape(-1)          # view of the padded grid
+        cell = (self.r[bees] + R) * self._nectar.shape[1] + self.c[bees] + R
+        rank = self._rank_in_group(cell)
+        got = rank < flat[cell]
+        self.hasmuj[bees[got]] = True
+        self.resttime[bees[got]] = 2             # loading delay
+        np.subtract.at(flat, cell[got], 1)
+
+    # 3️⃣  carry the nectar back to the world-side hive entrance
+    def _return(self, idx):
+        en_r, en_c = self.humanityentrance
+        there = (self.r[idx] == en_r) & (self.c[idx] == en_c)
+        home = idx[there]
+        self.inhoneyhold[home] = True
+        self.depositing[home]  = True
+        self.r[home], self.c[home] = self.honeyholdentrance
+        self._follow(idx[~there], self.world, self.humanityentrance, self.blocked)
+
+    # 4️⃣  unload into the nearest non-full comb (Manhattan distance)
+    def _deposit(self, idx):
+        if len(idx) == 0:
+            return 0
+        open_ = ~self.comb_full
+        if not open_.any():
+            self.resttime[idx] = 3               # all combs full → wait
+            return 0
+        dist = (np.abs(self.comb_r[None, :] - self.r[idx, None]) +
+                np.abs(self.comb_c[None, :] - self.c[idx, None]))
+        dist = np.where(open_[None, :], dist, np.iinfo(np.int64).max)
+        tgt = np.argmin(dist, axis=1)
+        tr, tc = self.comb_r[tgt], self.comb_c[tgt]
+        arrived = (self.r[idx] == tr) & (self.c[idx] == tc)
+        for k in np.unique(tgt[~arrived]):       # one flow field per comb
+            self._follow(idx[~arrived & (tgt == k)], self.hive,
+                         (int(self.comb_r[k]), int(self.comb_c[k])), None)
+
+        bees, comb = idx[arrived], tgt[arrived]
+        if len(bees) == 0:
+            return 0
+        # several bees on one comb: only the free room is filled, the
+        # rest keep their load and pick another comb next tick
+        rank = self._rank_in_group(comb)
+        room = np.where(self.comb_built, self.comb_max - self.comb_lvl, 0)
+        fills = rank < room[comb]
+        ok = fills | ~self.comb_built[comb]      # unbuilt comb swallows the load
+        np.add.at(self.comb_lvl, comb[fills], 1)
+        self.comb_full |= self.comb_built & (self.comb_lvl >= self.comb_max)
+        self.hasmuj[bees[ok]]     = False
+        self.depositing[bees[ok]] = False
+        return int(np.count_nonzero(ok))
@@ -0,0 +1,126 @@
+# parameter sweep runner for batch mode
+import csv, sys, time, itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import beeworld_batchmode as batch
+import terrain
+
+# A sweep is a list of parameter sets × replicate seeds.  Every run goes
+# through batch.simulate() – the very same code as a single batch run –
+# inside a ProcessPoolExecutor, one run per task.
+
+
+# load_grid() reads "key,value1;value2;..." rows and returns the cartesian
+# product as a list of dictionaries (a single value just fixes the key).
+def load_grid(path):
+    keys, values = [], []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip():
+                continue
+            keys.append(row[0].strip())
+            values.append([v.strip() for v in row[1].split(";") if v.strip()])
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+# load_list() reads a table: header row of keys, one parameter set per row
+def load_list(path):
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    keys = [k.strip() for k in rows[0]]
+    return [dict(zip(keys, [v.strip() for v in row])) for row in rows[1:] if row]
+
+
+# run_seed() – deterministic seed of one run's RngService, from the base
+# seed, the parameter set and the replicate number only (not from
+# scheduling order)
+def run_seed(base, set_no, rep):
+    return int(np.random.SeedSequence([base, set_no, rep]).generate_state(1)[0])
+
+
+# terrain cache: each worker process loads the field file once
+# (a binary world file is memory-mapped, so the processes share its pages)
+_fields = {}
+
+def _field(path):
+    if path not in _fields:
+        _fields[path] = terrain.load(path)
+    return _fields[path]
+
+
+# _run_one() executes in a worker process; it never raises, a failing
+# run comes back with its error message so the rest of the sweep goes on
+def _run_one(field, prm, engine, seed):
+    t0 = time.perf_counter()
+    try:
+        humanity, layout = _field(field)
+        last = batch.simulate(humanity, prm, engine, seed, layout=layout)
+        status = "ok"
+        nectar = last["nectar"] if last else 0
+        alive  = last["bees_alive"] if last else 0
+    except Exception as err:      # failure isolation: report, don't crash
+        status = "error: " + type(err).__name__ + ": " + str(err)
+        nectar = alive = ""
+    return nectar, alive, status, time.perf_counter() - t0
+
+
+# run_sweep() fans every (parameter set, replicate) out over `jobs`
+# processes and returns one result row per run, in run order.
+# `base` holds the defaults every set is merged over.
+def run_sweep(field, base, sets, replicates=1, seed=0, engine="object",
+              jobs=None, progress=sys.stderr):
+    runs = []
+    for set_no, overrides in enumerate(sets):
+        prm = dict(base)
+        prm.update(overrides)
+        for rep in range(replicates):
+            runs.append((set_no, rep, prm, run_seed(seed, set_no, rep)))
+
+    results = [None] * len(runs)
+    done = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_run_one, field, prm, engine, s): i
+                   for i, (set_no, rep, prm, s) in enumerate(runs)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as err:  # the worker process itself died
+                results[i] = ("", "", "error: " + type(err).__name__ + ": " +
+                              str(err), 0.0)
+            done += 1
+            if progress is not None:
+                set_no, rep, prm, s = runs[i]
+                print("[" + str(done) + "/" + str(len(runs)) + "] set", set_no,
+                      "rep", rep, "→", results[i][2], file=progress, flush=True)
+
+    keys = sorted({k for _, _, prm, _ in runs for k in prm})
+    table = []
+    for i, (set_no, rep, prm, s) in enumerate(runs):
+        nectar, alive, status, secs = results[i]
+        row = {"run": i, "set": set_no, "replicate": rep, "seed": s}
+        row.update({k: prm.get(k, "") for k in keys})
+        row.update({"nectar": nectar, "bees_alive": alive,
+                    "status": status, "seconds": round(secs, 3)})
+        table.append(row)
+    return table
+
+
+# write_table() – one combined CSV for the whole sweep
+def write_table(path, table):
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(table[0].keys()))
+        w.writeheader()
+        w.writerows(table)
+
+
+# main() is called by beeworld_batchmode.main() for --sweep/--sweep-list
+def main(args):
+    base = batch.load_params(args.params)
+    sets = load_grid(args.sweep) if args.sweep else load_list(args.sweep_list)
+    table = run_sweep(args.field, base, sets, args.replicates,
+                      args.seed or 0, args.engine, args.jobs)
+    write_table(args.csv, table)
+    failed = sum(row["status"] != "ok" for row in table)
+    print("Sweep finished –", len(table), "runs;", failed, "failed")
+    print("Results saved to", args.csv)
@@ -0,0 +1,145 @@
+# binary terrain files: fast, memory-mapped world loading
+import argparse, json, os, sys
+import numpy as np
+
+# A world file is MAGIC, a uint32 header length and a JSON header (grid
+# shape and dtype plus the world's layout: hive size, portals, combs),
+# then the terrain grid itself, raw and row-major, starting on an
+# ALIGN-byte boundary.  load() maps the grid with np.memmap, so opening
+# even a 10k x 10k world reads only the header – cells are paged in when
+# something touches them.  Terrain codes (0/3/10/15) fit one byte each.
+#
+# load() also takes the old formats: a plain .npy array (memory-mapped
+# too) or the classic text CSV; both get default_layout().
+
+MAGIC = b"BEEWORLD"
+ALIGN = 64
+
+
+# default_layout() – the layout batch mode always had: a 20 x 15 hive
+# with its exit on the top row and entrance on the bottom row, three
+# combs, and the doorway in the middle of the world's bottom row
+def default_layout(shape):
+    rows, cols = int(shape[0]), int(shape[1])
+    return {"hive_shape":     (20, 15),
+            "spawn":          (10, 7),     # start cell in the hive
+            "exit":           (0, 7),      # hive > world portal
+            "entrance":       (19, 7),     # world > hive portal
+            "world_entrance": (rows - 1, cols // 2),
+            "combs":          [(7, 7), (7, 9), (9, 7)]}
+
+
+# _tuples() – layout read from JSON: lists back to (row, col) tuples
+def _tuples(layout):
+    out = {}
+    for k, v in layout.items():
+        if k == "combs":
+            out[k] = [tuple(int(x) for x in p) for p in v]
+        else:
+            out[k] = tuple(int(x) for x in v)
+    return out
+
+
+# _compact() – smallest dtype that holds the grid exactly (CSV values
+# are floats, but the terrain codes are small whole numbers)
+def _compact(grid):
+    grid = np.asarray(grid)
+    if grid.size and (grid.dtype.kind in "iub" or np.array_equal(grid, np.floor(grid))):
+        lo, hi = grid.min(), grid.max()
+        for dtype in (np.uint8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return grid.astype(dtype)
+    return grid.astype(np.float64)
+
+
+def _start(head):
+    return -(-(len(MAGIC) + 4 + len(head)) // ALIGN) * ALIGN
+
+
+# check_layout() – every layout cell must lie inside its grid
+def check_layout(shape, layout):
+    hive = layout["hive_shape"]
+    cells = [(k, layout[k], hive) for k in ("spawn", "exit", "entrance")]
+    cells += [("comb", p, hive) for p in layout["combs"]]
+    cells.append(("world_entrance", layout["world_entrance"], shape))
+    for name, (r, c), (rows, cols) in cells:
+        if not (0 <= r < rows and 0 <= c < cols):
+            raise ValueError("%s %s lies outside its %dx%d grid"
+                             % (name, (r, c), rows, cols))
+
+
+# save() – write a grid and its layout (None → default_layout) as a
+# world file; written to a temp file first, then renamed into place
+def save(path, grid, layout=None):
+    grid   = _compact(grid)
+    layout = dict(default_layout(grid.shape), **(layout or {}))
+    check_layout(grid.shape, layout)
+    head = json.dumps({"shape": list(grid.shape), "dtype": grid.dtype.str,
+                       "layout": layout}).encode()
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + np.array([len(head)], "<u4").tobytes() + head)
+        f.write(b"\0" * (_start(head) - f.tell()))
+        # row blocks, so a huge grid is never copied whole
+        for r in range(0, grid.shape[0], 1024):
+            f.write(np.ascontiguousarray(grid[r:r + 1024]).tobytes())
+    os.replace(tmp, path)
+
+
+# load() – (grid, layout) of a world file, .npy array or terrain CSV.
+# World files and .npy arrays come back as read-only memory maps.
+def load(path):
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic == MAGIC:
+            size = int(np.frombuffer(f.read(4), "<u4")[0])
+            raw  = f.read(size)
+    if magic == MAGIC:
+        head = json.loads(raw)
+        grid = np.memmap(path, dtype=np.dtype(head["dtype"]), mode="r",
+                         offset=_start(raw), shape=tuple(head["shape"]))
+        layout = dict(default_layout(grid.shape), **_tuples(head["layout"]))
+        return grid, layout
+    if magic.startswith(b"\x93NUMPY"):
+        grid = np.load(path, mmap_mode="r")
+    else:
+        grid = np.loadtxt(path, delimiter=",")
+    return grid, default_layout(grid.shape)
+
+
+def _cell(text):
+    r, c = text.split(",")
+    return int(r), int(c)
+
+
+# one-off converter:  python terrain.py world.csv world.bee [layout options]
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Convert a terrain CSV (or .npy) "
+                                             "to a memory-mapped world file")
+    ap.add_argument("src", help="terrain CSV, .npy or world file")
+    ap.add_argument("out", help="world file to write")
+    ap.add_argument("--hive", help="hive size ROWS,COLS (default 20,15)")
+    ap.add_argument("--spawn", help="bee start cell in the hive R,C")
+    ap.add_argument("--exit", help="hive > world portal R,C")
+    ap.add_argument("--entrance", help="world > hive portal R,C")
+    ap.add_argument("--doorway", help="matching world cell R,C "
+                                      "(default: middle of the bottom row)")
+    ap.add_argument("--combs", help="comb cells R,C;R,C;...")
+    args = ap.parse_args(argv)
+
+    grid, layout = load(args.src)
+    for key, text in (("hive_shape", args.hive), ("spawn", args.spawn),
+                      ("exit", args.exit), ("entrance", args.entrance),
+                      ("world_entrance", args.doorway)):
+        if text:
+            layout[key] = _cell(text)
+    if args.combs:
+        layout["combs"] = [_cell(p) for p in args.combs.split(";") if p.strip()]
+    save(args.out, grid, layout)
+    print("World", grid.shape, "saved to", args.out,
+          "(%d bytes)" % os.path.getsize(args.out))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+# same seed → same run: the stats CSV of two runs with one seed must be
+# byte-identical in every engine, and another seed must give another run
+import os
+import pytest
+import terrain
+import beeworld_batchmode as batch
+from statsink import CsvSink
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PRM = {"steps": 150, "num_bees": 12, "num_flower": 25, "spawn_flower_p": 0.1}
+
+
+def run(path, rows, engine, seed, prm=PRM):
+    humanity, layout = terrain.load(os.path.join(HERE, "world.csv"))
+    with CsvSink(path) as sink:
+        batch.simulate(humanity, dict(prm), engine, seed, sinks=(sink, rows),
+                       layout=layout)
+    with open(path, "rb") as f:
+        return f.read(), rows.rows
+
+
+@pytest.mark.parametrize("engine", ["object", "vector", "full"])
+def test_same_seed_same_stats(tmp_path, rows_sink, engine):
+    first, rows1 = run(str(tmp_path / "a.csv"), rows_sink(), engine, 7)
+    again, rows2 = run(str(tmp_path / "b.csv"), rows_sink(), engine, 7)
+    assert len(rows1) == PRM["steps"]
+    assert first == again and rows1 == rows2
+    other, rows3 = run(str(tmp_path / "c.csv"), rows_sink(), engine, 8)
+    assert rows3 != rows1
+
+
+def test_same_seed_with_wasps(tmp_path, rows_sink):
+    prm = dict(PRM, num_wasp=3)
+    first, rows1 = run(str(tmp_path / "a.csv"), rows_sink(), "object", 3, prm)
+    again, rows2 = run(str(tmp_path / "b.csv"), rows_sink(), "object", 3, prm)
+    assert first == again and rows1 == rows2
+
+
+# a sweep runs its scenarios elsewhere: per-run outputs are refused up
+# front instead of being silently dropped
+@pytest.mark.parametrize("extra, flag", [
+    (["--stats", "s.bin"], "--stats"),
+    (["--profile"], "--profile"),
+    (["--profile-trace", "p.csv"], "--profile"),
+    (["--tiles", "2"], "--tiles"),
+    (["--ensemble", "3"], "--ensemble")])
+def test_sweep_rejects_per_run_flags(monkeypatch, capsys, extra, flag):
+    monkeypatch.setattr(batch.sweep, "main", lambda args: pytest.fail("sweep ran"))
+    monkeypatch.setattr("sys.argv", ["beeworld_batchmode.py", "-f", "world.csv",
+                                     "-p", "p.csv", "--sweep", "g.csv",
+                                     "--csv", "out.csv"] + extra)
+    with pytest.raises(SystemExit):
+        batch.main()
+    assert "a sweep does not support " + flag in capsys.readouterr().err
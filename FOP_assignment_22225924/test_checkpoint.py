@@ -0,0 +1,88 @@
+# checkpoint → resume: a run that crashes after a snapshot and is resumed
+# from it must leave the same stats files as the run that never stopped
+import os
+import numpy as np
+import pytest
+import checkpoint
+import terrain
+import beeworld_batchmode as batch
+from statsink import CsvSink, BinSink, read_stats
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PRM = {"steps": 120, "num_bees": 40, "num_flower": 25, "spawn_flower_p": 0.1}
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_at(tick):              # observer that kills the run at `tick`
+    def observe(step, *world):
+        if step == tick:
+            raise Crash
+    return observe
+
+
+# run() – one batch run into a stats CSV and binary file under `tmp`;
+# returns the CSV bytes and the binary columns
+def run(tmp, prm, engine, ckpt=None, every=0, resume=None, observers=()):
+    humanity, layout = terrain.load(os.path.join(HERE, "world.csv"))
+    csv, stats = str(tmp / "stats.csv"), str(tmp / "stats.bin")
+    rows = None if resume is None else resume[0]["step"] + 1
+    with CsvSink(csv, rows=rows) as a, BinSink(stats, rows=rows) as b:
+        batch.simulate(humanity, dict(prm), engine, 5, ckpt, every, resume,
+                       (a, b), observers, layout=layout)
+    with open(csv, "rb") as f:
+        return f.read(), read_stats(stats)
+
+
+@pytest.mark.parametrize("engine, extra", [
+    ("object", {}), ("vector", {}), ("full", {}),
+    ("object", {"flower_regrow": 1})])     # pending regrowth events too
+@pytest.mark.parametrize("wasps", [0, 3])
+def test_resume_matches_uninterrupted_run(tmp_path, engine, extra, wasps):
+    prm = dict(PRM, num_wasp=wasps, **extra)
+    (tmp_path / "whole").mkdir()
+    whole_csv, whole = run(tmp_path / "whole", prm, engine)
+
+    # snapshots every 25 ticks; the crash at tick 55 leaves the one
+    # written after tick 49 and a stats file already past it
+    (tmp_path / "part").mkdir()
+    snap = str(tmp_path / "run.ckpt")
+    with pytest.raises(Crash):
+        run(tmp_path / "part", prm, engine, snap, 25, observers=[crash_at(55)])
+    meta, data = checkpoint.load(snap)
+    assert meta["step"] == 49 and meta["engine"] == engine
+
+    again_csv, again = run(tmp_path / "part", prm, engine, resume=(meta, data))
+    assert again_csv == whole_csv
+    assert set(again) == set(whole)
+    for col in whole:
+        assert (again[col] == whole[col]).all(), col
+    if wasps:                    # the wasps really were part of the state
+        assert whole["bees_alive"][-1] < PRM["num_bees"]
+
+
+# the full engine over the queen's whole life: she lays a worker every 30
+# ticks and dies after 500-700; without nectar the combs never fill, so
+# the run is not cut short.  Resumed before, around and after her death.
+@pytest.mark.parametrize("crash, snap_step", [(130, 124), (520, 499), (760, 749)])
+def test_full_engine_resumes_the_queen(tmp_path, crash, snap_step):
+    prm = {"steps": 800, "num_bees": 5, "num_flower": 0, "spawn_flower_p": 0,
+           "num_wasp": 1}
+    (tmp_path / "whole").mkdir()
+    whole_csv, whole = run(tmp_path / "whole", prm, "full")
+    assert len(whole["step"]) == 800
+    born = np.diff(whole["bees_alive"]) > 0
+    assert 15 < born.sum() < 24 and not born[700:].any()   # then she is dead
+
+    (tmp_path / "part").mkdir()
+    snap = str(tmp_path / "run.ckpt")
+    with pytest.raises(Crash):
+        run(tmp_path / "part", prm, "full", snap, 125, observers=[crash_at(crash)])
+    meta, data = checkpoint.load(snap)
+    assert meta["step"] == snap_step
+    again_csv, again = run(tmp_path / "part", prm, "full", resume=(meta, data))
+    assert again_csv == whole_csv
+    for col in whole:
+        assert (again[col] == whole[col]).all(), col
@@ -0,0 +1,59 @@
+# CombStore must pick exactly the comb the old linear scan in
+# Worker.step_change picked: min() over the non-full combs by Manhattan
+# distance, first in hive order on ties
+import random
+import pytest
+from comb import Comb
+from combstore import CombStore
+
+
+def linear_open(combs, pos):
+    targets = [(c, abs(c.posrawhoney[0] - pos[0]) + abs(c.posrawhoney[1] - pos[1]))
+               for c in combs if not c.fullrawhoneyy]
+    if not targets:
+        return None
+    return min(targets, key=lambda t: t[1])[0]
+
+
+def random_hive(seed, n, rows, cols):
+    rnd = random.Random(seed)
+    cells = rnd.sample([(r, c) for r in range(rows) for c in range(cols)], n)
+    combs = [Comb("comb%d" % i, pos) for i, pos in enumerate(cells)]
+    for comb in combs:
+        comb.build()
+    return rnd, combs
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("cellsize", [1, 4, 9])
+def test_nearest_open_matches_linear_scan(seed, cellsize):
+    rnd, combs = random_hive(seed, 60, 20, 15)
+    store = CombStore(combs, cellsize)
+    while True:
+        pos = (rnd.randrange(-2, 22), rnd.randrange(-2, 17))
+        best = linear_open(combs, pos)
+        assert store.nearest_open(pos) is best
+        assert store.full_count() == sum(c.fullrawhoneyy for c in combs)
+        assert store.all_full() == (best is None)
+        if best is None:
+            break
+        best.addrawhoney()                   # a bee deposits a load
+
+
+def test_rebuild_reads_the_combs_back():
+    rnd, combs = random_hive(0, 30, 20, 15)
+    store = CombStore(combs)
+    for comb in combs[::3]:                  # written directly, as on restore
+        comb.store = None
+        comb.rawhoneylvl = comb.maxrawhoneyy
+        comb.fullrawhoneyy = True
+    store.rebuild()
+    assert store.full_count() == 10
+    for _ in range(100):
+        pos = (rnd.randrange(20), rnd.randrange(15))
+        assert store.nearest_open(pos) is linear_open(combs, pos)
+
+
+def test_no_combs_is_all_full():
+    store = CombStore([])
+    assert store.all_full() and store.nearest_open((0, 0)) is None
@@ -0,0 +1,35 @@
+# replica k of an ensemble is the very run `--engine vector --seed s_k`
+# makes, step for step, whatever the number of replicas
+import os
+import numpy as np
+import pytest
+import terrain
+import ensemble
+import beeworld_batchmode as batch
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PRM = {"steps": 200, "num_bees": 15, "num_flower": 25, "spawn_flower_p": 0.05}
+
+
+@pytest.mark.parametrize("k", [1, 4])
+def test_replicas_are_the_vector_runs(rows_sink, k):
+    humanity, layout = terrain.load(os.path.join(HERE, "world.csv"))
+    seeds, nectar, alive = ensemble.simulate(humanity, dict(PRM), k, seed=11,
+                                             layout=layout)
+    assert nectar.shape == alive.shape == (PRM["steps"], k)
+    for rep, seed in enumerate(seeds):
+        rows = rows_sink()
+        batch.simulate(humanity, dict(PRM), "vector", seed, sinks=(rows,),
+                       layout=layout)
+        run = np.array(rows.rows)
+        assert (nectar[:, rep] == run[:, 1]).all(), rep
+        assert (alive[:, rep] == run[:, 2]).all(), rep
+    assert len(set(seeds)) == k
+
+
+def test_replica_does_not_depend_on_k():
+    humanity, layout = terrain.load(os.path.join(HERE, "world.csv"))
+    _, one, _ = ensemble.simulate(humanity, dict(PRM), 1, seed=11, layout=layout)
+    _, three, _ = ensemble.simulate(humanity, dict(PRM), 3, seed=11, layout=layout)
+    assert (three[:, 0] == one[:, 0]).all()
+    assert (three[:, 1] != three[:, 0]).any()      # the others are other runs
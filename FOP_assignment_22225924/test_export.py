@@ -0,0 +1,58 @@
+# recorded frames carry the predators and the queen, and draw them
+import os
+import numpy as np
+import pytest
+import terrain
+import beeworld_batchmode as batch
+import export
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PRM = {"steps": 20, "num_bees": 10, "num_flower": 20, "num_wasp": 3}
+
+
+def record(engine):
+    humanity, layout = terrain.load(os.path.join(HERE, "world.csv"))
+    rec = export.Recorder()
+    batch.simulate(humanity, dict(PRM), engine, 4, observers=[rec],
+                   layout=layout)
+    return rec, humanity, layout
+
+
+def draw(rec, humanity, layout):
+    fig, axes = export.plt.subplots(1, 2)
+    export.draw_frame(axes, rec.frames[-1], humanity, layout["world_entrance"],
+                      rec.combpos, np.full(layout["hive_shape"], 5))
+    return fig, axes
+
+
+# (x, y) points of every scatter on `ax` drawn in `colour`
+def markers(ax, colour):
+    rgba = export.matplotlib.colors.to_rgba(colour)
+    return sorted(tuple(xy) for coll in ax.collections
+                  if len(coll.get_facecolors()) and
+                  tuple(coll.get_facecolors()[0]) == rgba
+                  for xy in coll.get_offsets().tolist())
+
+
+@pytest.mark.parametrize("engine", ["object", "vector", "full"])
+def test_frames_show_living_wasps(engine):
+    rec, humanity, layout = record(engine)
+    wasps = rec.frames[-1][4]
+    assert len(wasps) == 3
+    fig, axes = draw(rec, humanity, layout)
+    assert markers(axes[1], "red") == sorted((float(c), float(r)) for r, c in wasps)
+    export.plt.close(fig)
+
+
+def test_frames_show_the_queen():
+    rec, humanity, layout = record("full")
+    queen = rec.frames[-1][5]
+    assert queen == layout["spawn"]
+    fig, axes = draw(rec, humanity, layout)
+    assert markers(axes[0], "purple") == [(float(queen[1]), float(queen[0]))]
+    export.plt.close(fig)
+
+
+def test_no_queen_outside_the_full_engine():
+    rec, humanity, layout = record("object")
+    assert all(frame[5] is None for frame in rec.frames)
@@ -0,0 +1,66 @@
+# FlowerIndex must pick exactly the flower the old linear scan in
+# Worker.step_change picked: non-empty, within Manhattan aimrange,
+# min() by squared distance, first in flower-list order on ties
+import random
+import pytest
+import rngservice
+from flowers import Flower
+from flowerindex import FlowerIndex
+
+
+def linear_in_range(stacies, pos, rng):
+    found = [f for f in stacies
+             if f.muj > 0 and abs(f.pos[0] - pos[0]) + abs(f.pos[1] - pos[1]) <= rng]
+    return sorted(found, key=lambda f: (f.pos[0] - pos[0]) ** 2 +
+                                       (f.pos[1] - pos[1]) ** 2)
+
+
+def linear_nearest(stacies, pos, rng):
+    found = linear_in_range(stacies, pos, rng)
+    return found[0] if found else None
+
+
+def random_field(seed, n, side):
+    rnd = random.Random(seed)
+    svc = rngservice.RngService(seed)
+    # several flowers may share a cell: ties must follow list order
+    stacies = [Flower("flower%d" % i, (rnd.randrange(side), rnd.randrange(side)),
+                      golden=rnd.random() < 0.1, rng=svc) for i in range(n)]
+    for fl in stacies:
+        if rnd.random() < 0.2:
+            fl.muj = 0                       # drained
+    return rnd, stacies
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("cellsize", [1, 5, 7])
+def test_nearest_matches_linear_scan(seed, cellsize):
+    rnd, stacies = random_field(seed, 300, 40)
+    idx = FlowerIndex(cellsize)
+    idx.rebuild(stacies)
+    for _ in range(300):
+        pos = (rnd.randrange(-3, 43), rnd.randrange(-3, 43))
+        rng = rnd.randrange(0, 12)
+        assert idx.nearest(pos, rng) is linear_nearest(stacies, pos, rng)
+        assert idx.in_range(pos, rng) == linear_in_range(stacies, pos, rng)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_index_follows_removals_and_prune(seed):
+    rnd, stacies = random_field(seed, 200, 30)
+    idx = FlowerIndex()
+    idx.rebuild(stacies)
+    for step in range(60):
+        if rnd.random() < 0.5 and stacies:           # a flower wilts
+            fl = stacies.pop(rnd.randrange(len(stacies)))
+            idx.remove(fl)
+        else:                                        # bees drain one
+            fl = rnd.choice(stacies)
+            fl.muj = 0
+        if step % 10 == 9:                           # interactive prune
+            stacies = [fl for fl in stacies if fl.muj > 0]
+            idx.prune()
+            assert len(idx) == len(stacies)
+        pos = (rnd.randrange(30), rnd.randrange(30))
+        assert idx.nearest(pos, 5) is linear_nearest(stacies, pos, 5)
+        assert idx.in_range(pos, 8) == linear_in_range(stacies, pos, 8)
@@ -0,0 +1,68 @@
+# the event-driven timers (Flower.arm, QueenBee.arm on a Scheduler) must
+# be indistinguishable from calling step_changes() / step_change() on
+# every flower and the queen at the start of every tick
+import random
+import pytest
+from rngservice import RngService
+from flowers import Flower
+from Queenbee import QueenBee
+from scheduler import Scheduler
+
+TICKS = 800                      # past the queen's death (500-700 ticks)
+
+
+def world(seed):
+    rngs = RngService(seed)
+    rnd = random.Random(seed)
+    stacies = [Flower("F" + str(i), (i, i), golden=rnd.random() < 0.2, rng=rngs)
+               for i in range(40)]
+    eve = QueenBee("queen", (10, 7), (0, 7), (19, 7), (29, 15), rng=rngs)
+    return stacies, eve, []
+
+
+# bees drain random flowers: the same picks on both paths
+def picks(seed):
+    rnd = random.Random(seed + 1)
+    return [[rnd.randrange(40) for _ in range(rnd.randrange(6))]
+            for _ in range(TICKS)]
+
+
+def polled(seed):
+    stacies, eve, bees = world(seed)
+    log = []
+    for t, drained in enumerate(picks(seed)):
+        for fl in stacies:
+            fl.step_changes()
+        eve.step_change([], bees, None)
+        for i in drained:
+            stacies[i].collect_nectar()
+        log.append(([fl.muj for fl in stacies], eve.age, eve.spawn_cd,
+                    eve.alive, len(bees)))
+    return log
+
+
+def evented(seed):
+    stacies, eve, bees = world(seed)
+    sched = Scheduler()
+    for fl in stacies:
+        fl.arm(sched)
+    eve.arm(sched, bees)
+    log = []
+    for t, drained in enumerate(picks(seed)):
+        sched.advance(t)
+        for i in drained:
+            stacies[i].collect_nectar()
+        eve.settle()             # age / spawn_cd as the polling path has them
+        log.append(([fl.muj for fl in stacies], eve.age, eve.spawn_cd,
+                    eve.alive, len(bees)))
+    return log
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_events_match_polling_every_tick(seed):
+    a, b = polled(seed), evented(seed)
+    for t, (pa, pb) in enumerate(zip(a, b)):
+        assert pa == pb, t
+    spawns = [t for t in range(1, TICKS) if a[t][4] > a[t - 1][4]]
+    assert spawns[:3] == [29, 59, 89]         # every 30 ticks …
+    assert not a[-1][3]                       # … until she dies
@@ -0,0 +1,39 @@
+# the vector engine (Swarm) is a different random realisation of the same
+# model: averaged over seeds its nectar and bees_alive curves must follow
+# the object engine's
+import os
+import numpy as np
+import terrain
+import beeworld_batchmode as batch
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SEEDS = range(16)
+# 16 combs (80 loads) so the nectar curve does not flatten at once
+PRM = {"steps": 300, "num_bees": 25, "num_flower": 30, "spawn_flower_p": 0.05}
+COMBS = [(r, c) for r in (4, 7, 10, 13) for c in (3, 6, 9, 12)]
+
+
+def mean_curves(engine, rows_sink):
+    humanity, layout = terrain.load(os.path.join(HERE, "world.csv"))
+    layout = dict(layout, combs=COMBS)
+    runs = []
+    for seed in SEEDS:
+        rows = rows_sink()
+        batch.simulate(humanity, dict(PRM), engine, seed, sinks=(rows,),
+                       layout=layout)
+        runs.append(np.array(rows.rows))
+    mean = np.mean(runs, axis=0)
+    return mean[:, 1], mean[:, 2]             # nectar, bees_alive
+
+
+def test_vector_follows_object_engine(rows_sink):
+    nectar, alive = mean_curves("object", rows_sink)
+    v_nectar, v_alive = mean_curves("vector", rows_sink)
+    assert nectar[-1] > 15 and alive[-1] < PRM["num_bees"]   # a full season
+    # tolerance at every tick: mean nectar within 10 % of the object
+    # engine's final total, mean bees_alive within 15 % of the colony
+    assert np.abs(v_nectar - nectar).max() <= 0.10 * nectar[-1]
+    assert np.abs(v_alive - alive).max() <= 0.15 * PRM["num_bees"]
+    # and the same season length: half the bees gone within 10 ticks
+    half = PRM["num_bees"] / 2
+    assert abs(np.argmax(alive < half) - np.argmax(v_alive < half)) <= 10
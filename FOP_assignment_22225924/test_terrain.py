@@ -0,0 +1,49 @@
+# large-world check: a synthetic world file bigger than PIN_CELLS is
+# memory-mapped, set up and run for a tick in both engines
+import numpy as np
+import pytest
+import terrain
+import beeworld_batchmode as batch
+from flowfield import PIN_CELLS, PIN_RADIUS
+from worldgrid import WorldGrid
+
+
+@pytest.fixture(scope="module")
+def big_world(tmp_path_factory):
+    side = 3000                  # 9M cells, over PIN_CELLS
+    grid = np.full((side, side), 10, dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    grid[rng.random(grid.shape) < 0.05] = 3          # trees
+    grid[side - 1, side // 2] = 10                   # the doorway stays free
+    path = str(tmp_path_factory.mktemp("world") / "big.bee")
+    terrain.save(path, grid)
+    return path
+
+
+def test_big_world_is_memory_mapped(big_world):
+    humanity, layout = terrain.load(big_world)
+    assert isinstance(humanity, np.memmap)
+    assert humanity.shape == (3000, 3000)
+    assert layout == terrain.default_layout(humanity.shape)
+
+
+def test_big_world_pins_a_bounded_field(big_world):
+    humanity, layout = terrain.load(big_world)
+    assert humanity.size > PIN_CELLS
+    genes = WorldGrid.from_terrain(humanity)
+    assert len(genes) == np.count_nonzero(humanity == 3)
+    genes.flows.pin(layout["world_entrance"])
+    fld = genes.flows.field(layout["world_entrance"])
+    assert fld.shape[0] <= 2 * PIN_RADIUS + 3 and fld.shape[1] <= 2 * PIN_RADIUS + 3
+
+
+@pytest.mark.parametrize("engine", ["object", "vector"])
+def test_big_world_runs_a_tick(big_world, rows_sink, engine):
+    humanity, layout = terrain.load(big_world)
+    sink = rows_sink()
+    prm = {"steps": 2, "num_bees": 20, "num_flower": 500}
+    last = batch.simulate(humanity, prm, engine, seed=1, sinks=(sink,),
+                          layout=layout)
+    assert [row[0] for row in sink.rows] == [0, 1]
+    assert last["bees_alive"] == 20
+    assert sink.rows[-1][-1] == 500            # every flower still blooming
@@ -0,0 +1,16 @@
+# the tiled run's head-count: a bee crossing a band border is counted by
+# exactly one tile on every tick
+import numpy as np
+import tiles
+
+
+def test_bees_alive_holds_while_no_bee_can_die(rows_sink):
+    humanity = np.full((120, 60), 10)                # all grass
+    prm = {"steps": 119, "num_bees": 300, "num_flower": 10,
+           "spawn_flower_p": 0}
+    rows = rows_sink()
+    tiles.simulate(humanity, prm, 6, seed=1, sinks=(rows,))
+    assert [row[0] for row in rows.rows] == list(range(119))
+    # a worker lives at least 120 ticks and there are no wasps
+    assert [row[2] for row in rows.rows] == [300] * 119
+    assert max(row[3] for row in rows.rows) > 0      # bees did go out
@@ -0,0 +1,36 @@
+# a trace keeps the hive size of its world and one bee per worker slot,
+# also across Arena compaction
+from types import SimpleNamespace
+import numpy as np
+from arena import Arena
+from trajectory import TraceWriter, Trace
+
+
+class _Bee:                          # an Arena keeps agents in sets
+    def __init__(self, r, c):
+        self.pos, self.alive, self.inhoneyhold, self.hasmuj = (r, c), True, False, False
+
+
+def test_slots_follow_their_bee_through_compaction(tmp_path):
+    path = str(tmp_path / "run.trace")
+    combs = [SimpleNamespace(posrawhoney=(1, 1), maxrawhoneyy=5,
+                             rawhoneylvl=0, built=True)]
+    a, b, c = _Bee(1, 1), _Bee(2, 2), _Bee(3, 3)
+    bees = Arena([a, b, c])
+    tw = TraceWriter(path, np.full((10, 12), 10), (0, 0), 3, 4, 0,
+                     hive_shape=(7, 9))
+    tw.write(0, bees, combs, [])
+    a.alive = False
+    bees.compact()                   # b and c move down a list index …
+    c.pos = (4, 4)
+    tw.write(1, bees, combs, [])
+    bees.add(_Bee(5, 5))             # … and the newborn reuses a's slot
+    tw.write(2, bees, combs, [])
+    tw.close()
+
+    tr = Trace(path)
+    assert tr.hive_shape == (7, 9)
+    r, flags = tr.a["worker_r"], tr.a["worker_flags"]
+    assert r[0, :3].tolist() == [1, 2, 3]
+    assert flags[1, 0] == 0 and r[1, 1:3].tolist() == [2, 4]
+    assert r[2, :3].tolist() == [5, 2, 4]
@@ -0,0 +1,107 @@
+# WaspSwarm: one sting per bee however many wasps reach it, distinct
+# targets for distinct wasps, and a lone wasp that hunts exactly like
+# the Wasp object (Wasp._step_ai)
+import random
+import numpy as np
+import pytest
+from wasp import Wasp
+from waspswarm import WaspSwarm
+from worldgrid import WorldGrid
+from beehash import BeeHash
+
+
+class Bee:                       # what Wasp.step_change reads of a Worker
+    def __init__(self, pos):
+        self.pos = pos
+        self.alive = True
+        self.inhoneyhold = False
+
+    def die(self):
+        self.alive = False
+
+
+def arrays(bees):
+    br = np.array([b.pos[0] for b in bees])
+    bc = np.array([b.pos[1] for b in bees])
+    prey = np.array([b.alive and not b.inhoneyhold for b in bees])
+    return br, bc, prey
+
+
+def test_bee_stung_by_two_wasps_dies_once():
+    genes = WorldGrid.open((20, 20))
+    # both wasps have the bee at (10, 10) in their sting square
+    wasps = WaspSwarm([(9, 9), (11, 11)], genes)
+    br, bc = np.array([10, 0]), np.array([10, 0])
+    hit = wasps.step(br, bc, np.array([True, True]))
+    assert hit.tolist() == [True, False]
+    assert int(np.count_nonzero(hit)) == 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_wasps_get_different_bees(seed):
+    rnd = random.Random(seed)
+    genes = WorldGrid.open((60, 60))
+    spots = lambda n: [(rnd.randrange(60), rnd.randrange(60)) for _ in range(n)]
+    wasps = WaspSwarm(spots(8), genes)
+    # the bees crowd one corner, so the wasps all want the same few
+    br = np.array([rnd.randrange(10) for _ in range(30)])
+    bc = np.array([rnd.randrange(10) for _ in range(30)])
+    prey = np.ones(30, dtype=bool)
+    prey[::4] = False                          # indoors or dead
+    target = wasps.assign(br, bc, prey)
+    assert (target >= 0).all() and prey[target].all()
+    assert len(set(target.tolist())) == len(wasps)
+
+
+def test_wasps_share_when_bees_run_out():
+    genes = WorldGrid.open((20, 20))
+    wasps = WaspSwarm([(0, 0), (19, 19), (0, 19)], genes)
+    target = wasps.assign(np.array([5, 15]), np.array([5, 15]),
+                          np.array([True, True]))
+    assert sorted(set(target.tolist())) == [0, 1]   # every wasp still hunts
+
+
+def random_world(rnd, rows=30, cols=40):
+    blocked = np.array([[rnd.random() < 0.15 for _ in range(cols)]
+                        for _ in range(rows)])
+    cells = [(rnd.randrange(rows), rnd.randrange(cols)) for _ in range(25)]
+    return WorldGrid((rows, cols), blocked), cells
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_lone_wasp_picks_the_bee_of_step_ai(seed):
+    rnd = random.Random(seed)
+    genes, cells = random_world(rnd)
+    bees = [Bee(p) for p in cells]
+    for b in rnd.sample(bees, 8):
+        b.inhoneyhold = True
+    start = (rnd.randrange(30), rnd.randrange(40))
+    wasp = Wasp("wasp", start)
+    picked = []
+    wasp._chase = lambda tgt, size, g: picked.append(tgt)
+    wasp._step_ai([b for b in bees if not b.inhoneyhold], genes.shape, genes)
+    target = WaspSwarm([start], genes).assign(*arrays(bees))
+    assert bees[target[0]] is picked[0]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_lone_wasp_hunts_like_the_wasp_object(seed):
+    rnd = random.Random(seed)
+    genes, cells = random_world(rnd)
+    bees, shadows = [Bee(p) for p in cells], [Bee(p) for p in cells]
+    for i in rnd.sample(range(25), 5):
+        bees[i].inhoneyhold = shadows[i].inhoneyhold = True
+    beehash = BeeHash()
+    for b in bees:
+        beehash.register(b)
+    start = (rnd.randrange(30), rnd.randrange(40))
+    wasp = Wasp("wasp", start)
+    swarm = WaspSwarm([start], genes)
+    # sting → chase the nearest living outdoor bee → sting, tick by tick
+    for _ in range(40):
+        wasp.step_change(bees, genes.shape, genes, beehash)
+        for b, dead in zip(shadows, swarm.step(*arrays(shadows)).tolist()):
+            if dead:
+                b.die()
+        assert swarm.positions() == [wasp.pos]
+        assert [b.alive for b in shadows] == [b.alive for b in bees]
@@ -0,0 +1,345 @@
+# domain-decomposed batch mode: one process per band of world rows
+import argparse, gc, multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from worker  import Worker
+from flowers import Flower
+from comb    import Comb
+from wasp    import Wasp
+from combstore import CombStore
+from colony  import Colony
+from flowerindex import FlowerIndex
+from freecells import FreeCells
+from flowfield import FlowField
+from worldgrid import WorldGrid
+from beehash import BeeHash
+from arena   import Arena, COMPACT_EVERY
+from rngservice import RngService
+from checkpoint import WORKER_FIELDS
+from statsink import COLUMNS, CsvSink, BinSink
+import beeworld_batchmode as batch
+import terrain
+
+# The world is cut into horizontal bands of rows ("tiles"), each owned
+# by one process.  A tile steps the Workers, Flowers and Wasps standing
+# on its rows with the usual object-engine code; the tile holding the
+# hive doorway also owns the hive (combs and every bee inside).
+#
+# Shared memory: the padded walkability mask and the flow field home to
+# the doorway are built once by the coordinator and mapped by every tile,
+# so a huge world exists once in RAM, not once per process.
+#
+# Every tick the coordinator (this process) sends each tile its inbox –
+# bees and wasps that walked in from a neighbour, flowers spawned on its
+# rows and the "halo" (the neighbours' flowers within a bee's vision of
+# the border, as of the previous tick) – the tiles step in parallel and
+# answer with their outbox and stats, which are summed into one
+# statsink row.  Hand-offs take effect on the next tick.
+#
+# Differences from a single-process run: every tile draws from its own
+# random streams (the run is repeatable for the same seed and tile
+# count, not identical to beeworld_batchmode), a bee sees flowers behind
+# the border one tick late, and a wasp only hunts and stings the bees of
+# its own tile.
+
+HANDOFF_FIELDS = ("ID", "pos", "honeyholdexit", "honeyholdentrance",
+                "humanityentrance") + tuple(WORKER_FIELDS)
+
+
+class _Ghost:
+    # read-only copy of a neighbour tile's flower (halo); bees may head
+    # for it but always cross into the owner's rows before collecting
+    __slots__ = ("pos", "muj")
+
+    def __init__(self, pos, muj):
+        self.pos = pos
+        self.muj = muj
+
+
+# _pack() / _unpack() – a Worker as a plain tuple, for the hand-off
+def _pack(bee):
+    return tuple(getattr(bee, f) for f in HANDOFF_FIELDS)
+
+
+def _unpack(state, rngs, hive):
+    bee = Worker(*state[:5], rng=rngs, hive=hive)
+    for f, v in zip(HANDOFF_FIELDS[5:], state[5:]):
+        setattr(bee, f, v)
+    return bee
+
+
+# bands() – row cut points of `n` tiles over `rows` rows
+def bands(rows, n):
+    return np.linspace(0, rows, n + 1).astype(int)
+
+
+# owner() – tile whose band holds `row`
+def owner(cuts, row):
+    return int(np.searchsorted(cuts, row, side="right")) - 1
+
+
+def _tile_main(conn, spec):
+    # worker process: attach the shared terrain, then serve one tick per
+    # message until the coordinator sends None
+    shm = [shared_memory.SharedMemory(name=n) for n in spec["shm"]]
+    try:
+        _serve(conn, spec, shm)
+    finally:
+        gc.collect()           # the grid's views into the blocks go first
+        for m in shm:
+            m.close()
+        conn.close()
+
+
+def _serve(conn, spec, shm):
+    rows, cols = frame = spec["shape"]
+    lo, hi = spec["band"]
+    layout = spec["layout"]
+    R = spec["aimrange"]
+    genes = WorldGrid(frame, cells=shm[0].buf)
+    padded = (rows + 2, cols + 2)
+    genes.flows.adopt(FlowField.shared(
+        genes, layout["world_entrance"],
+        np.ndarray(padded, np.int32, shm[1].buf),
+        np.ndarray(padded, np.int32, shm[2].buf)))
+    hive = WorldGrid.open(layout["hive_shape"])
+    rngs = RngService(spec["seed"])
+
+    combs = []
+    if spec["home"]:
+        combs = [Comb("C" + str(i + 1), pos) for i, pos in enumerate(layout["combs"])]
+        for c in combs:
+            c.build()
+        hive.flows.pin(layout["exit"])
+        for c in combs:
+            hive.flows.pin(c.posrawhoney)
+    store = CombStore(combs)
+    colony = Colony(store)
+
+    bees    = Arena()
+    flowers = []
+    wasps   = []
+    idx     = FlowerIndex(cellsize=5)
+    ghosts  = []
+    beehash = BeeHash(cellsize=4)
+    regrow  = spec["regrow"]
+
+    for ID in spec["bees"]:
+        bee = Worker(ID, layout["spawn"], layout["exit"], layout["entrance"],
+                     layout["world_entrance"], rng=rngs, hive=hive)
+        bees.add(bee)
+        beehash.register(bee)
+        colony.enlist(bee)
+
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            return
+        step, bees_in, wasps_in, halo, spawned = msg
+
+        for state in bees_in:
+            bee = _unpack(state, rngs, hive)
+            bees.add(bee)
+            beehash.register(bee)
+            colony.enlist(bee)
+        for ID, pos in wasps_in:
+            wasps.append(Wasp(ID, pos))
+        for ID, pos, golden in spawned:
+            fl = Flower(ID, pos, golden, rng=rngs)
+            flowers.append(fl)
+            idx.add(fl)
+            colony.plant(fl)
+        for g in ghosts:                  # last tick's halo out, this one in
+            idx.remove(g)
+        ghosts = [_Ghost(pos, muj) for pos, muj in halo]
+        for g in ghosts:
+            idx.add(g)
+
+        if regrow:
+            for fl in flowers:
+                fl.step_changes()
+
+        deposited = colony.nectar
+        for b in bees:
+            b.step_change(combs, flowers, genes, frame, idx, store)
+            beehash.update(b)
+        for w in wasps:
+            w.step_change(bees, frame, genes, beehash)
+
+        # this tick's head-count still includes the bees about to leave;
+        # they are counted by their new tile from the next tick on
+        census = colony.census()
+
+        # hand-off: outdoor bees and wasps now standing on another band
+        leaving = [b for b in bees if b.alive and not b.inhoneyhold
+                   and not lo <= b.pos[0] < hi]
+        for b in leaving:
+            beehash.forget(b)
+            colony.discharge(b)
+        if leaving:
+            bees.release(leaving)
+        bees_out = [_pack(b) for b in leaving]
+        wasps_out = [(w.ID, w.pos) for w in wasps if not lo <= w.pos[0] < hi]
+        wasps = [w for w in wasps if lo <= w.pos[0] < hi]
+
+        if step % COMPACT_EVERY == COMPACT_EVERY - 1:
+            for b in bees.compact():
+                beehash.forget(b)
+
+        # our flowers a neighbour's bees can see: within R rows of a border
+        edge = [(fl.pos, fl.muj) for fl in flowers
+                if fl.muj > 0 and (fl.pos[0] < lo + R or fl.pos[0] >= hi - R)]
+        conn.send((bees_out, wasps_out, edge, colony.nectar - deposited, census))
+
+
+# simulate() – run prm on `n` tiles; stats rows go to `sinks` like
+# beeworld_batchmode.simulate, and the last row is returned
+def simulate(humanity, prm, n, seed=None, sinks=(), layout=None):
+    layout = layout or terrain.default_layout(humanity.shape)
+    terrain.check_layout(humanity.shape, layout)
+    rows, cols = humanity.shape
+    n = max(1, min(int(n), rows))
+    cuts = bands(rows, n)
+
+    steps   = int(prm.get("steps",            200))
+    n_bees  = int(prm.get("num_bees",         10))
+    n_flwr  = int(prm.get("num_flower",       30))
+    # batch mode never placed its wasps, so none unless asked for
+    n_wasps = int(prm.get("num_wasp",          0))
+    grow_p  = float(prm.get("spawn_flower_p",  0.02))
+    regrow  = int(prm.get("flower_regrow",     0))
+
+    rngs  = RngService(seed)
+    place = rngs.stream("spawn")
+    home  = owner(cuts, layout["world_entrance"][0])
+
+    # terrain into shared memory: padded mask + the field home
+    genes = WorldGrid.from_terrain(humanity)
+    fld = FlowField(genes, layout["world_entrance"])
+    blobs = (np.frombuffer(genes._cells, np.uint8), fld.dist, fld.next)
+    shm = []
+    procs = []
+    conns = []
+    try:
+        for blob in blobs:
+            m = shared_memory.SharedMemory(create=True, size=max(1, blob.nbytes))
+            np.ndarray(blob.shape, blob.dtype, m.buf)[...] = blob
+            shm.append(m)
+        del fld
+
+        for i in range(n):
+            seq = np.random.SeedSequence([rngs.seed, i])
+            spec = {"shape": (rows, cols), "band": (int(cuts[i]), int(cuts[i + 1])),
+                    "layout": layout, "aimrange": 5, "home": i == home,
+                    "seed": int(seq.generate_state(1)[0]), "regrow": regrow,
+                    "shm": [m.name for m in shm],
+                    "bees": ["B" + str(k) for k in range(1, n_bees + 1)] if i == home else []}
+            parent, child = mp.Pipe()
+            p = mp.Process(target=_tile_main, args=(child, spec), daemon=True)
+            p.start()
+            child.close()
+            procs.append(p)
+            conns.append(parent)
+
+        # initial flowers and wasps, routed to the tiles that own them
+        # (the coordinator keeps the one free-cell list of the world)
+        vacant = FreeCells.from_grid(genes)
+        spawned = [[] for _ in range(n)]
+        born = 0
+        for pos in vacant.draw_many(n_flwr, place):
+            born += 1
+            spawned[owner(cuts, pos[0])].append(("F" + str(born), pos, False))
+        wasps_in = [[] for _ in range(n)]
+        for k in range(n_wasps):
+            pos = vacant.pick(place)      # a wasp does not use up the cell
+            if pos is None:
+                break
+            wasps_in[owner(cuts, pos[0])].append(("wasp" + str(k + 1), pos))
+        bees_in = [[] for _ in range(n)]
+        halo = [[] for _ in range(n)]
+
+        total_nectar = 0
+        last = None
+        for step in range(steps):
+            if place.random() < grow_p:
+                pos = vacant.draw(place)
+                if pos is not None:
+                    born += 1
+                    spawned[owner(cuts, pos[0])].append(("F" + str(born), pos, False))
+
+            for i, conn in enumerate(conns):       # all tiles step at once
+                conn.send((step, bees_in[i], wasps_in[i], halo[i], spawned[i]))
+            replies = [conn.recv() for conn in conns]
+
+            bees_in  = [[] for _ in range(n)]
+            wasps_in = [[] for _ in range(n)]
+            spawned  = [[] for _ in range(n)]
+            edges    = []
+            counts   = np.zeros(5, dtype=np.int64)
+            for bees_out, wasps_out, edge, nectar, census in replies:
+                for state in bees_out:
+                    bees_in[owner(cuts, state[1][0])].append(state)
+                for ID, pos in wasps_out:
+                    wasps_in[owner(cuts, pos[0])].append((ID, pos))
+                edges.append(edge)
+                total_nectar += nectar
+                counts += census
+            # halo of tile i: its neighbours' border flowers
+            halo = [(edges[i - 1] if i else []) + (edges[i + 1] if i + 1 < n else [])
+                    for i in range(n)]
+
+            row = (step, total_nectar) + tuple(int(v) for v in counts)
+            for sink in sinks:
+                sink.append(row)
+            last = dict(zip(COLUMNS, row))
+        for sink in sinks:
+            sink.flush()
+        return last
+    finally:
+        for conn in conns:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+        for m in shm:
+            m.close()
+            m.unlink()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Bee-World batch mode on world tiles")
+    ap.add_argument("-f", "--field", required=True,
+                    help="terrain: world file (see terrain.py), .npy or CSV")
+    ap.add_argument("-p", "--params", required=True, help="parameter CSV")
+    ap.add_argument("--tiles", type=int, default=mp.cpu_count(),
+                    help="tile processes (default: all cores)")
+    ap.add_argument("--seed", type=int, help="random seed (default: fresh)")
+    ap.add_argument("--csv", help="per-step stats CSV (step,nectar,bees_alive)")
+    ap.add_argument("--stats", help="binary columnar stats file")
+    ap.add_argument("--chunk", type=int, default=1000, help="rows per stats write")
+    args = ap.parse_args(argv)
+
+    humanity, layout = terrain.load(args.field)
+    prm = batch.load_params(args.params)
+    sinks = []
+    try:
+        if args.csv:
+            sinks.append(CsvSink(args.csv, args.chunk))
+        if args.stats:
+            sinks.append(BinSink(args.stats, args.chunk))
+        last = simulate(humanity, prm, args.tiles, args.seed, sinks, layout)
+    finally:
+        for sink in sinks:
+            sink.close()
+    last = last or {"step": -1, "nectar": 0, "bees_alive": 0}
+    print("Tiled batch finished –", last["step"] + 1,
+          "steps on", args.tiles, "tiles; nectar collected:", last["nectar"],
+          "; bees alive:", last["bees_alive"])
+
+
+if __name__ == "__main__":
+    main()
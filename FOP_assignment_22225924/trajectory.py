@@ -0,0 +1,298 @@
+# trajectory recording and seekable replay
+import json, sys
+from types import SimpleNamespace
+import numpy as np
+from flowers import Flower
+from comb import Comb
+
+# A trace file is one flat binary file: a JSON header describing every
+# array, then the arrays themselves.  Per-tick arrays have one row per
+# tick and a fixed number of slots per row, so tick t of any field sits
+# at a known offset – the file is opened with np.memmap and replay can
+# jump to any tick without reading (or re-simulating) the ones before.
+
+MAGIC = b"BEETRACE"
+ALIGN = 64
+
+# worker flag bits (0 → unused slot)
+EXISTS, ALIVE, INHIVE, CARRYING = 1, 2, 4, 8
+
+
+def _layout(fields):
+    # fields: [(name, dtype, shape)] → header bytes and byte offset of each
+    head = {"fields": [[n, np.dtype(t).str, list(s)] for n, t, s in fields]}
+    raw  = json.dumps(head).encode()
+    start = -(-(len(MAGIC) + 4 + len(raw)) // ALIGN) * ALIGN
+    offsets, at = {}, start
+    for name, dtype, shape in fields:
+        offsets[name] = at
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        at += -(-size // ALIGN) * ALIGN
+    return raw, offsets, at
+
+
+def _open(path, mode):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(path + " is not a trace file")
+        size = int(np.frombuffer(f.read(4), "<u4")[0])
+        head = json.loads(f.read(size))
+    fields = [(n, np.dtype(t), tuple(s)) for n, t, s in head["fields"]]
+    _, offsets, _ = _layout(fields)
+    return {n: np.memmap(path, dtype=t, mode=mode, offset=offsets[n], shape=s)
+            for n, t, s in fields}
+
+
+class TraceWriter:
+    """
+      Records every tick's agent state into a memory-mapped trace file.
+
+      Slots are fixed when the file is created.  Workers held in an
+      Arena (object and full engines) are written at their Arena slot:
+      a slot holds one bee from its birth until compaction releases it
+      after death, and only then may a newborn reuse it – so a slot is
+      one bee's track for as long as that bee is in the colony.  Other
+      workers (the vector engine's swarm arrays, plain lists) and wasps
+      keep their list index.  Flowers get a slot the first time they
+      are seen (their position and kind go into a static table) and
+      read -1 nectar in ticks they do not exist.  A tick costs one
+      vector copy per field.
+
+      Parameters:
+      ##########
+      path     : str             trace file to create
+      humanity : 2-D array       world terrain (stored for the replay)
+      entrance : (row, col)      hive-world doorway
+      steps    : int             ticks to reserve
+      workers  : int             worker slots
+      flowers  : int             flower slots (every flower ever seen)
+      wasps    : int             wasp slots
+      hive_shape : (rows, cols)  hive grid size (stored for the replay)
+
+      The file is created on the first write(), when the combs are known.
+      """
+
+    def __init__(self, path, humanity, entrance, steps, workers, flowers,
+                 wasps=0, hive_shape=(20, 15)):
+        self.path     = path
+        self.humanity = humanity
+        self.entrance = entrance
+        self.hive_shape = tuple(hive_shape)
+        self.steps    = int(steps)
+        self.caps     = (int(workers), int(flowers), int(wasps))
+        self.a        = None
+        self.slot     = {}               # flower → slot
+        self.ticks    = 0
+
+    def _create(self, combs):
+        (W, F, K), C, steps = self.caps, len(combs), self.steps
+        path, humanity = self.path, self.humanity
+        rows, cols = humanity.shape
+        fields = [("ticks",         np.int64, (2,)),     # ticks written, first step
+                  ("entrance",      np.int16, (2,)),
+                  ("hive_shape",    np.int16, (2,)),
+                  ("terrain",       np.int8,  (rows, cols)),
+                  ("flower_r",      np.int16, (F,)),
+                  ("flower_c",      np.int16, (F,)),
+                  ("flower_golden", np.uint8, (F,)),
+                  ("comb_r",        np.int16, (C,)),
+                  ("comb_c",        np.int16, (C,)),
+                  ("comb_max",      np.int16, (C,)),
+                  ("worker_r",      np.int16, (steps, W)),
+                  ("worker_c",      np.int16, (steps, W)),
+                  ("worker_flags",  np.uint8, (steps, W)),
+                  ("wasp_r",        np.int16, (steps, K)),
+                  ("wasp_c",        np.int16, (steps, K)),
+                  ("wasp_alive",    np.uint8, (steps, K)),
+                  ("flower_muj",    np.int8,  (steps, F)),
+                  ("comb_lvl",      np.int16, (steps, C)),
+                  ("comb_built",    np.uint8, (steps, C))]
+        raw, _, total = _layout(fields)
+        with open(path, "wb") as f:
+            f.write(MAGIC + np.array([len(raw)], "<u4").tobytes() + raw)
+            f.truncate(total)           # sparse: unwritten ticks cost nothing
+        self.a = _open(path, "r+")
+        self.a["entrance"][:] = self.entrance
+        self.a["hive_shape"][:] = self.hive_shape
+        self.a["terrain"][:] = humanity
+        self.a["comb_r"][:] = [c.posrawhoney[0] for c in combs]
+        self.a["comb_c"][:] = [c.posrawhoney[1] for c in combs]
+        self.a["comb_max"][:] = [c.maxrawhoneyy for c in combs]
+
+    def _flower_slots(self, flowers):
+        slots = []
+        for fl in flowers:
+            i = self.slot.get(fl)
+            if i is None:
+                i = self.slot[fl] = len(self.slot)
+                if i >= len(self.a["flower_r"]):
+                    raise ValueError("trace has no room for more flowers")
+                self.a["flower_r"][i] = fl.pos[0]
+                self.a["flower_c"][i] = fl.pos[1]
+                self.a["flower_golden"][i] = fl.golden
+            slots.append(i)
+        return slots
+
+    # write() – record tick `step` (ticks must come in order); same
+    # arguments as a simulate() observer, plus the wasps (Wasp objects
+    # or a waspswarm.WaspSwarm)
+    def write(self, step, bees, combs, flowers, swarm=None, wasps=()):
+        t = self.ticks
+        if t >= self.steps:
+            raise ValueError("trace is full")
+        if t == 0:
+            self._create(combs)
+            self.a["ticks"][1] = step
+        a = self.a
+        a["worker_flags"][t] = 0
+        if swarm is not None:
+            n = len(swarm)
+            a["worker_r"][t, :n] = swarm.r
+            a["worker_c"][t, :n] = swarm.c
+            a["worker_flags"][t, :n] = (EXISTS + ALIVE * swarm.alive +
+                                        INHIVE * swarm.inhoneyhold +
+                                        CARRYING * swarm.hasmuj)
+            swarm.sync_combs()
+        else:
+            n = len(bees)
+            # an Arena's slots outlive compaction, list indexes do not
+            at = (np.fromiter((b.slot for b in bees), np.int64, n)
+                  if hasattr(bees, "slots") else np.arange(n))
+            if n and at.max() >= a["worker_r"].shape[1]:
+                raise ValueError("trace has no room for more workers")
+            a["worker_r"][t, at] = np.fromiter((b.pos[0] for b in bees), np.int16, n)
+            a["worker_c"][t, at] = np.fromiter((b.pos[1] for b in bees), np.int16, n)
+            a["worker_flags"][t, at] = np.fromiter(
+                (EXISTS | ALIVE * b.alive | INHIVE * b.inhoneyhold |
+                 CARRYING * b.hasmuj for b in bees), np.uint8, n)
+        k = len(wasps)
+        if hasattr(wasps, "r"):      # a WaspSwarm: its arrays as they are
+            a["wasp_r"][t, :k] = wasps.r
+            a["wasp_c"][t, :k] = wasps.c
+            a["wasp_alive"][t, :k] = wasps.alive
+        else:
+            a["wasp_r"][t, :k] = [w.pos[0] for w in wasps]
+            a["wasp_c"][t, :k] = [w.pos[1] for w in wasps]
+            a["wasp_alive"][t, :k] = [w.alive for w in wasps]
+        muj = a["flower_muj"][t]
+        muj[:] = -1
+        slots = self._flower_slots(flowers)
+        if swarm is not None:    # the vector engine keeps nectar per cell
+            fr = np.array([fl.pos[0] for fl in flowers], dtype=np.int64)
+            fc = np.array([fl.pos[1] for fl in flowers], dtype=np.int64)
+            muj[slots] = np.minimum(swarm.nectar[fr, fc], 127)
+        else:
+            muj[slots] = [fl.muj for fl in flowers]
+        a["comb_lvl"][t] = [c.rawhoneylvl for c in combs]
+        a["comb_built"][t] = [c.built for c in combs]
+        self.ticks = t + 1
+        a["ticks"][0] = self.ticks
+
+    __call__ = write        # usable directly as a simulate() observer
+
+    def close(self):
+        if self.a is not None:
+            for arr in self.a.values():
+                arr.flush()
+        self.a = None
+
+
+class Trace:
+    """
+      Read side of a trace file: frame(t) for any tick, in O(1).
+
+      Parameters:
+      ##########
+      path : str     trace file written by TraceWriter
+      """
+
+    def __init__(self, path):
+        self.a = _open(path, "r")
+        self.ticks    = int(self.a["ticks"][0])
+        self.first    = int(self.a["ticks"][1])   # simulation step of tick 0
+        self.terrain  = np.asarray(self.a["terrain"])
+        self.entrance = tuple(int(v) for v in self.a["entrance"])
+        self.hive_shape = tuple(int(v) for v in self.a["hive_shape"])
+
+    def __len__(self):
+        return self.ticks
+
+    # frame() – the state at tick t as plot.Dot stand-ins:
+    # (bees, flowers, combs, wasps), ready for plot_hive()/plot_world()
+    def frame(self, t):
+        from plot import Dot
+        if not 0 <= t < self.ticks:
+            raise IndexError("tick " + str(t) + " not in trace")
+        a = self.a
+        flags = a["worker_flags"][t]
+        used  = np.flatnonzero(flags & EXISTS)
+        bees  = [Dot((r, c), inhoneyhold=bool(f & INHIVE), alive=bool(f & ALIVE))
+                 for r, c, f in zip(a["worker_r"][t, used].tolist(),
+                                    a["worker_c"][t, used].tolist(),
+                                    flags[used].tolist())]
+        muj   = a["flower_muj"][t]
+        there = np.flatnonzero(muj >= 0)
+        flowers = [Dot((r, c), Flower.colour(SimpleNamespace(muj=m, golden=bool(g))))
+                   for r, c, m, g in zip(a["flower_r"][there].tolist(),
+                                         a["flower_c"][there].tolist(),
+                                         muj[there].tolist(),
+                                         a["flower_golden"][there].tolist())]
+        combs = [Dot((r, c), Comb.hexslotcolour(SimpleNamespace(
+                     built=bool(b), rawhoneylvl=l, maxrawhoneyy=m)))
+                 for r, c, m, l, b in zip(a["comb_r"].tolist(), a["comb_c"].tolist(),
+                                          a["comb_max"].tolist(),
+                                          a["comb_lvl"][t].tolist(),
+                                          a["comb_built"][t].tolist())]
+        wasps = [Dot((r, c), alive=bool(al))
+                 for r, c, al in zip(a["wasp_r"][t].tolist(), a["wasp_c"][t].tolist(),
+                                     a["wasp_alive"][t].tolist())]
+        return bees, flowers, combs, wasps
+
+
+# replay() – scrub through a trace: slider, ←/→ one tick, ↑/↓ ten ticks,
+# home/end.  Every redraw reads just the one tick shown.
+def replay(path):
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider
+    from plot import plot_hive, plot_world
+    tr = Trace(path)
+    if not len(tr):
+        raise ValueError(path + " holds no ticks")
+    honeyhold = np.full(tr.hive_shape, 5)
+    fig, axes = plt.subplots(1, 2, figsize=(14, 7),
+                             gridspec_kw=dict(width_ratios=(1, 2)))
+    fig.subplots_adjust(bottom=0.15)
+    slider = Slider(fig.add_axes([0.15, 0.04, 0.7, 0.03]), "Tick",
+                    0, len(tr) - 1, valinit=0, valstep=1)
+
+    def show(t):
+        bees, flowers, combs, wasps = tr.frame(int(t))
+        for ax in axes:
+            ax.clear()
+        plot_hive(honeyhold, bees, combs, axes[0])
+        axes[0].set_title("Hive")
+        plot_world(tr.terrain, bees, flowers, wasps, axes[1], tr.entrance)
+        axes[1].set_title("World")
+        fig.suptitle("Time Step: " + str(tr.first + int(t) + 1))
+        fig.canvas.draw_idle()
+
+    def on_key(event):
+        jump = {"right": 1, "left": -1, "up": 10, "down": -10}
+        if event.key in jump:
+            t = slider.val + jump[event.key]
+        elif event.key == "home":
+            t = 0
+        elif event.key == "end":
+            t = len(tr) - 1
+        else:
+            return
+        slider.set_val(min(max(t, 0), len(tr) - 1))
+
+    slider.on_changed(show)
+    fig.canvas.mpl_connect('key_press_event', on_key)
+    show(0)
+    plt.show()
+
+
+if __name__ == "__main__":      # python trajectory.py run.trace
+    replay(sys.argv[1])
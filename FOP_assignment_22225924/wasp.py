@@ -1,4 +1,4 @@
-import numpy as np
+import profiler
 
 class Wasp:
     """
@@ -21,9 +21,11 @@ class Wasp:
 
     # _step_ai()
     # Internal helper: one “thinking” step for autonomous mode.
+    # (Many wasps at once: waspswarm.WaspSwarm does all of them in one
+    #  batched pass and keeps them off each other's targets.)
     # 1. Find the nearest *alive, outdoor* bee.
     # 2. Move one cell closer (Manhattan step) if that cell is
-    #    inside the grid AND not an obstacle (genes set).
+    #    inside the grid AND not an obstacle (genes WorldGrid).
 
     def _step_ai(self, swarm, size, genes):
         # choose nearest bee
@@ -34,25 +36,33 @@ class Wasp:
             if d < best:
                 best = d
                 tgt = bee
+        self._chase(tgt, size, genes)
+
+    # _chase()
+    # One step towards `tgt` (a bee, or None → stay put).
+    def _chase(self, tgt, size, genes):
         if tgt is None:     # no outdoor bees → stay put
             return
 
-        dx = np.sign(tgt.pos[0] - self.pos[0])
-        dy = np.sign(tgt.pos[1] - self.pos[1])
+        # sign of the differences on plain ints (np.sign on two Python
+        # ints costs more than the whole rest of the step)
+        dx = (tgt.pos[0] > self.pos[0]) - (tgt.pos[0] < self.pos[0])
+        dy = (tgt.pos[1] > self.pos[1]) - (tgt.pos[1] < self.pos[1])
 
         nxt = (self.pos[0] + dx, self.pos[1] + dy)
-        if (0 <= nxt[0] < size[0] and 0 <= nxt[1] < size[1] and
-            nxt not in genes):
+        if genes.free(nxt):    # inside the grid and walkable
             self.pos = nxt     # commit the move
 
     # eliminate_bees()
     # Sting (kill) every bee within a Manhattan radius.
     # Quickly turns nearby Worker.alive to False.
     def eliminate_bees(self, swarm, radius=2):
+        if profiler.enabled:
+            profiler.counts["sting_checks"] += len(swarm)
         for bee in swarm:
             if (abs(bee.pos[0]-self.pos[0]) <= radius and
                 abs(bee.pos[1]-self.pos[1]) <= radius):
-                bee.alive = False
+                bee.die()
 
     # step_change()
     # Called once per simulation tick.
@@ -65,12 +75,22 @@ class Wasp:
     # ----------
     # beetlejuices : list[Worker]   all worker bees in the world
     # size         : (rows, cols)  grid dimensions
-    # genes        : set[(r,c)]    obstacle coordinates
+    # genes        : WorldGrid     walkability bitmap of the world
+    # beehash      : BeeHash       optional spatial hash of the outdoor
+    #                              bees; replaces the full scans below
 
-    def step_change(self, beetlejuices, size, genes):
+    def step_change(self, beetlejuices, size, genes, beehash=None):
         if not self.alive or self.manualsigma:
             return     # manual mode → external key handler
 
+        if beehash is not None:
+            # same sting → move → sting, but each lookup only visits the
+            # hash buckets around the wasp
+            beehash.sting(self.pos, 2)
+            self._chase(beehash.nearest(self.pos), size, genes)
+            beehash.sting(self.pos, 2)
+            return
+
         # build list of targetable bees (alive and outside the hive)
         swarm = []
         for b in beetlejuices:
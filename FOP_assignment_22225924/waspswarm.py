@@ -0,0 +1,177 @@
+import numpy as np
+import profiler
+
+# most (wasp, bee) distances held at once while ranking the candidates;
+# a bigger swarm is scored in slices of wasps
+BLOCK = 1 << 20
+
+
+class WaspSwarm:
+    """
+      Structure-of-arrays wasp engine: all autonomous wasps live in
+      NumPy arrays.  One step() call gives the Wasp.step_change pattern
+      (sting → pick a bee → move → sting) to every wasp at once, using
+      batched array operations.
+
+      Picking targets is greedy, nearest pair first.  Each wasp ranks
+      its `candidates` nearest outdoor bees by distance, then colony
+      order.  In each round a waiting wasp bids for its best bee that is
+      not taken yet.  The nearest bidder gets the bee (the lower wasp
+      index on ties) and the others try their next choice.  Two wasps
+      only chase the same bee when one has run out of candidates: it
+      then follows its nearest bee, taken or not.  A single wasp chases
+      exactly the bee Wasp._step_ai would.
+
+      Stings are settled once per phase for the whole swarm.  All sting
+      squares are merged into one set of cells, so a bee dies once no
+      matter how many wasps reach it, and the order of the wasps does
+      not matter.
+
+      Parameters:
+      ##########
+      positions  : list[(row, col)]  starting cells of the wasps
+      genes      : WorldGrid         walkability of the world
+      radius     : int               half-width of the sting square (cells)
+      candidates : int               bees ranked per wasp when assigning
+      """
+
+    def __init__(self, positions, genes, radius=2, candidates=8):
+        pos = np.array(list(positions), dtype=np.int64).reshape(-1, 2)
+        self.r     = pos[:, 0].copy()
+        self.c     = pos[:, 1].copy()
+        self.alive = np.ones(len(pos), dtype=bool)
+        self.genes = genes
+        self.frame = genes.shape
+        self.radius     = int(radius)
+        self.candidates = max(1, int(candidates))
+        # (dr, dc) of every cell in the sting square
+        span = np.arange(-self.radius, self.radius + 1)
+        self.square = np.stack(np.meshgrid(span, span, indexing="ij"), -1).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.r)
+
+    # positions() – (row, col) of every wasp, in wasp order
+    def positions(self):
+        return list(zip(self.r.tolist(), self.c.tolist()))
+
+    # sync() – copy the positions back into Wasp objects (for drawing
+    # and the trajectory trace), like Swarm.sync_combs
+    def sync(self, wasps):
+        for w, pos, alive in zip(wasps, self.positions(), self.alive.tolist()):
+            w.pos   = pos
+            w.alive = alive
+
+    # ------------------------------------------------------------------
+    # kernels (br / bc: the bees' cells, prey: bees a wasp can see)
+    # ------------------------------------------------------------------
+
+    # stung() – mask of the prey standing in the sting square of any
+    # living wasp
+    def stung(self, br, bc, prey):
+        live = np.flatnonzero(self.alive)
+        if not len(live) or not prey.any():
+            return np.zeros(len(prey), dtype=bool)
+        if profiler.enabled:
+            profiler.counts["sting_checks"] += int(np.count_nonzero(prey))
+        rows, cols = self.frame
+        sr = self.r[live, None] + self.square[None, :, 0]
+        sc = self.c[live, None] + self.square[None, :, 1]
+        inside = (sr >= 0) & (sr < rows) & (sc >= 0) & (sc < cols)
+        cells = np.unique(sr[inside] * cols + sc[inside])
+        return prey & np.isin(br * cols + bc, cells)
+
+    # assign() – the bee (index into br / bc) each wasp chases; -1 for a
+    # dead wasp or when there is no prey.  `rank` is the bees' colony
+    # order when the arrays are not in it (e.g. by Arena slot)
+    def assign(self, br, bc, prey, rank=None):
+        target = np.full(len(self), -1, dtype=np.int64)
+        live = np.flatnonzero(self.alive)
+        bees = np.flatnonzero(prey)
+        n = len(bees)
+        if not len(live) or not n:
+            return target
+        k = min(self.candidates, n)
+        pr, pc = br[bees], bc[bees]
+        if rank is None:
+            rank, span = np.arange(n), n
+        else:
+            rank = rank[bees]
+            span = int(rank.max()) + 1
+
+        # every wasp's k nearest bees, nearest first.  The key
+        # distance * span + rank is unique per bee, so ties go to the bee
+        # that comes first in colony order, as in Wasp._step_ai
+        cand = np.empty((len(live), k), dtype=np.int64)
+        dist = np.empty((len(live), k), dtype=np.int64)
+        block = max(1, BLOCK // n)
+        for lo in range(0, len(live), block):
+            w = live[lo:lo + block]
+            key = (np.abs(self.r[w, None] - pr[None, :]) +
+                   np.abs(self.c[w, None] - pc[None, :])) * span + rank
+            if k < n:
+                part = np.argpartition(key, k - 1, axis=1)[:, :k]
+            else:
+                part = np.broadcast_to(np.arange(n), key.shape)
+            pkey = np.take_along_axis(key, part, axis=1)
+            order = np.argsort(pkey, axis=1)
+            cand[lo:lo + block] = np.take_along_axis(part, order, axis=1)
+            dist[lo:lo + block] = np.take_along_axis(pkey, order, axis=1) // span
+
+        # bidding rounds.  A wasp that loses a round finds its bid taken
+        # in the next one, so there are at most k + 1 rounds
+        taken   = np.zeros(n, dtype=bool)
+        choice  = np.empty(len(live), dtype=np.int64)
+        waiting = np.arange(len(live))
+        while len(waiting):
+            open_ = ~taken[cand[waiting]]
+            has = open_.any(axis=1)
+            spent = waiting[~has]              # no candidate left: chase
+            choice[spent] = cand[spent, 0]     # the nearest bee, shared
+            waiting, open_ = waiting[has], open_[has]
+            if not len(waiting):
+                break
+            first = np.argmax(open_, axis=1)
+            bid  = cand[waiting, first]
+            near = dist[waiting, first]
+            # bids sorted by bee, then distance, then wasp: the first bid
+            # on every bee wins it
+            order = np.lexsort((waiting, near, bid))
+            head = np.r_[True, bid[order][1:] != bid[order][:-1]]
+            win = order[head]
+            choice[waiting[win]] = bid[win]
+            taken[bid[win]] = True
+            lost = np.ones(len(waiting), dtype=bool)
+            lost[win] = False
+            waiting = waiting[lost]
+        target[live] = bees[choice]
+        return target
+
+    # _chase() – every wasp with a target steps one cell towards it
+    # (sign of the row and column differences) if that cell is free
+    def _chase(self, br, bc, target):
+        w = np.flatnonzero(target >= 0)
+        t = target[w]
+        nr = self.r[w] + np.sign(br[t] - self.r[w])
+        nc = self.c[w] + np.sign(bc[t] - self.c[w])
+        ok = self.genes.free_at(nr, nc)
+        self.r[w[ok]] = nr[ok]
+        self.c[w[ok]] = nc[ok]
+
+    # ------------------------------------------------------------------
+    # per-tick update
+    # ------------------------------------------------------------------
+
+    # step() – one tick of the whole swarm: sting → pick bees → move →
+    # sting.  br / bc are the bees' cells and prey marks the bees a wasp
+    # can see (alive and outdoors), all in colony order – or in any
+    # order, with `rank` giving the colony order (Colony.prey()).
+    # Returns the mask of bees stung this tick; killing them is up to
+    # the caller.
+    def step(self, br, bc, prey, rank=None):
+        br   = np.asarray(br, dtype=np.int64)
+        bc   = np.asarray(bc, dtype=np.int64)
+        prey = np.asarray(prey, dtype=bool)
+        hit = self.stung(br, bc, prey)
+        self._chase(br, bc, self.assign(br, bc, prey & ~hit, rank))
+        return hit | self.stung(br, bc, prey & ~hit)
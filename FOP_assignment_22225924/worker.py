@@ -1,11 +1,26 @@
 
-import random
+from worldgrid import WorldGrid
+import rngservice
+import profiler
+
+# the inside of the hive: 20 x 15 cells with no obstacles (the default;
+# a world file can give its bees a different hive, see terrain.py)
+HIVEGRID = WorldGrid.open((20, 15))
+
 class Worker:
 
     # One worker-bee: handles movement, nectar collecting,
     # depositing, ageing, and death.
+    # __slots__: a colony holds thousands of these, so no per-bee dict;
+    # `slot` / `gid` are filled in by the Arena that stores the bee,
+    # `colony` by the Colony counting it
+    __slots__ = ("ID", "pos", "honeyholdexit", "honeyholdentrance",
+                 "humanityentrance", "hive", "aimrange", "moves", "age",
+                 "max_age", "inhoneyhold", "hasmuj", "depositing", "resttime",
+                 "wake_at", "alive", "slot", "gid", "colony")
+
     def __init__(self, ID, pos, hive_exit, hive_entrance, world_entrance,
-                 detection_range=5):
+                 detection_range=5, rng=None, hive=None):
         # Identity & starting position
         self.ID                = ID   # e.g. "w3"
         self.pos               = pos    # (row, col) inside hive at spawn
@@ -14,59 +29,60 @@ class Worker:
         self.honeyholdexit     = hive_exit # hive → world
         self.honeyholdentrance = hive_entrance  # world → hive
         self.humanityentrance  = world_entrance  # matching cell outside
+        self.hive              = HIVEGRID if hive is None else hive   # WorldGrid of the hive
 
         # “Vision” distance (Manhattan) for flower hunting
         self.aimrange          = detection_range
 
+        # random streams of the simulation's RngService
+        rng = rng or rngservice.shared()
+        self.moves = rng.stream("move")      # wandering directions
+
         # Life-cycle counters
         self.age          = 0
-        self.max_age      = random.randint(120, 200)  # random life span
+        self.max_age      = rng.stream("lifespan").randint(120, 200)  # random life span
         self.inhoneyhold  = True   # starts inside hive
         self.hasmuj       = False   # carrying nectar right now?
         self.depositing   = False   # currently heading to comb?
         self.resttime   = 0           # small delay when loading/idle
+        self.wake_at    = None        # tick of the pending wake-up (see sleep())
         self.alive        = True       # flag toggled when age reaches max_age
+        self.colony       = None       # Colony told about every change below
 
     # PRIVATE MOVEMENT HELPERS
     # _sorted_neighbours()  → list of free neighbour cells,
     #                         sorted nearest-first to a target.
-    # move_towards()        → pick the nearest free neighbour
+    # move_towards()        → next cell on the shortest path (flow field),
+    #                         or the nearest free neighbour as a fallback
     # random_move()         → wander randomly until a free cell is found
+    # `genes` is the WorldGrid walkability bitmap of the grid the bee is
+    # on; it also knows the bounds, `frame` is kept for older callers.
     def _sorted_neighbours(self, tgt, frame, genes):
-        r0, c0 = self.pos
-        nbrs = []
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                if dr == 0 and dc == 0:
-                    continue
-                cand = (r0 + dr, c0 + dc)
-                # inside frame bounds and not an obstacle?
-                if (0 <= cand[0] < frame[0] and
-                    0 <= cand[1] < frame[1] and
-                    cand not in genes):
-                    nbrs.append(cand)
-        # sort by Euclidean-squared distance to the target cell
-        nbrs.sort(key=lambda p: (p[0]-tgt[0])**2 + (p[1]-tgt[1])**2)
-        return nbrs
+        return genes.neighbours(self.pos, tgt)
 
+    # (with profiling on, both time themselves as the "move" sub-phase)
     def move_towards(self, tgt, genes, frame):
-        nbrs = self._sorted_neighbours(tgt, frame, genes)
-        if nbrs:              # take the closest legal step
-            self.pos = nbrs[0]
-        else:                  # no legal neighbour → random fallback
-            self.random_move(genes, frame)   # never freeze
+        if profiler.enabled:
+            t0 = profiler.clock()
+        nxt = genes.route(self.pos, tgt)   # flow field, greedy if no path
+        if nxt is None:        # no legal neighbour → random fallback
+            nxt = genes.random_step(self.pos, self.moves)   # never freeze
+            if profiler.enabled:
+                profiler.counts["random_fallbacks"] += 1
+        if nxt is not None:   # take the closest legal step
+            self.pos = nxt
+        if profiler.enabled:
+            profiler.timers["move"] += profiler.clock() - t0
 
     def random_move(self, genes, frame):
-        dirs = [(1, 0), (-1, 0), (0, 1), (0, -1),      # 4 orthogonal
-                (1, 1), (1, -1), (-1, 1), (-1, -1)]     # 4 diagonal
-        random.shuffle(dirs)
-        for dr, dc in dirs:
-            nxt = (self.pos[0] + dr, self.pos[1] + dc)
-            if (0 <= nxt[0] < frame[0] and
-                0 <= nxt[1] < frame[1] and
-                nxt not in genes):
-                self.pos = nxt
-                break
+        if profiler.enabled:
+            t0 = profiler.clock()
+        nxt = genes.random_step(self.pos, self.moves)   # any free neighbour, uniformly
+        if nxt is not None:
+            self.pos = nxt
+        if profiler.enabled:
+            profiler.counts["random_moves"] += 1
+            profiler.timers["move"] += profiler.clock() - t0
 
     # MAIN PER-TICK STATE MACHINE
     # ▸ step_change() is called once per simulation timestep.
@@ -75,10 +91,15 @@ class Worker:
     # Arguments
     #   hexslot : list[Comb]    – honeycomb cells inside the hive
     #   stacies : list[Flower]  – flower objects in the world
-    #   genes   : set[(r,c)]    – obstacle coordinates
+    #   genes   : WorldGrid     – walkability bitmap of the world
     #   frame   : (rows, cols)  – world grid size for bounds checking
+    #   floweridx : FlowerIndex – optional spatial index over `stacies`;
+    #               when given the bee asks it instead of scanning the list
+    #   combstore : CombStore   – optional index over `hexslot`; when given
+    #               the nearest non-full comb comes from it, not from a scan
     # age killer (time)
-    def step_change(self, hexslot, stacies, genes, frame):
+    def step_change(self, hexslot, stacies, genes, frame, floweridx=None,
+                    combstore=None):
         if not self.alive:
             return   # dead bees do nothing
 
@@ -91,27 +112,39 @@ class Worker:
         if self.inhoneyhold and not self.hasmuj and not self.depositing:
             if self.pos != self.honeyholdexit:
                 # still inside hive → walk to exit porta
-                self.move_towards(self.honeyholdexit, set(), (20, 15))
+                self.move_towards(self.honeyholdexit, self.hive, self.hive.shape)
             else:
                 # step THROUGH portal to the world grid
                 self.inhoneyhold = False
                 self.pos         = self.humanityentrance
+                if self.colony is not None:
+                    self.colony.went_out(self)
             self.timeisclicking()
             return
 
         # 2️⃣  Hunting for nectar in the world
         if not self.inhoneyhold and not self.hasmuj:
-            # gather flowers within detection_range
-            nearbyinrange = [f for f in stacies
-                      if f.muj > 0 and
-                         abs(f.pos[0]-self.pos[0]) + abs(f.pos[1]-self.pos[1])
-                         <= self.aimrange]
-            if nearbyinrange:
-                # choose closest flower (distance²)
-                tgt = min(nearbyinrange,
-                          key=lambda f: (f.pos[0] - self.pos[0]) ** 2 +
-                                        (f.pos[1] - self.pos[1]) ** 2)
-
+            if profiler.enabled:
+                t0 = profiler.clock()
+            if floweridx is not None:
+                # closest flower straight from the spatial index
+                tgt = floweridx.nearest(self.pos, self.aimrange)
+            else:
+                # gather flowers within detection_range
+                nearbyinrange = [f for f in stacies
+                          if f.muj > 0 and
+                             abs(f.pos[0]-self.pos[0]) + abs(f.pos[1]-self.pos[1])
+                             <= self.aimrange]
+                tgt = None
+                if nearbyinrange:
+                    # choose closest flower (distance²)
+                    tgt = min(nearbyinrange,
+                              key=lambda f: (f.pos[0] - self.pos[0]) ** 2 +
+                                            (f.pos[1] - self.pos[1]) ** 2)
+            if profiler.enabled:
+                profiler.counts["flower_scans"] += 1
+                profiler.timers["forage"] += profiler.clock() - t0
+            if tgt is not None:
                 if self.pos != tgt.pos:
                     self.move_towards(tgt.pos, genes, frame)
                 else:
@@ -119,6 +152,8 @@ class Worker:
                     if tgt.collect_nectar():
                         self.hasmuj    = True   # now carrying
                         self.resttime = 2      # loading delay
+                        if self.colony is not None:
+                            self.colony.loaded(self)
             else:
                 self.random_move(genes, frame)
             self.timeisclicking()
@@ -133,23 +168,36 @@ class Worker:
                 self.inhoneyhold = True
                 self.depositing  = True
                 self.pos         = self.honeyholdentrance
+                if self.colony is not None:
+                    self.colony.came_in(self)
             self.timeisclicking()
             return
 
         # 4️⃣  Depositing nectar into the nearest non-full comb
         if self.depositing:
-            # list of (comb, manhattan-distance) pairs for non-full combs
-            targets = [(c, abs(c.posrawhoney[0] - self.pos[0]) +
-                           abs(c.posrawhoney[1] - self.pos[1]))
-                       for c in hexslot if not c.fullrawhoneyy]
-            if targets:
-                hexslot, _ = min(targets, key=lambda t: t[1])
-                if self.pos != hexslot.posrawhoney:
-                    self.move_towards(hexslot.posrawhoney, set(), (20, 15))
+            if profiler.enabled:
+                t0 = profiler.clock()
+            if combstore is not None:
+                # nearest non-full comb straight from the store's index
+                target = combstore.nearest_open(self.pos)
+            else:
+                # list of (comb, manhattan-distance) pairs for non-full combs
+                targets = [(c, abs(c.posrawhoney[0] - self.pos[0]) +
+                               abs(c.posrawhoney[1] - self.pos[1]))
+                           for c in hexslot if not c.fullrawhoneyy]
+                target = min(targets, key=lambda t: t[1])[0] if targets else None
+            if profiler.enabled:
+                profiler.counts["comb_selections"] += 1
+                profiler.timers["combs"] += profiler.clock() - t0
+            if target is not None:
+                if self.pos != target.posrawhoney:
+                    self.move_towards(target.posrawhoney, self.hive, self.hive.shape)
                 else:
-                    hexslot.addrawhoney()  # deposit 1 unit
+                    target.addrawhoney()  # deposit 1 unit
                     self.hasmuj    = False
                     self.depositing = False
+                    if self.colony is not None:
+                        self.colony.unloaded(self)
             else:
                 # all combs full → wait a bit before rechecking
                 self.resttime = 3
@@ -159,12 +207,35 @@ class Worker:
         # 5️⃣  Idle ageing when in hive and not carrying
         self.timeisclicking()
 
+    # SCHEDULER HOOKS
+    # Instead of calling step_change() on a resting bee only to count
+    # resttime down, the loop can put the bee to sleep: it leaves the
+    # Roster of active bees and a Scheduler event wakes it on the tick
+    # it would act again (resttime ticks of rest, then one more).
+    def sleep(self, sched, roster):
+        if self.resttime:
+            self.wake_at = sched.tick + self.resttime + 1
+            sched.at(self.wake_at, self.wake, roster)
+
+    def wake(self, roster):
+        self.resttime = 0          # the whole rest has been served
+        self.wake_at  = None
+        if self.alive:
+            roster.add(self)
+
     # AGEING HELPER
     # Adds one tick to age; kills the bee if age exceeds max_age.
     def timeisclicking(self):
         self.age += 1
         if self.age >= self.max_age:
-            self.alive = False          # bee dies of old age
+            self.die()          # bee dies of old age
+
+    # die() – old age or a wasp's sting; the colony's counts follow
+    def die(self):
+        if self.alive:
+            self.alive = False
+            if self.colony is not None:
+                self.colony.died(self)
 
 
 
@@ -0,0 +1,176 @@
+import numpy as np
+from flowfield import FlowCache
+import profiler
+
+# terrain codes that bees and wasps cannot enter
+WATER, TREE, HOUSE = 0, 3, 15
+BLOCKED_CODES = (WATER, TREE, HOUSE)   # grass (10) is walkable
+
+# neighbour steps in the order Worker._sorted_neighbours always used,
+# so "first best" below breaks ties exactly like its stable sort
+DIRS = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+
+
+class WorldGrid:
+    """
+      Walkability bitmap of a grid (world or hive) that replaces the old
+      `genes` set of obstacle tuples.
+
+      The mask is stored with a one-cell blocked border so a step from any
+      cell inside the grid never needs a bounds check, and the neighbour
+      offsets are precomputed once, so a move allocates nothing but the
+      new (row, col) tuple.
+
+      Parameters:
+      ##########
+      shape    : (rows, cols)      grid size
+      blocked  : 2-D bool array    True where the cell is an obstacle
+                                   (None → everything walkable)
+      cells    : buffer or None    an already filled padded mask to use as
+                                   is, e.g. shared memory (see tiles.py);
+                                   `blocked` is then ignored
+      """
+
+    def __init__(self, shape, blocked=None, cells=None):
+        rows, cols = int(shape[0]), int(shape[1])
+        self.shape  = (rows, cols)
+        self.stride = cols + 2    # padded row length
+
+        # one byte per cell (1 = walkable); the NumPy view shares the memory
+        self._cells   = bytearray((rows + 2) * (cols + 2)) if cells is None else cells
+        self._padded  = np.frombuffer(self._cells, dtype=np.bool_,
+                                      count=(rows + 2) * (cols + 2)).reshape(
+                            rows + 2, cols + 2)
+        self.walkable = self._padded[1:-1, 1:-1]   # (rows, cols) view
+        if cells is None:
+            self.walkable[:] = True if blocked is None else ~np.asarray(blocked, dtype=bool)
+
+        # flat offsets of the eight neighbours, paired with their (dr, dc)
+        self.dirs = tuple((dr, dc, dr * self.stride + dc) for dr, dc in DIRS)
+
+        # terrain revision, bumped whenever a cell is blocked or freed so
+        # cached flow fields know they are stale
+        self.version = 0
+        self.flows   = FlowCache(self)
+
+    # build the mask straight from a terrain matrix (vectorised), a
+    # block of rows at a time so a memory-mapped world is never copied
+    # or converted whole
+    @classmethod
+    def from_terrain(cls, terrain, blocked_codes=BLOCKED_CODES):
+        terrain = np.asarray(terrain)
+        grid = cls(terrain.shape)
+        rows = max(1, (1 << 22) // max(1, terrain.shape[1]))
+        for a in range(0, terrain.shape[0], rows):
+            grid.walkable[a:a + rows] = ~np.isin(terrain[a:a + rows], blocked_codes)
+        return grid
+
+    # an obstacle-free grid, e.g. the inside of the hive
+    @classmethod
+    def open(cls, shape):
+        return cls(shape)
+
+    # ------------------------------------------------------------------
+    # set-like interface so the old `genes` call sites keep working
+    # ------------------------------------------------------------------
+
+    # `pos in grid` → True when pos is an obstacle inside the grid
+    def __contains__(self, pos):
+        r, c = pos
+        return (0 <= r < self.shape[0] and 0 <= c < self.shape[1] and
+                not self._cells[(r + 1) * self.stride + c + 1])
+
+    # mark a cell as an obstacle (e.g. a new tree)
+    def add(self, pos):
+        i = (pos[0] + 1) * self.stride + pos[1] + 1
+        if self._cells[i]:
+            self._cells[i] = 0
+            self.version += 1
+
+    # make a cell walkable again
+    def discard(self, pos):
+        if 0 <= pos[0] < self.shape[0] and 0 <= pos[1] < self.shape[1]:
+            i = (pos[0] + 1) * self.stride + pos[1] + 1
+            if not self._cells[i]:
+                self._cells[i] = 1
+                self.version += 1
+
+    def __len__(self):   # number of obstacle cells
+        return int(self.walkable.size - np.count_nonzero(self.walkable))
+
+    # free() – cell inside the grid and walkable
+    def free(self, pos):
+        r, c = pos
+        return (0 <= r < self.shape[0] and 0 <= c < self.shape[1] and
+                self._cells[(r + 1) * self.stride + c + 1] == 1)
+
+    # free_at() – free() for whole arrays of rows / cols at once; every
+    # cell may be at most one step outside the grid (the blocked border)
+    def free_at(self, r, c):
+        return self._padded[np.asarray(r) + 1, np.asarray(c) + 1]
+
+    # ------------------------------------------------------------------
+    # movement kernel (pos must be a cell inside the grid)
+    # ------------------------------------------------------------------
+
+    # neighbours() – free neighbours sorted nearest-first (distance²) to tgt
+    def neighbours(self, pos, tgt):
+        if profiler.enabled:
+            profiler.counts["neighbour_evals"] += len(self.dirs)
+        r0, c0 = pos
+        base = (r0 + 1) * self.stride + c0 + 1
+        cells = self._cells
+        nbrs = [(r0 + dr, c0 + dc) for dr, dc, off in self.dirs if cells[base + off]]
+        nbrs.sort(key=lambda p: (p[0]-tgt[0])**2 + (p[1]-tgt[1])**2)
+        return nbrs
+
+    # route() – next cell on a shortest path from pos to tgt using the
+    # cached flow field, falling back to the greedy step when the field
+    # has no path (e.g. a far-away dynamic target)
+    def route(self, pos, tgt):
+        nxt = self.flows.step(pos, tgt)
+        if nxt is None:
+            nxt = self.step_towards(pos, tgt)
+        return nxt
+
+    # step_towards() – the free neighbour closest (distance²) to tgt,
+    # first one in DIRS order on ties; None when boxed in
+    def step_towards(self, pos, tgt):
+        if profiler.enabled:
+            profiler.counts["neighbour_evals"] += len(self.dirs)
+        r0, c0 = pos
+        ddr = r0 - tgt[0]
+        ddc = c0 - tgt[1]
+        base = (r0 + 1) * self.stride + c0 + 1
+        cells = self._cells
+        bestd = -1
+        for dr, dc, off in self.dirs:
+            if cells[base + off]:
+                d = (ddr + dr) * (ddr + dr) + (ddc + dc) * (ddc + dc)
+                if bestd < 0 or d < bestd:
+                    bestd = d
+                    bdr, bdc = dr, dc
+        if bestd < 0:
+            return None
+        return r0 + bdr, c0 + bdc
+
+    # random_step() – a uniformly random free neighbour (the same
+    # distribution as shuffling the directions and taking the first
+    # free one); None when boxed in.  `rnd` is an RngStream.
+    def random_step(self, pos, rnd):
+        if profiler.enabled:
+            profiler.counts["neighbour_evals"] += len(self.dirs)
+        r0, c0 = pos
+        base = (r0 + 1) * self.stride + c0 + 1
+        cells = self._cells
+        k = 0
+        for dr, dc, off in self.dirs:
+            k += cells[base + off]
+        if not k:
+            return None
+        j = rnd.randrange(k)
+        for dr, dc, off in self.dirs:
+            if cells[base + off]:
+                if not j:
+                    return r0 + dr, c0 + dc
+                j -= 1